@@ -1,11 +1,35 @@
 import asyncio
 from config import Config
-from config import MongoDBConfig
-from services.mongo_handler import MongoDBService
+from config import StorageConfig
+from config import DispatcherConfig
+from config import AttachmentConfig
+from config import ChannelRegistryConfig
+from config import BackfillConfig
+from config import GapRecoveryConfig
+from config import RoutingConfig
+from config import SpamFilterConfig
+from config import StatsConfig
+from config import RecentCacheConfig
+from config import HealthConfig
+from config import EventLogConfig
+from config import TrafficCaptureConfig
+from services.storage_backend import create_storage
 from services.discord_bot import DiscordBot
+from services.event_log import EventLog
 from services.channel_manager import ChannelManager
+from services.channel_registry import create_registry
+from services.gap_recovery import GapRecovery
+from services.health_server import HealthServer
+from services.history_backfill import HistoryBackfill
+from services.attachment_mirror import AttachmentMirror
+from services.message_dispatcher import MessageDispatcher
 from services.message_processor import MessageProcessor
+from services.recent_cache import RecentMessageCache
+from services.routing_engine import RoutingEngine
 from services.socket_server import SocketServer
+from services.spam_filter import SpamFilter
+from services.stream_stats import StreamStats
+from services.traffic_capture import TrafficRecorder
 from utils.logger import Logger
 
 class DiscordSocketListener:
@@ -14,22 +38,89 @@ class DiscordSocketListener:
     def __init__(self):
         # Load configuration
         self.bot_config, self.socket_config = Config.from_env()
-        self.mongodb_config = MongoDBConfig.from_env()
-        self.mongodb_service = MongoDBService(self.mongodb_config)
+        self.storage_config = StorageConfig.from_env()
+        self.dispatcher_config = DispatcherConfig.from_env()
+        self.attachment_config = AttachmentConfig.from_env()
+        self.registry_config = ChannelRegistryConfig.from_env()
+        self.backfill_config = BackfillConfig.from_env()
+        self.gap_recovery_config = GapRecoveryConfig.from_env()
+        self.routing_config = RoutingConfig.from_env()
+        self.spam_config = SpamFilterConfig.from_env()
+        self.stats_config = StatsConfig.from_env()
+        self.recent_cache_config = RecentCacheConfig.from_env()
+        self.health_config = HealthConfig.from_env()
+        self.event_log_config = EventLogConfig.from_env()
+        self.capture_config = TrafficCaptureConfig.from_env()
+        self.storage = create_storage(self.storage_config)
         self.logger = Logger.get_logger(self.__class__.__name__, 
                                        self.bot_config.log_file, 
                                        self.bot_config.log_level)
         
         # Initialize services
-        self.channel_manager = ChannelManager()
-        self.message_processor = MessageProcessor(self.bot_config.message_log_file, mongodb_service=self.mongodb_service)
-        self.socket_server = SocketServer(self.socket_config)
+        self.channel_manager = ChannelManager(
+            self.registry_config.legacy_file,
+            registry=create_registry(self.registry_config)
+        )
+        self.attachment_mirror = (
+            AttachmentMirror(self.attachment_config) if self.attachment_config.enabled else None
+        )
+        self.event_log = EventLog(self.event_log_config) if self.event_log_config.enabled else None
+        self.message_processor = MessageProcessor(
+            self.bot_config.message_log_file,
+            storage=self.storage,
+            attachment_mirror=self.attachment_mirror,
+            event_log=self.event_log,
+            text_log=self.event_log is None or self.event_log_config.keep_text_log,
+            max_pending_saves=self.storage_config.max_pending_saves
+        )
+        self.router = (
+            RoutingEngine.from_file(self.routing_config.rules_file) if self.routing_config.rules_file else None
+        )
+        self.stream_stats = StreamStats(self.stats_config)
+        self.message_processor.add_broadcaster(self.stream_stats.observe)
+        self.recent_cache = (
+            RecentMessageCache(self.recent_cache_config, storage=self.storage)
+            if self.recent_cache_config.enabled else None
+        )
+        if self.recent_cache:
+            self.message_processor.add_broadcaster(self.recent_cache.observe)
+        self.socket_server = SocketServer(
+            self.socket_config, router=self.router, stats_provider=self.stream_stats.snapshot,
+            recent_provider=self.recent_cache.get_recent if self.recent_cache else None
+        )
+        self.dispatcher = (
+            MessageDispatcher(self.message_processor.process_event, self.dispatcher_config)
+            if self.dispatcher_config.enabled else None
+        )
+        self.backfill = HistoryBackfill(self.storage, self.backfill_config) if self.storage else None
+        self.spam_filter = SpamFilter(self.spam_config) if self.spam_config.enabled else None
+        self.gap_recovery = (
+            GapRecovery(self.gap_recovery_config) if self.gap_recovery_config.enabled else None
+        )
+        
+        self.recorder = (
+            TrafficRecorder(self.capture_config.file, self.capture_config.max_events)
+            if self.capture_config.file else None
+        )
         
         self.discord_bot = DiscordBot(
             self.bot_config,
             self.channel_manager,
             self.message_processor,
-            self.socket_server
+            self.socket_server,
+            dispatcher=self.dispatcher,
+            backfill=self.backfill,
+            gap_recovery=self.gap_recovery,
+            spam_filter=self.spam_filter,
+            recent_cache=self.recent_cache,
+            recorder=self.recorder
+        )
+        self.health_server = (
+            HealthServer(
+                self.health_config, self.discord_bot, self.socket_server,
+                storage=self.storage, dispatcher=self.dispatcher
+            )
+            if self.health_config.enabled else None
         )
     # async def ping(self):
     #     print(f"Received message: {message.content}")
@@ -40,6 +131,18 @@ class DiscordSocketListener:
         """Start aplikasi"""
         try:
             self.logger.info("Starting Discord Socket Listener...")
+            await self.channel_manager.initialize()
+            if self.storage:
+                await self.storage.initialize()
+            if self.event_log:
+                await self.event_log.start()
+            await self.stream_stats.start(self.socket_server.broadcast_stats)
+            if self.recent_cache:
+                await self.recent_cache.start()
+            if self.health_server:
+                await self.health_server.start()
+            if self.recorder:
+                self.recorder.start()
             await self.discord_bot.start()
         except Exception as e:
             self.logger.error(f"Error starting application: {e}")
@@ -50,11 +153,40 @@ class DiscordSocketListener:
         """Stop aplikasi"""
         self.logger.info("Stopping Discord Socket Listener...")
         
-        # Stop socket server
+        # Stop health endpoint dulu supaya probe langsung melihat not ready
+        if self.health_server:
+            await self.health_server.stop()
+        
+        # Stop STATS push dan socket server
+        await self.stream_stats.stop()
         self.socket_server.stop()
         
-        # Stop Discord bot
-        self.discord_bot.stop()
+        # Stop Discord bot (dan drain dispatcher)
+        await self.discord_bot.stop()
+        
+        # Flush rekaman traffic
+        if self.recorder:
+            self.recorder.close()
+        
+        # Flush Redis mirror recent cache
+        if self.recent_cache:
+            await self.recent_cache.close()
+        
+        # Tunggu save yang masih berjalan, lalu flush dan close storage
+        await self.message_processor.flush()
+        if self.storage:
+            await self.storage.disconnect()
+        
+        # fsync dan close segment aktif event log
+        if self.event_log:
+            await self.event_log.close()
+        
+        # Close channel registry
+        await self.channel_manager.close()
+        
+        # Close attachment HTTP session
+        if self.attachment_mirror:
+            await self.attachment_mirror.close()
         
         self.logger.info("Application stopped")
 
@@ -0,0 +1,461 @@
+import asyncio
+import json
+import random
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+from utils.atomic_file import atomic_write_text
+from utils.edit_delta import MessageVersions, apply_edit_delta
+from utils.logger import Logger
+from utils.stream_codec import NAME_FIELDS, RECORD_HEADER, RecordDecoder, available_codecs, expand_message
+
+# Batas panjang satu frame (message dengan embed/attachment bisa besar)
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+FrameHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class StreamClient:
+    """
+    Asyncio client untuk socket server
+
+    Membaca stream newline-delimited dari server (satu message JSON per
+    baris), reconnect otomatis dengan exponential backoff + jitter, dan
+    menyimpan seq terakhir yang sudah diproses ke checkpoint file. Saat
+    connect ulang (atau setelah restart) client mengirim RESUME sehingga
+    server mengirim ulang message yang terlewat dari replay buffer.
+
+    Pemakaian:
+
+        async with StreamClient("localhost", 8888, checkpoint_file="consumer.json") as client:
+            async for message in client:
+                ...
+
+    atau dengan callback: await client.run(handle_message)
+
+    compression="zstd"/"zlib"/"auto" meminta stream compressed jika server
+    mendukungnya (lihat HELLO); jika tidak, stream tetap plain.
+    wire_format="dict" meminta message tanpa nama server/channel/author
+    (nama dikirim sekali lewat frame NAMES); client mengisi lagi nama tersebut,
+    jadi message yang diterima consumer sama dengan format json.
+    edits="delta" meminta EDITED sebagai diff terhadap versi sebelumnya;
+    client menyusun ulang message lengkap dari versi yang sudah diterima
+    (edit_cache_size message terakhir), atau meminta SNAPSHOT ke server jika
+    versi tersebut tidak ada. Jika server juga sudah tidak punya versinya,
+    consumer menerima delta apa adanya dengan "partial": true.
+
+    Sebuah message dianggap selesai diproses saat consumer meminta message
+    berikutnya, callback selesai, atau client di-close tanpa exception
+    (misal setelah break). Checkpoint ditulis setiap checkpoint_interval
+    detik dan saat close, jadi restart normal tidak menghasilkan duplikat;
+    setelah crash message dalam interval terakhir bisa diterima lagi
+    (at-least-once).
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 8888, outputs: Optional[List[str]] = None,
+                 checkpoint_file: Optional[str] = None, checkpoint_interval: float = 1.0,
+                 reconnect_min: float = 0.5, reconnect_max: float = 30.0,
+                 read_timeout: Optional[float] = 30.0,
+                 compression: Optional[str] = None,
+                 wire_format: str = "json",
+                 edits: str = "full",
+                 edit_cache_size: int = 10000,
+                 on_frame: Optional[FrameHandler] = None,
+                 on_gap: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None):
+        """
+        Initialize stream client
+
+        Args:
+            host: Socket server host
+            port: Socket server port
+            outputs: Hanya terima message yang di-route ke output ini
+            checkpoint_file: Path file checkpoint seq (None = tanpa checkpoint)
+            checkpoint_interval: Interval (detik) penulisan checkpoint
+            reconnect_min: Delay reconnect awal (detik)
+            reconnect_max: Delay reconnect maksimum (detik)
+            read_timeout: Reconnect jika tidak ada data (termasuk HEARTBEAT) selama ini;
+                sebaiknya beberapa kali HEARTBEAT_INTERVAL server
+            compression: Codec yang diminta ("zstd", "zlib", atau "auto"), None = plain
+            wire_format: "json" atau "dict" (nama sebagai id + dictionary per koneksi)
+            edits: "full" atau "delta" (EDITED sebagai diff terhadap versi sebelumnya)
+            edit_cache_size: Jumlah versi message yang diingat untuk menyusun delta
+            on_frame: Callback untuk frame non-message (STATS, RECENT, ...)
+            on_gap: Callback saat server melaporkan message yang tidak bisa di-replay
+        """
+        self.host = host
+        self.port = port
+        self.outputs = outputs
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.read_timeout = read_timeout
+        self.compression = compression
+        self.wire_format = wire_format
+        self.edits = edits
+        self.on_frame = on_frame
+        self.on_gap = on_gap
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._closed = False
+        # Decoder record compressed (None = stream plain) dan baris hasil decode
+        self._decoder: Optional[RecordDecoder] = None
+        self._lines: Deque[bytes] = deque()
+        # Dictionary id -> nama dari frame NAMES (per koneksi)
+        self._names: Dict[str, Dict[int, Any]] = {kind: {} for _, _, kind in NAME_FIELDS}
+        self._dict_format = False
+        self._delta_edits = False
+        # message_id -> (seq versi, message lengkap); tetap berlaku setelah reconnect
+        self._versions: Optional[MessageVersions] = MessageVersions(edit_cache_size) if edits == "delta" else None
+
+        # Posisi terakhir yang sudah diproses consumer
+        self.stream: Optional[str] = None
+        self.seq: Optional[int] = None
+        # Seq message yang sedang dipegang consumer
+        self._pending: Optional[int] = None
+        self._checkpointed: Optional[tuple] = None
+        self._checkpoint_task: Optional[asyncio.Task] = None
+        self._load_checkpoint()
+
+        # Stats tracking
+        self.received = 0
+        self.duplicates = 0
+        self.reconnects = 0
+        self.gaps = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.deltas = 0
+        self.snapshots = 0
+
+    def _load_checkpoint(self) -> None:
+        if not self.checkpoint_file:
+            return
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.stream, self.seq = data.get('stream'), data.get('seq')
+            self._checkpointed = (self.stream, self.seq)
+            self.logger.info(f"Resuming from checkpoint stream={self.stream} seq={self.seq}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Error loading checkpoint: {e}")
+
+    async def checkpoint(self) -> None:
+        """Tulis posisi terakhir ke checkpoint file jika berubah"""
+        position = (self.stream, self.seq)
+        if not self.checkpoint_file or position == self._checkpointed or self.seq is None:
+            return
+        try:
+            await asyncio.to_thread(
+                atomic_write_text, self.checkpoint_file, json.dumps({"stream": self.stream, "seq": self.seq})
+            )
+            self._checkpointed = position
+        except Exception as e:
+            self.logger.error(f"Error saving checkpoint: {e}")
+
+    async def _checkpoint_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await self.checkpoint()
+
+    async def _connect(self) -> None:
+        """Connect, baca HELLO, lalu kirim SUBSCRIBE dan RESUME"""
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=MAX_FRAME_SIZE)
+        kind, hello = self._parse(await self._readline())
+        if kind == "ERROR":
+            # Ditolak server (misal server_full), reconnect dengan backoff
+            raise ConnectionError(f"Rejected by server: {hello.get('reason')}")
+        if kind != "HELLO":
+            raise ConnectionError(f"Unexpected handshake frame: {kind}")
+
+        await self._negotiate_compression(hello.get('compression') or [])
+        await self._negotiate_format(hello.get('formats') or ["json"])
+        await self._negotiate_edits(hello.get('edits') or ["full"])
+
+        commands = []
+        if self.outputs:
+            commands.append(f"SUBSCRIBE {','.join(self.outputs)}")
+        if self.seq is None:
+            # Consumer baru mulai dari posisi server sekarang
+            self.stream, self.seq = hello['stream'], hello['seq']
+        commands.append(f"RESUME {self.stream} {self.seq}")
+        self._writer.write("".join(f"{command}\n" for command in commands).encode('utf-8'))
+        await self._writer.drain()
+        codec = f", {self._decoder.codec}" if self._decoder else ""
+        self.logger.info(f"Connected to {self.host}:{self.port} (stream {hello['stream']}, seq {hello['seq']}{codec})")
+
+    async def _negotiate_compression(self, offered: List[str]) -> None:
+        """Kirim COMPRESS sebelum RESUME dan tunggu ack (masih plain)"""
+        if not self.compression:
+            return
+        supported = [codec for codec in offered if codec in available_codecs()]
+        if self.compression != "auto":
+            supported = [codec for codec in supported if codec == self.compression]
+        if not supported:
+            self.logger.warning(f"Server does not support {self.compression} compression, using plain stream")
+            return
+
+        payload = await self._request("COMPRESS", supported[0])
+        if payload.get('codec'):
+            self._decoder = RecordDecoder(payload['codec'])
+        else:
+            self.logger.warning(f"Compression refused by server: {payload.get('reason')}")
+
+    async def _negotiate_format(self, offered: List[str]) -> None:
+        if self.wire_format == "json":
+            return
+        if self.wire_format not in offered:
+            self.logger.warning(f"Server does not support {self.wire_format} wire format, using json")
+            return
+        payload = await self._request("FORMAT", self.wire_format)
+        self._dict_format = payload.get('format') == "dict"
+        if not self._dict_format:
+            self.logger.warning(f"Wire format refused by server: {payload.get('reason')}")
+
+    async def _negotiate_edits(self, offered: List[str]) -> None:
+        if self.edits == "full":
+            return
+        if self.edits not in offered:
+            self.logger.warning(f"Server does not support {self.edits} edits, receiving full edits")
+            return
+        payload = await self._request("EDITS", self.edits)
+        self._delta_edits = payload.get('edits') == "delta"
+        if not self._delta_edits:
+            self.logger.warning(f"Delta edits refused by server: {payload.get('reason')}")
+
+    async def _request(self, command: str, argument: str) -> Dict[str, Any]:
+        """Kirim command handshake dan tunggu ack dengan kind yang sama"""
+        await self.send(f"{command} {argument}")
+        while True:
+            kind, payload = self._parse(await self._readline())
+            if kind == command:
+                return payload
+            if kind == "HEARTBEAT":
+                await self.send("PONG")
+
+    async def _readline(self) -> bytes:
+        if self._lines:
+            # Baris yang sudah didecode atau disisihkan saat menunggu SNAPSHOT
+            return self._lines.popleft()
+        if self._decoder is not None:
+            return await self._read_record_line()
+        line = await asyncio.wait_for(self._reader.readline(), self.read_timeout)
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        return line
+
+    async def _read_record_line(self) -> bytes:
+        """Baris berikutnya dari stream compressed: baca dan decode record sampai ada baris"""
+        while not self._lines:
+            header = await asyncio.wait_for(self._reader.readexactly(RECORD_HEADER.size), self.read_timeout)
+            kind, length = RECORD_HEADER.unpack(header)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"Record too large: {length} bytes")
+            payload = await asyncio.wait_for(self._reader.readexactly(length), self.read_timeout)
+            data = self._decoder.decode(kind, payload)
+            self.wire_bytes += RECORD_HEADER.size + length
+            self.decoded_bytes += len(data)
+            # Setiap record berisi frame lengkap
+            self._lines.extend(data.splitlines(keepends=True))
+        return self._lines.popleft()
+
+    @staticmethod
+    def _parse(line: bytes):
+        """Split frame jadi (kind, payload); message JSON punya kind None"""
+        text = line.decode('utf-8').strip()
+        if text.startswith("{"):
+            return None, json.loads(text)
+        kind, _, payload = text.partition(" ")
+        return kind, json.loads(payload) if payload else {}
+
+    async def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = self._writer = None
+        self._decoder = None
+        self._lines.clear()
+        self._dict_format = False
+        self._delta_edits = False
+        for names in self._names.values():
+            names.clear()
+
+    async def send(self, command: str) -> None:
+        """Kirim command ke server (misal 'STATS' atau 'RECENT <channel_id> 20')"""
+        if self._writer is None:
+            raise ConnectionError("Not connected to server")
+        self._writer.write(f"{command}\n".encode('utf-8'))
+        await self._writer.drain()
+
+    async def messages(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async iterator atas message dari server, reconnect otomatis
+
+        Message dengan seq yang sudah diproses di-skip. Frame lain diteruskan
+        ke on_frame.
+        """
+        if self._checkpoint_task is None and self.checkpoint_file:
+            self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+
+        attempt = 0
+        while not self._closed:
+            try:
+                await self._connect()
+                attempt = 0
+                while True:
+                    kind, payload = self._parse(await self._readline())
+                    if kind is None:
+                        seq = payload.get('seq')
+                        if seq is not None and seq <= self.seq:
+                            self.duplicates += 1
+                            continue
+                        self.received += 1
+                        if "base" in payload:
+                            payload = await self._resolve_edit(payload)
+                        elif self._dict_format:
+                            expand_message(payload, self._names)
+                        if self._versions is not None:
+                            self._remember(payload)
+                        self._pending = seq
+                        yield payload
+                        # Consumer meminta message berikutnya: message ini selesai diproses
+                        self._commit_pending()
+                    elif kind == "HEARTBEAT":
+                        # Balas supaya server tahu client masih hidup
+                        await self.send("PONG")
+                    elif kind == "NAMES":
+                        for names_kind, entries in payload.items():
+                            self._names.setdefault(names_kind, {}).update(
+                                (int(item_id), name) for item_id, name in entries.items()
+                            )
+                    elif kind == "GAP":
+                        await self._handle_gap(payload)
+                    elif self.on_frame:
+                        await self.on_frame(kind, payload)
+            except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    ValueError) as e:
+                if self._closed:
+                    break
+                self.logger.warning(f"Connection lost: {e}")
+            finally:
+                await self._disconnect()
+
+            if self._closed:
+                break
+            # Full jitter: delay acak antara 0 dan batas exponential
+            delay = random.uniform(0, min(self.reconnect_max, self.reconnect_min * 2 ** attempt))
+            attempt += 1
+            self.reconnects += 1
+            self.logger.info(f"Reconnecting in {delay:.1f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def _resolve_edit(self, delta: Dict[str, Any]) -> Dict[str, Any]:
+        """Susun message lengkap dari delta EDITED, lewat SNAPSHOT jika base tidak diketahui"""
+        self.deltas += 1
+        base = self._versions.get(delta['message_id']) if self._versions is not None else None
+        if base is not None and base[0] == delta['base']:
+            message = apply_edit_delta(base[1], delta)
+            if message is not None:
+                return message
+
+        snapshot = await self._snapshot(delta['message_id'])
+        if snapshot.get('message') is None:
+            self.logger.warning(f"No base version for edit of message {delta['message_id']}")
+            return {**delta, "partial": True}
+        # Snapshot bisa lebih baru dari delta ini (edit berikutnya sudah di-broadcast)
+        message = snapshot['message']
+        message['seq'] = delta['seq']
+        message['version_seq'] = snapshot['seq']
+        return message
+
+    async def _snapshot(self, message_id: int) -> Dict[str, Any]:
+        """Minta versi lengkap message; frame lain yang datang sementara diproses setelahnya"""
+        self.snapshots += 1
+        await self.send(f"SNAPSHOT {message_id}")
+        stash = []
+        try:
+            while True:
+                line = await self._readline()
+                kind, payload = self._parse(line)
+                if kind == "SNAPSHOT" and payload.get('message_id') == message_id:
+                    return payload
+                stash.append(line)
+        finally:
+            self._lines.extendleft(reversed(stash))
+
+    def _remember(self, message: Dict[str, Any]) -> None:
+        """Simpan versi message sebagai base delta berikutnya"""
+        if message.get('type') in ("DELETED", "BULK_DELETED"):
+            self._versions.discard(message.get('message_ids') or [message.get('message_id')])
+        elif message.get('message_id') is not None and not message.get('partial'):
+            version_seq = message.pop('version_seq', message.get('seq'))
+            self._versions.put(message['message_id'], (version_seq, message))
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self.messages()
+
+    async def _handle_gap(self, payload: Dict[str, Any]) -> None:
+        """Server tidak bisa replay semua message setelah checkpoint"""
+        self.gaps += 1
+        self.logger.warning(f"Gap in stream: {payload}")
+        if payload.get('reason') == "stream_changed":
+            # Seq lama tidak berlaku di stream baru, mulai dari awal stream baru
+            self.stream, self.seq = payload['stream'], 0
+        if self.on_gap:
+            await self.on_gap(payload)
+
+    async def run(self, callback: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """Panggil callback untuk setiap message sampai close()"""
+        async for message in self.messages():
+            await callback(message)
+
+    def _commit_pending(self) -> None:
+        if self._pending is not None:
+            self.seq, self._pending = self._pending, None
+
+    async def close(self, commit: bool = True) -> None:
+        """
+        Stop client dan tulis checkpoint terakhir
+
+        Args:
+            commit: Anggap message terakhir yang diterima consumer sudah diproses
+        """
+        if commit:
+            self._commit_pending()
+        self._pending = None
+        self._closed = True
+        await self._disconnect()
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            await asyncio.gather(self._checkpoint_task, return_exceptions=True)
+            self._checkpoint_task = None
+        await self.checkpoint()
+
+    async def __aenter__(self) -> 'StreamClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        # Keluar karena exception: message terakhir belum tentu selesai diproses
+        await self.close(commit=exc_type is None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client statistics"""
+        return {
+            "stream": self.stream,
+            "seq": self.seq,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "reconnects": self.reconnects,
+            "gaps": self.gaps,
+            "compression": self._decoder.codec if self._decoder else None,
+            "wire_format": "dict" if self._dict_format else "json",
+            "edits": "delta" if self._delta_edits else "full",
+            "deltas": self.deltas,
+            "snapshots": self.snapshots,
+            "compression_ratio": round(self.decoded_bytes / self.wire_bytes, 2) if self.wire_bytes else None
+        }
@@ -0,0 +1,36 @@
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class MonitoredChannel:
+    """Model untuk monitored channel beserta metadata guild-nya"""
+    channel_id: int
+    channel_name: Optional[str] = None
+    server_id: Optional[int] = None
+    server_name: Optional[str] = None
+    category_id: Optional[int] = None
+    added_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    @classmethod
+    def from_discord_channel(cls, channel) -> 'MonitoredChannel':
+        """Create MonitoredChannel dari discord channel object"""
+        guild = getattr(channel, 'guild', None)
+        return cls(
+            channel_id=channel.id,
+            channel_name=getattr(channel, 'name', None),
+            server_id=guild.id if guild else None,
+            server_name=guild.name if guild else None,
+            category_id=getattr(channel, 'category_id', None)
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MonitoredChannel':
+        """Create MonitoredChannel dari dictionary (abaikan field yang tidak dikenal)"""
+        known = {key: data[key] for key in cls.__dataclass_fields__ if key in data}
+        return cls(**known)
+
+    def to_dict(self) -> dict:
+        """Convert ke dictionary"""
+        return asdict(self)
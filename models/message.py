@@ -13,18 +13,29 @@ class DiscordMessage:
     channel: str
     channel_id: int
     author: str
-    author_id: int
+    author_id: Optional[int]
     content: str
     attachments: List[str]
     embeds: int
     reactions: int
-    
+    message_id: Optional[int] = None
+    message_ids: Optional[List[int]] = None
+    flags: Optional[List[str]] = None
+
     @classmethod
-    def from_discord_message(cls, message, message_type: str = "NEW") -> 'DiscordMessage':
-        """Create DiscordMessage dari discord.Message object"""
+    def from_discord_message(cls, message, message_type: str = "NEW",
+                             timestamp: Optional[str] = None) -> 'DiscordMessage':
+        """
+        Create DiscordMessage dari discord.Message object
+
+        Args:
+            message: discord.Message object
+            message_type: Tipe event
+            timestamp: Override timestamp (default: waktu event diterima)
+        """
         return cls(
             type=message_type,
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=timestamp or datetime.utcnow().isoformat(),
             server=message.guild.name if message.guild else "DM",
             server_id=message.guild.id if message.guild else None,
             channel=message.channel.name,
@@ -34,13 +45,80 @@ class DiscordMessage:
             content=message.content,
             attachments=[att.url for att in message.attachments],
             embeds=len(message.embeds),
-            reactions=len(message.reactions)
+            reactions=len(message.reactions),
+            message_id=message.id
+        )
+
+    @classmethod
+    def from_raw_event(cls, message_type: str, channel_id: int, guild_id: Optional[int],
+                       channel=None, data: Optional[dict] = None, message_id: Optional[int] = None,
+                       message_ids: Optional[List[int]] = None) -> 'DiscordMessage':
+        """
+        Create DiscordMessage dari raw gateway payload
+
+        Dipakai untuk event yang message-nya tidak ada di message cache,
+        jadi semua field diambil dari payload dan channel cache saja.
+
+        Args:
+            message_type: Tipe event (EDITED, DELETED, BULK_DELETED)
+            channel_id: ID channel dari payload
+            guild_id: ID guild dari payload (None untuk DM)
+            channel: Channel object dari channel cache jika ada
+            data: Raw message data dari gateway (kosong untuk delete)
+            message_id: ID message yang terkena event
+            message_ids: Semua ID message untuk bulk delete
+        """
+        data = data or {}
+        author = data.get('author') or {}
+        guild = getattr(channel, 'guild', None)
+
+        if guild is not None:
+            server = guild.name
+        else:
+            server = "DM" if guild_id is None else None
+
+        return cls(
+            type=message_type,
+            timestamp=datetime.utcnow().isoformat(),
+            server=server,
+            server_id=guild_id,
+            channel=getattr(channel, 'name', None) or str(channel_id),
+            channel_id=channel_id,
+            author=cls._format_raw_author(author),
+            author_id=int(author['id']) if 'id' in author else None,
+            content=data.get('content', ''),
+            attachments=[att['url'] for att in data.get('attachments', [])],
+            embeds=len(data.get('embeds', [])),
+            reactions=len(data.get('reactions', [])),
+            message_id=message_id,
+            message_ids=message_ids
         )
-    
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DiscordMessage':
+        """Create DiscordMessage dari dictionary (misal record message log), abaikan field yang tidak dikenal"""
+        known = {key: data[key] for key in cls.__dataclass_fields__ if key in data}
+        return cls(**known)
+
+    @staticmethod
+    def _format_raw_author(author: dict) -> str:
+        """Format raw author seperti str(discord.User)"""
+        if not author:
+            return "Unknown"
+
+        discriminator = author.get('discriminator')
+        if discriminator and discriminator != '0':
+            return f"{author.get('username')}#{discriminator}"
+        return author.get('username', "Unknown")
+
+    def document_id(self) -> str:
+        """Unique key untuk storage (dipakai sebagai _id di MongoDB)"""
+        return f"{self.channel_id}_{self.timestamp}_{self.author_id}"
+
     def to_json(self) -> str:
         """Convert ke JSON string"""
         return json.dumps(asdict(self), indent=2, ensure_ascii=False)
-    
+
     def to_dict(self) -> dict:
         """Convert ke dictionary"""
         return asdict(self)
@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import os
+from config import StorageConfig
+from services.event_log import EventLogReader
+from services.parquet_archiver import ParquetArchiver
+from services.storage_backend import create_storage
+from utils.message_log import iter_log_appended
+
+def load_cursor(archiver: ParquetArchiver, source: str):
+    try:
+        return archiver.load_cursor(source)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+async def main():
+    """Archive message history ke Parquet (incremental dari cursor urutan insert)"""
+    parser = argparse.ArgumentParser(description="Export message history to partitioned Parquet")
+    parser.add_argument('--source', choices=['storage', 'log', 'event-log'], default='storage',
+                        help="Baca dari STORAGE_BACKEND, message log file, atau segmented event log")
+    parser.add_argument('--log-file', help="Path message log (default: MESSAGE_LOG_FILE)")
+    parser.add_argument('--event-log-dir', help="Directory event log (default: EVENT_LOG_DIR)")
+    parser.add_argument('--output', default='data/archive', help="Root directory dataset Parquet")
+    parser.add_argument('--state-file', help="Path file state cursor")
+    parser.add_argument('--rows-per-flush', type=int, default=200_000)
+    args = parser.parse_args()
+
+    archiver = ParquetArchiver(args.output, args.state_file, rows_per_flush=args.rows_per_flush)
+
+    if args.source == 'log':
+        log_file = args.log_file or os.getenv('MESSAGE_LOG_FILE', 'discord_messages.txt')
+        cursor = load_cursor(archiver, 'log')
+        result = await archiver.archive(iter_log_appended(log_file, after=cursor), 'log')
+    elif args.source == 'event-log':
+        # Offset event log naik sesuai urutan append, lanjut tepat setelah cursor
+        cursor = load_cursor(archiver, 'event-log')
+        with EventLogReader(args.event_log_dir or os.getenv('EVENT_LOG_DIR', 'data/event_log')) as reader:
+            records = reader.iter_messages(cursor + 1 if cursor is not None else 0)
+            result = await archiver.archive(records, 'event-log')
+    else:
+        storage_config = StorageConfig.from_env()
+        source = f"storage:{storage_config.backend}"
+        cursor = load_cursor(archiver, source)
+        storage = create_storage(storage_config)
+        if storage is None or not await storage.initialize():
+            raise SystemExit("Storage backend not available")
+        try:
+            result = await archiver.archive(storage.iter_appended(after=cursor), source)
+        finally:
+            await storage.disconnect()
+
+    print(f"Archived {result['rows']} messages into {result['files']} files, cursor: {result['cursor']}, "
+          f"latest timestamp: {result['watermark']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
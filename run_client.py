@@ -1,21 +1,46 @@
+import asyncio
+import json
+import os
 import sys
-from client.socket_client import SocketClient
+from client.stream_client import StreamClient
 from config import Config
 
-def main():
+async def print_message(message: dict) -> None:
+    print(f"\n{'='*50}")
+    print("NEW MESSAGE RECEIVED:")
+    print(f"{'='*50}")
+    print(json.dumps(message, indent=2, ensure_ascii=False))
+
+async def main():
     """Run socket client"""
+    outputs = None
     if len(sys.argv) > 1:
         host = sys.argv[1]
         port = int(sys.argv[2]) if len(sys.argv) > 2 else 8888
+        # Optional: daftar output routing, misal "alerts,mentions"
+        outputs = sys.argv[3].split(",") if len(sys.argv) > 3 else None
     else:
         # Use default config
         _, socket_config = Config.from_env()
         host = socket_config.host
         port = socket_config.port
     
-    client = SocketClient(host, port)
-    if client.connect():
-        client.listen()
+    # Optional: simpan seq terakhir supaya restart melanjutkan tanpa duplikat/gap,
+    # minta stream compressed (zstd, zlib, auto), wire format dict dan delta edits
+    client = StreamClient(
+        host, port, outputs,
+        checkpoint_file=os.getenv('CLIENT_CHECKPOINT_FILE'),
+        compression=os.getenv('CLIENT_COMPRESSION') or None,
+        wire_format=os.getenv('CLIENT_WIRE_FORMAT', 'json'),
+        edits=os.getenv('CLIENT_EDITS', 'full')
+    )
+    try:
+        await client.run(print_message)
+    finally:
+        await client.close()
 
 if __name__ == "__main__":
-    main()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nClient stopped by user")
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import os
+from config import StorageConfig
+from services.log_importer import LogImporter
+from services.storage_backend import create_storage
+
+async def main():
+    """Import history dari message log ke STORAGE_BACKEND (resume dari checkpoint)"""
+    parser = argparse.ArgumentParser(description="Import legacy message log into the configured storage")
+    parser.add_argument('--log-file', help="Path message log (default: MESSAGE_LOG_FILE)")
+    parser.add_argument('--checkpoint', help="Path file checkpoint (default: <log-file>.import.json)")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Jumlah process untuk parsing log")
+    parser.add_argument('--restart', action='store_true', help="Abaikan checkpoint dan mulai dari awal")
+    args = parser.parse_args()
+
+    log_file = args.log_file or os.getenv('MESSAGE_LOG_FILE', 'discord_messages.txt')
+    storage = create_storage(StorageConfig.from_env())
+    if storage is None:
+        raise SystemExit("STORAGE_BACKEND=none, nothing to import into")
+
+    importer = LogImporter(storage, log_file, args.checkpoint, batch_size=args.batch_size,
+                           workers=args.workers)
+    try:
+        result = await importer.run(restart=args.restart)
+    finally:
+        await storage.disconnect()
+
+    print(f"Imported {result['imported']} messages ({result['duplicates']} duplicates, "
+          f"{result['invalid']} invalid) in {result['elapsed']}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
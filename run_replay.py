@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import replace
+from pathlib import Path
+from config import DispatcherConfig, SocketConfig, StorageConfig
+from services.storage_backend import create_storage
+from services.traffic_capture import iter_capture
+from services.traffic_replay import TrafficReplayer, compare_baseline
+
+def parse_speed(value: str) -> float:
+    """'1', '10', '10x' atau 'max' (= 0)"""
+    if value.lower() == 'max':
+        return 0.0
+    return float(value.lower().rstrip('x'))
+
+async def main() -> int:
+    """Replay rekaman traffic (TRAFFIC_CAPTURE_FILE) dan bandingkan dengan baseline"""
+    parser = argparse.ArgumentParser(description="Replay recorded traffic through the processing pipeline")
+    parser.add_argument('capture', help="File capture dari TRAFFIC_CAPTURE_FILE")
+    parser.add_argument('--speed', type=parse_speed, default=1.0, help="1 (real time), N / Nx, atau max")
+    parser.add_argument('--clients', type=int, default=10, help="Jumlah socket client untuk fan-out")
+    parser.add_argument('--port', type=int, default=18890)
+    parser.add_argument('--limit', type=int, help="Hanya replay N event pertama")
+    parser.add_argument('--no-dispatcher', action='store_true', help="Proses inline walaupun ENABLE_DISPATCHER=true")
+    parser.add_argument('--storage', action='store_true', help="Ikut tulis ke STORAGE_BACKEND (pakai database terpisah)")
+    parser.add_argument('--baseline', help="File JSON baseline untuk dibandingkan")
+    parser.add_argument('--save-baseline', action='store_true', help="Simpan hasil run ini sebagai --baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Batas perubahan relatif sebelum dianggap regresi")
+    args = parser.parse_args()
+
+    events = list(iter_capture(args.capture))
+    if args.limit:
+        events = events[:args.limit]
+    if not events:
+        raise SystemExit(f"No events in {args.capture}")
+
+    storage = None
+    if args.storage:
+        storage = create_storage(StorageConfig.from_env())
+        if storage is None or not await storage.initialize():
+            raise SystemExit("Storage backend not available")
+
+    socket_config = replace(SocketConfig(), host='127.0.0.1', port=args.port, max_clients=args.clients + 1,
+                            max_connections_per_ip=0, heartbeat_interval=3600)
+    replayer = TrafficReplayer(
+        events, speed=args.speed, clients=args.clients, socket_config=socket_config,
+        dispatcher_config=None if args.no_dispatcher else DispatcherConfig.from_env(),
+        storage=storage
+    )
+    try:
+        result = await replayer.run()
+    finally:
+        if storage:
+            await storage.disconnect()
+    result["capture"] = Path(args.capture).name
+    print(json.dumps(result, indent=2))
+
+    if not args.baseline:
+        return 0
+    baseline_path = Path(args.baseline)
+    if args.save_baseline or not baseline_path.exists():
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2) + "\n", encoding='utf-8')
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    if (baseline.get("speed"), baseline.get("events")) != (result["speed"], result["events"]):
+        print("Warning: baseline was recorded with a different speed or event count")
+    regressions = 0
+    print(f"\n{'metric':<18} {'baseline':>12} {'current':>12} {'change':>8}")
+    for metric, previous, current, regressed in compare_baseline(result, baseline, args.tolerance):
+        change = f"{(current - previous) / previous * 100:+.1f}%" if previous else "-"
+        print(f"{metric:<18} {previous:>12,.3f} {current:>12,.3f} {change:>8}{'  REGRESSION' if regressed else ''}")
+        regressions += regressed
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,125 @@
+"""
+Benchmark fan-out socket server saat burst: write syscalls dan throughput
+
+Contoh:
+    python scripts/benchmark_broadcast.py --clients 20 --messages 20000 --burst 500
+
+Server dijalankan di proses yang sama (port --port), client membaca semua
+data sampai jumlah byte yang diharapkan diterima. Setiap skenario dijalankan
+dua kali: "per-frame" (satu syscall per message per client) dan
+"coalesced" (WRITE_COALESCE_INTERVAL / WRITE_COALESCE_BYTES). Jumlah syscall
+diambil dari counter writer; verifikasi dengan
+`strace -f -c -e trace=sendmsg,sendto python scripts/benchmark_broadcast.py ...`.
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_storage import generate_messages  # noqa: E402
+from config import SocketConfig  # noqa: E402
+from services.socket_server import SocketServer  # noqa: E402
+
+
+def read_client(port: int, ready: threading.Event, done: threading.Event, received: list, index: int) -> None:
+    """Connect, langsung live (RESUME tanpa seq), lalu hitung byte message"""
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.sendall(b"RESUME\n")
+        sock.settimeout(0.5)
+        ready.set()
+        while not done.is_set():
+            try:
+                data = sock.recv(1 << 20)
+            except socket.timeout:
+                continue
+            if not data:
+                return
+            received[index] += len(data)
+
+
+async def run(config: SocketConfig, messages: list, clients: int, burst: int, pause: float) -> dict:
+    server = SocketServer(config)
+    await server.start()
+    # Tunggu server listening
+    while not server.is_running:
+        await asyncio.sleep(0.01)
+
+    received = [0] * clients
+    done = threading.Event()
+    threads = []
+    for index in range(clients):
+        ready = threading.Event()
+        thread = threading.Thread(target=read_client, args=(config.port, ready, done, received, index), daemon=True)
+        thread.start()
+        ready.wait()
+        threads.append(thread)
+    while len(server._live) < clients:
+        await asyncio.sleep(0.01)
+    # Baseline: HELLO dan frame lain yang sudah terkirim
+    await asyncio.sleep(0.1)
+    baseline_bytes = list(received)
+    baseline = server.get_stats()
+
+    started = time.perf_counter()
+    for offset in range(0, len(messages), burst):
+        for message_data in messages[offset:offset + burst]:
+            await server.broadcast_message(message_data)
+        if pause:
+            await asyncio.sleep(pause)
+    expected = sum(len(entry.frame) for entry in server._replay) * clients
+    while sum(received) - sum(baseline_bytes) < expected:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+
+    stats = server.get_stats()
+    done.set()
+    server.stop()
+    for thread in threads:
+        thread.join(timeout=2)
+    syscalls = stats["write_syscalls"] - baseline["write_syscalls"]
+    return {
+        "elapsed": elapsed,
+        "msg_per_s": len(messages) * clients / elapsed,
+        "mb_per_s": expected / elapsed / 1e6,
+        "syscalls": syscalls,
+        "frames_per_syscall": len(messages) * clients / syscalls if syscalls else 0.0
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Socket server burst fan-out benchmark")
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--burst', type=int, default=500, help="Message per burst")
+    parser.add_argument('--pause', type=float, default=0.01, help="Jeda antar burst (detik)")
+    parser.add_argument('--port', type=int, default=18888)
+    parser.add_argument('--coalesce-interval', type=float, default=0.002)
+    parser.add_argument('--coalesce-bytes', type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    # replay_buffer sebesar jumlah message: dipakai untuk menghitung byte yang diharapkan
+    base = replace(SocketConfig(), host='127.0.0.1', port=args.port, max_clients=args.clients + 1,
+                   max_connections_per_ip=0, replay_buffer=args.messages, heartbeat_interval=3600)
+    modes = {
+        "per-frame": replace(base, write_coalesce_interval=0.0, write_coalesce_bytes=1),
+        "coalesced": replace(base, write_coalesce_interval=args.coalesce_interval,
+                             write_coalesce_bytes=args.coalesce_bytes)
+    }
+
+    print(f"{'mode':<10} {'msg/s':>12} {'MB/s':>8} {'syscalls':>10} {'frames/syscall':>15}")
+    for name, config in modes.items():
+        result = await run(config, generate_messages(args.messages), args.clients, args.burst, args.pause)
+        print(f"{name:<10} {result['msg_per_s']:>12,.0f} {result['mb_per_s']:>8.1f} "
+              f"{result['syscalls']:>10,} {result['frames_per_syscall']:>15.1f}")
+        # Port yang sama dipakai lagi oleh mode berikutnya
+        await asyncio.sleep(1.2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Benchmark segmented event log dibanding message log teks
+
+Contoh:
+    python scripts/benchmark_event_log.py --messages 200000 --seeks 1000
+
+Mengukur append rate per fsync policy, sequential read, dan lompat ke offset
+acak (mmap + binary search index) dibanding membaca message log teks dari awal.
+Data ditulis ke temporary directory.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_storage import generate_messages  # noqa: E402
+from config import EventLogConfig  # noqa: E402
+from services.event_log import EventLog, EventLogReader  # noqa: E402
+from utils.message_log import iter_log_records  # noqa: E402
+
+
+async def append_rate(config: EventLogConfig, messages: list) -> float:
+    """Append semua message, return messages/sec"""
+    event_log = EventLog(config)
+    await event_log.start()
+    started = time.perf_counter()
+    for message_data in messages:
+        await event_log.append_message(message_data)
+    await event_log.close()
+    return len(messages) / (time.perf_counter() - started)
+
+
+def text_log_rate(path: Path, messages: list) -> float:
+    """Format yang ditulis MessageProcessor._log_to_file"""
+    started = time.perf_counter()
+    for message_data in messages:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(f"{message_data.to_json()}\n{'=' * 50}\n")
+    return len(messages) / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Event log append/read benchmark")
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--always-messages', type=int, default=2000,
+                        help="Jumlah message untuk EVENT_LOG_FSYNC=always (fsync per record lambat)")
+    parser.add_argument('--segment-bytes', type=int, default=8 * 1024 * 1024)
+    parser.add_argument('--seeks', type=int, default=500)
+    args = parser.parse_args()
+
+    messages = generate_messages(args.messages)
+    with tempfile.TemporaryDirectory() as directory:
+        base = EventLogConfig(enabled=True, segment_bytes=args.segment_bytes)
+        print(f"{'write':<22} {'msg/s':>12}")
+        text_path = Path(directory) / "messages.txt"
+        print(f"{'text log':<22} {text_log_rate(text_path, messages):>12,.0f}")
+        for policy in ('never', 'interval', 'always'):
+            batch = messages[:args.always_messages] if policy == 'always' else messages
+            config = replace(base, directory=f"{directory}/{policy}", fsync=policy)
+            print(f"{'event log ' + policy:<22} {await append_rate(config, batch):>12,.0f}")
+
+        log_dir = f"{directory}/interval"
+        with EventLogReader(log_dir) as reader:
+            started = time.perf_counter()
+            count = sum(1 for _ in reader.iter_messages())
+            elapsed = time.perf_counter() - started
+            print(f"\n{'read':<22} {'msg/s':>12}")
+            print(f"{'event log sequential':<22} {count / elapsed:>12,.0f}")
+
+            started = time.perf_counter()
+            count = sum(1 for _ in iter_log_records(str(text_path)))
+            elapsed = time.perf_counter() - started
+            print(f"{'text log sequential':<22} {count / elapsed:>12,.0f}")
+
+            # Lompat ke offset acak lalu baca 10 record (consumer yang resume)
+            rng = random.Random(7)
+            started = time.perf_counter()
+            for _ in range(args.seeks):
+                offset = rng.randrange(args.messages)
+                records = list(reader.read(offset, limit=10))
+                assert records[0][0] == offset
+            seek = (time.perf_counter() - started) / args.seeks
+            print(f"\n{'seek + read 10':<22} {seek * 1e6:>10,.0f} us "
+                  f"({len(list(Path(log_dir).glob('*.log')))} segments)")
+
+            # Padanannya di message log teks: scan dari awal sampai record ke-offset
+            started = time.perf_counter()
+            seeks = max(1, args.seeks // 100)
+            for _ in range(seeks):
+                target = rng.randrange(args.messages)
+                for index, _ in enumerate(iter_log_records(str(text_path))):
+                    if index >= target:
+                        break
+            print(f"{'text log scan to offset':<22} {(time.perf_counter() - started) / seeks * 1e6:>10,.0f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
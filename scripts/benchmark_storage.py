@@ -0,0 +1,165 @@
+"""
+Benchmark sustained ingest rate untuk storage backend
+
+Contoh:
+    python scripts/benchmark_storage.py --backends mongo postgres sqlite --messages 50000 --batch-size 500
+
+Backend dibaca dari environment yang sama dengan aplikasi (MONGODB_URI, DATABASE_URL, ...).
+Gunakan database/collection terpisah karena benchmark menulis data sintetis.
+"""
+import argparse
+import asyncio
+import random
+import string
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DispatcherConfig, StorageConfig  # noqa: E402
+from models.message import DiscordMessage  # noqa: E402
+from services.message_dispatcher import MessageDispatcher  # noqa: E402
+from services.message_processor import MessageProcessor  # noqa: E402
+from services.storage_backend import create_storage  # noqa: E402
+
+
+def generate_messages(count: int, channels: int = 50, authors: int = 500) -> list:
+    """Generate message sintetis dengan distribusi channel/author yang realistis"""
+    start = datetime.utcnow()
+    rng = random.Random(42)
+    messages = []
+    for index in range(count):
+        channel_id = 1000 + rng.randrange(channels)
+        author_id = 5000 + rng.randrange(authors)
+        length = rng.choice((8, 20, 60, 200, 800))
+        messages.append(DiscordMessage(
+            type="NEW",
+            timestamp=(start + timedelta(microseconds=index)).isoformat(),
+            server="Benchmark Server",
+            server_id=1,
+            channel=f"channel-{channel_id}",
+            channel_id=channel_id,
+            author=f"user{author_id}",
+            author_id=author_id,
+            content="".join(rng.choices(string.ascii_letters + " ", k=length)),
+            attachments=[],
+            embeds=0,
+            reactions=0,
+            message_id=10**17 + index
+        ))
+    return messages
+
+
+async def run_batched(backend_name: str, messages: list, batch_size: int) -> float:
+    """Ingest lewat save_messages per batch, return messages/sec"""
+    storage = create_storage(replace(StorageConfig.from_env(), backend=backend_name, batch_size=1))
+    if not await storage.initialize():
+        raise RuntimeError(f"{backend_name} not available: {storage.last_error}")
+
+    started = time.perf_counter()
+    for offset in range(0, len(messages), batch_size):
+        if await storage.save_messages(messages[offset:offset + batch_size]) < 0:
+            raise RuntimeError(f"{backend_name} batch failed: {storage.last_error}")
+    elapsed = time.perf_counter() - started
+
+    await storage.disconnect()
+    return len(messages) / elapsed
+
+
+async def run_coalesced(backend_name: str, messages: list, batch_size: int, concurrency: int) -> float:
+    """Ingest lewat save_message dari banyak worker (jalur live dengan BatchWriter)"""
+    config = replace(StorageConfig.from_env(), backend=backend_name, batch_size=batch_size)
+    storage = create_storage(config)
+    if not await storage.initialize():
+        raise RuntimeError(f"{backend_name} not available: {storage.last_error}")
+
+    queue = asyncio.Queue()
+    for message_data in messages:
+        queue.put_nowait(message_data)
+
+    async def worker():
+        while not queue.empty():
+            await storage.save_message(queue.get_nowait())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    await storage.disconnect()
+    return len(messages) / elapsed
+
+
+async def run_pipeline(backend_name: str, messages: list, batch_size: int, workers: int) -> tuple:
+    """
+    Ingest lewat MessageDispatcher -> MessageProcessor (jalur live lengkap)
+
+    Returns:
+        tuple: (messages/sec sampai semua tersimpan, rata-rata ms dari dispatch sampai broadcast)
+    """
+    config = replace(StorageConfig.from_env(), backend=backend_name, batch_size=batch_size)
+    storage = create_storage(config)
+    if not await storage.initialize():
+        raise RuntimeError(f"{backend_name} not available: {storage.last_error}")
+
+    dispatched = {}
+    latencies = []
+    done = asyncio.Event()
+
+    async def observe(message_data: DiscordMessage) -> None:
+        latencies.append(time.perf_counter() - dispatched[message_data.message_id])
+        if len(latencies) == len(messages):
+            done.set()
+
+    with tempfile.TemporaryDirectory() as directory:
+        processor = MessageProcessor(f"{directory}/messages.txt", storage=storage,
+                                     max_pending_saves=config.max_pending_saves)
+        processor.add_broadcaster(observe)
+        dispatcher = MessageDispatcher(processor.process_event, DispatcherConfig(workers=workers))
+        await dispatcher.start()
+
+        started = time.perf_counter()
+        for message_data in messages:
+            dispatched[message_data.message_id] = time.perf_counter()
+            await dispatcher.dispatch(message_data)
+        await done.wait()
+        await processor.flush()
+        elapsed = time.perf_counter() - started
+        await dispatcher.stop()
+
+    await storage.disconnect()
+    return len(messages) / elapsed, sum(latencies) / len(latencies) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Storage backend ingest benchmark")
+    parser.add_argument('--backends', nargs='+', default=['mongo', 'postgres'])
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help="Jumlah worker untuk jalur save_message (seperti dispatcher)")
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'mode':<12} {'msg/s':>12} {'broadcast ms':>14}")
+    for backend_name in args.backends:
+        # Message baru per run supaya tidak kena dedupe document_id
+        batched = await run_batched(backend_name, generate_messages(args.messages), args.batch_size)
+        print(f"{backend_name:<10} {'batched':<12} {batched:>12,.0f}")
+
+        coalesced = await run_coalesced(
+            backend_name, generate_messages(args.messages), args.batch_size, args.concurrency
+        )
+        print(f"{backend_name:<10} {'coalesced':<12} {coalesced:>12,.0f}")
+
+        # Dispatcher + processor: broadcast tidak menunggu batch write
+        pipeline, latency = await run_pipeline(
+            backend_name, generate_messages(args.messages), args.batch_size, args.concurrency
+        )
+        print(f"{backend_name:<10} {'dispatcher':<12} {pipeline:>12,.0f} {latency:>14,.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
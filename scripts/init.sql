@@ -4,6 +4,8 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 -- Table untuk menyimpan message history
 CREATE TABLE IF NOT EXISTS messages (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    document_id VARCHAR(128) UNIQUE,
+    message_id BIGINT,
     message_type VARCHAR(20) NOT NULL,
     timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
     server_name VARCHAR(255),
@@ -11,16 +13,18 @@ CREATE TABLE IF NOT EXISTS messages (
     channel_name VARCHAR(255) NOT NULL,
     channel_id BIGINT NOT NULL,
     author_name VARCHAR(255) NOT NULL,
-    author_id BIGINT NOT NULL,
+    author_id BIGINT,
     content TEXT,
     attachments JSONB DEFAULT '[]',
     embeds INTEGER DEFAULT 0,
     reactions INTEGER DEFAULT 0,
+    message_ids JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- Index untuk query performance
 CREATE INDEX IF NOT EXISTS idx_messages_channel_id ON messages(channel_id);
+CREATE INDEX IF NOT EXISTS idx_messages_channel_time ON messages(channel_id, timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
 CREATE INDEX IF NOT EXISTS idx_messages_author_id ON messages(author_id);
 
@@ -31,6 +35,7 @@ CREATE TABLE IF NOT EXISTS monitored_channels (
     channel_name VARCHAR(255),
     server_id BIGINT,
     server_name VARCHAR(255),
+    category_id BIGINT,
     added_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     is_active BOOLEAN DEFAULT TRUE
 );
@@ -46,4 +51,5 @@ CREATE TABLE IF NOT EXISTS client_connections (
 
 -- Create indexes
 CREATE INDEX IF NOT EXISTS idx_monitored_channels_active ON monitored_channels(is_active);
+CREATE INDEX IF NOT EXISTS idx_monitored_channels_server_id ON monitored_channels(server_id);
 CREATE INDEX IF NOT EXISTS idx_client_connections_active ON client_connections(is_active);
@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+import aiohttp
+from config import AttachmentConfig
+from models.message import DiscordMessage
+from utils.logger import Logger
+
+
+class AttachmentMirror:
+    """
+    Service untuk mirror attachment Discord ke content-addressed local store
+
+    File disimpan dengan nama sha256 dari isinya, jadi attachment yang sama
+    (misal di-repost atau muncul lagi saat edit) hanya disimpan sekali.
+    Download berjalan sebagai task per URL; message hanya menunggu
+    inline_timeout, sisanya selesai di background.
+    """
+
+    # Hanya type ini yang punya attachment baru untuk di-download
+    MIRRORED_TYPES = ("NEW", "EDITED")
+
+    def __init__(self, config: AttachmentConfig):
+        """
+        Initialize attachment mirror
+
+        Args:
+            config: AttachmentConfig object
+        """
+        self.config = config
+        self.store_dir = Path(config.store_dir)
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        # URL yang sudah pernah di-mirror -> URL stored copy
+        self._url_cache: "OrderedDict[str, str]" = OrderedDict()
+        # URL yang sedang di-download -> task, supaya URL yang sama tidak di-download dua kali
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # Stats tracking
+        self._downloaded = 0
+        self._deduplicated = 0
+        self._cache_hits = 0
+        self._failed = 0
+        self._deferred = 0
+        self._bytes_downloaded = 0
+
+        (self.store_dir / "tmp").mkdir(parents=True, exist_ok=True)
+
+    async def start(self) -> None:
+        """Create pooled HTTP session"""
+        if self.session is not None:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.config.max_connections,
+            limit_per_host=self.config.per_host_limit
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        )
+
+    async def close(self) -> None:
+        """Batalkan download yang masih berjalan lalu close HTTP session"""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def mirror(self, message_data: DiscordMessage) -> None:
+        """
+        Download semua attachment message secara concurrent lalu rewrite URL-nya
+
+        Dipanggil dari worker dispatcher per channel, jadi paling lama menunggu
+        inline_timeout detik. Download yang belum selesai tetap berjalan di
+        background (message berikutnya dengan URL yang sama memakai hasilnya),
+        sementara message ini memakai URL CDN asli.
+        """
+        if message_data.type not in self.MIRRORED_TYPES or not message_data.attachments:
+            return
+
+        await self.start()
+        downloads = [self._download(url) for url in message_data.attachments]
+        pending = {task for task in downloads if not task.done()}
+        if pending:
+            await asyncio.wait(pending, timeout=self.config.inline_timeout)
+
+        rewritten = []
+        for url, task in zip(message_data.attachments, downloads):
+            if not task.done():
+                self._deferred += 1
+                rewritten.append(url)
+            elif task.cancelled() or task.exception() is not None or task.result() is None:
+                # Gagal mirror: tetap pakai URL CDN asli daripada kehilangan referensi
+                rewritten.append(url)
+            else:
+                rewritten.append(task.result())
+
+        message_data.attachments = rewritten
+
+    def _download(self, url: str) -> asyncio.Future:
+        """Future stored URL untuk satu attachment (dari cache, download yang berjalan, atau download baru)"""
+        cached = self._url_cache.get(url)
+        if cached is not None:
+            self._url_cache.move_to_end(url)
+            self._cache_hits += 1
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(cached)
+            return future
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = self._inflight[url] = asyncio.create_task(self._store(url))
+            task.add_done_callback(lambda done, url=url: self._finish(url, done))
+        return task
+
+    def _finish(self, url: str, task: asyncio.Task) -> None:
+        """Dipanggil saat download selesai, termasuk yang sudah tidak ditunggu message-nya"""
+        self._inflight.pop(url, None)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self._failed += 1
+            self.logger.warning(f"Failed to mirror attachment {url}: {error}")
+
+    async def _store(self, url: str) -> Optional[str]:
+        """Download satu attachment ke store, return URL stored copy (None jika melebihi max_bytes)"""
+        fd, tmp_name = tempfile.mkstemp(dir=self.store_dir / "tmp")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                async with self.session.get(url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(self.config.chunk_size):
+                        size += len(chunk)
+                        if size > self.config.max_bytes:
+                            self.logger.warning(f"Attachment {url} exceeds {self.config.max_bytes} bytes, skipped")
+                            return None
+                        digest.update(chunk)
+                        await asyncio.to_thread(tmp_file.write, chunk)
+
+            relative_path = self._relative_path(digest.hexdigest(), url)
+            target = self.store_dir / relative_path
+            if target.exists():
+                self._deduplicated += 1
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, target)
+                tmp_name = None
+                self._downloaded += 1
+                self._bytes_downloaded += size
+        finally:
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+        stored_url = self._public_url(relative_path)
+        self._remember(url, stored_url)
+        return stored_url
+
+    @staticmethod
+    def _relative_path(hex_digest: str, url: str) -> str:
+        """Path berdasarkan hash, dengan fan-out 2 level supaya directory tidak terlalu besar"""
+        suffix = PurePosixPath(urlparse(url).path).suffix.lower()
+        if not suffix[1:].isalnum() or len(suffix) > 10:
+            suffix = ""
+        return f"{hex_digest[:2]}/{hex_digest[2:4]}/{hex_digest}{suffix}"
+
+    def _public_url(self, relative_path: str) -> str:
+        """URL yang dipakai di broadcast dan database"""
+        if self.config.base_url:
+            return f"{self.config.base_url.rstrip('/')}/{relative_path}"
+        return str(self.store_dir / relative_path)
+
+    def _remember(self, url: str, stored_url: str) -> None:
+        """Simpan mapping URL -> stored copy dengan batas ukuran (LRU)"""
+        self._url_cache[url] = stored_url
+        self._url_cache.move_to_end(url)
+        while len(self._url_cache) > self.config.url_cache_size:
+            self._url_cache.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get mirror statistics"""
+        return {
+            "enabled": self.config.enabled,
+            "store_dir": str(self.store_dir),
+            "downloaded": self._downloaded,
+            "deduplicated": self._deduplicated,
+            "cache_hits": self._cache_hits,
+            "failed": self._failed,
+            "deferred": self._deferred,
+            "inflight": len(self._inflight),
+            "bytes_downloaded": self._bytes_downloaded
+        }
@@ -1,63 +1,138 @@
-from typing import Set
+from typing import Set, Dict, List, Optional
 from utils.logger import Logger
+from models.channel import MonitoredChannel
+from services.channel_registry import ChannelRegistry, JsonFileRegistry
 import json
 from pathlib import Path
 
 class ChannelManager:
     """Service untuk manage monitored channels"""
-    
-    def __init__(self, channels_file: str = "monitored_channels.json"):
+
+    def __init__(self, channels_file: str = "monitored_channels.json",
+                 registry: Optional[ChannelRegistry] = None):
+        """
+        Initialize channel manager
+
+        Args:
+            channels_file: Path file JSON lama, dipakai sebagai default registry
+                dan sebagai sumber migrasi untuk backend lain
+            registry: Optional registry backend (default: JsonFileRegistry)
+        """
         self.channels_file = channels_file
+        self.registry = registry or JsonFileRegistry(channels_file)
         self.logger = Logger.get_logger(self.__class__.__name__)
+
+        # In-memory index untuk hot check is_monitored
         self.monitored_channels: Set[int] = set()
-        
-        # Load channels dari file jika ada
-        self._load_channels()
-    
-    def add_channel(self, channel_id: int) -> bool:
+        self.channels: Dict[int, MonitoredChannel] = {}
+
+    async def initialize(self) -> None:
+        """Load channels dari registry"""
+        try:
+            channels = await self.registry.load()
+            if not channels and not isinstance(self.registry, JsonFileRegistry):
+                channels = await self._migrate_legacy_file()
+            self._index(channels)
+            self.logger.info(f"Loaded {len(self.monitored_channels)} monitored channels")
+        except Exception as e:
+            self.logger.error(f"Error loading channels: {e}")
+            self._index([])
+
+    async def add_channel(self, channel_id: int, channel: Optional[MonitoredChannel] = None) -> bool:
         """Tambah channel untuk monitoring"""
         if channel_id in self.monitored_channels:
             return False
-        
-        self.monitored_channels.add(channel_id)
-        self._save_channels()
+
+        await self.add_channels([channel or MonitoredChannel(channel_id=channel_id)])
         self.logger.info(f"Added channel {channel_id} to monitoring")
         return True
-    
-    def remove_channel(self, channel_id: int) -> bool:
+
+    async def add_channels(self, channels: List[MonitoredChannel]) -> int:
+        """Tambah banyak channel sekaligus (misal satu guild atau category)"""
+        new_channels = [ch for ch in channels if ch.channel_id not in self.monitored_channels]
+        if not new_channels:
+            return 0
+
+        for channel in new_channels:
+            self.channels[channel.channel_id] = channel
+            self.monitored_channels.add(channel.channel_id)
+
+        try:
+            await self.registry.upsert(new_channels)
+        except Exception as e:
+            self.logger.error(f"Error saving channels: {e}")
+        return len(new_channels)
+
+    async def remove_channel(self, channel_id: int) -> bool:
         """Hapus channel dari monitoring"""
         if channel_id not in self.monitored_channels:
             return False
-        
-        self.monitored_channels.remove(channel_id)
-        self._save_channels()
+
+        await self.remove_channels([channel_id])
         self.logger.info(f"Removed channel {channel_id} from monitoring")
         return True
-    
+
+    async def remove_channels(self, channel_ids: List[int]) -> int:
+        """Hapus banyak channel sekaligus"""
+        removed = [ch_id for ch_id in channel_ids if ch_id in self.monitored_channels]
+        if not removed:
+            return 0
+
+        for channel_id in removed:
+            self.monitored_channels.discard(channel_id)
+            self.channels.pop(channel_id, None)
+
+        try:
+            await self.registry.delete(removed)
+        except Exception as e:
+            self.logger.error(f"Error saving channels: {e}")
+        return len(removed)
+
+    async def remove_guild(self, server_id: int) -> int:
+        """Hapus semua monitored channel milik satu guild"""
+        return await self.remove_channels(
+            [ch.channel_id for ch in self.channels.values() if ch.server_id == server_id]
+        )
+
+    async def remove_category(self, category_id: int) -> int:
+        """Hapus semua monitored channel dalam satu category"""
+        return await self.remove_channels(
+            [ch.channel_id for ch in self.channels.values() if ch.category_id == category_id]
+        )
+
     def is_monitored(self, channel_id: int) -> bool:
         """Check apakah channel dimonitor"""
         return channel_id in self.monitored_channels
-    
+
     def get_monitored_channels(self) -> Set[int]:
         """Get semua monitored channels"""
         return self.monitored_channels.copy()
-    
-    def _load_channels(self) -> None:
-        """Load channels dari file"""
-        try:
-            if Path(self.channels_file).exists():
-                with open(self.channels_file, 'r') as f:
-                    channels_list = json.load(f)
-                    self.monitored_channels = set(channels_list)
-                    self.logger.info(f"Loaded {len(self.monitored_channels)} monitored channels")
-        except Exception as e:
-            self.logger.error(f"Error loading channels: {e}")
-            self.monitored_channels = set()
-    
-    def _save_channels(self) -> None:
-        """Save channels ke file"""
-        try:
-            with open(self.channels_file, 'w') as f:
-                json.dump(list(self.monitored_channels), f)
-        except Exception as e:
-            self.logger.error(f"Error saving channels: {e}")
+
+    def get_channel_info(self, channel_id: int) -> Optional[MonitoredChannel]:
+        """Get metadata monitored channel"""
+        return self.channels.get(channel_id)
+
+    async def close(self) -> None:
+        """Close registry backend"""
+        await self.registry.close()
+
+    def _index(self, channels: List[MonitoredChannel]) -> None:
+        """Rebuild in-memory index"""
+        self.channels = {ch.channel_id: ch for ch in channels}
+        self.monitored_channels = set(self.channels)
+
+    async def _migrate_legacy_file(self) -> List[MonitoredChannel]:
+        """Import monitored_channels.json lama ke registry yang masih kosong"""
+        if not Path(self.channels_file).exists():
+            return []
+
+        with open(self.channels_file, 'r') as f:
+            entries = json.load(f)
+        channels = [
+            MonitoredChannel(channel_id=entry) if isinstance(entry, int) else MonitoredChannel.from_dict(entry)
+            for entry in entries
+        ]
+        if channels:
+            await self.registry.upsert(channels)
+            self.logger.info(f"Migrated {len(channels)} channels from {self.channels_file}")
+        return channels
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+from config import ChannelRegistryConfig, PostgresConfig
+from models.channel import MonitoredChannel
+from utils.atomic_file import atomic_write_text
+from utils.logger import Logger
+
+try:
+    import asyncpg
+except ImportError:  # Optional, hanya dibutuhkan untuk backend postgres
+    asyncpg = None
+
+
+class ChannelRegistry(ABC):
+    """Interface untuk persistence monitored channels"""
+
+    @abstractmethod
+    async def load(self) -> List[MonitoredChannel]:
+        """Load semua channel yang aktif"""
+
+    @abstractmethod
+    async def upsert(self, channels: List[MonitoredChannel]) -> None:
+        """Tambah atau update channel"""
+
+    @abstractmethod
+    async def delete(self, channel_ids: List[int]) -> None:
+        """Hapus channel dari monitoring"""
+
+    async def close(self) -> None:
+        """Release resource backend"""
+
+
+class JsonFileRegistry(ChannelRegistry):
+    """
+    Registry berbasis satu JSON file dengan atomic write-and-rename
+
+    Compatible dengan format lama monitored_channels.json (list of channel id).
+    Setiap perubahan menulis ulang seluruh file, tapi di thread terpisah dan
+    tanpa risiko file corrupt jika crash di tengah penulisan.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._channels: Dict[int, MonitoredChannel] = {}
+        self._write_lock = asyncio.Lock()
+
+    async def load(self) -> List[MonitoredChannel]:
+        self._channels = {channel.channel_id: channel
+                          for channel in await asyncio.to_thread(self._read)}
+        return list(self._channels.values())
+
+    def _read(self) -> List[MonitoredChannel]:
+        if not Path(self.path).exists():
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        return [
+            MonitoredChannel(channel_id=entry) if isinstance(entry, int) else MonitoredChannel.from_dict(entry)
+            for entry in entries
+        ]
+
+    async def upsert(self, channels: List[MonitoredChannel]) -> None:
+        for channel in channels:
+            self._channels[channel.channel_id] = channel
+        await self._flush()
+
+    async def delete(self, channel_ids: List[int]) -> None:
+        for channel_id in channel_ids:
+            self._channels.pop(channel_id, None)
+        await self._flush()
+
+    async def _flush(self) -> None:
+        snapshot = json.dumps([channel.to_dict() for channel in self._channels.values()], ensure_ascii=False)
+        async with self._write_lock:
+            await asyncio.to_thread(atomic_write_text, self.path, snapshot)
+
+
+class AppendLogRegistry(ChannelRegistry):
+    """
+    Registry berbasis append-only log (satu JSON operation per baris)
+
+    Setiap add/remove hanya append satu baris (O(1)). Log di-compact ke
+    snapshot secara atomic jika jumlah operasi jauh melebihi jumlah channel.
+    """
+
+    COMPACT_FACTOR = 2
+    COMPACT_MIN_OPS = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._channels: Dict[int, MonitoredChannel] = {}
+        self._ops = 0
+        self._write_lock = asyncio.Lock()
+
+    async def load(self) -> List[MonitoredChannel]:
+        await asyncio.to_thread(self._replay)
+        return list(self._channels.values())
+
+    def _replay(self) -> None:
+        self._channels = {}
+        self._ops = 0
+        if not Path(self.path).exists():
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika crash saat append
+                    self.logger.warning(f"Skipping truncated registry log entry in {self.path}")
+                    continue
+                self._apply(entry)
+                self._ops += 1
+
+    def _apply(self, entry: dict) -> None:
+        if entry.get('op') == 'add':
+            for data in entry.get('channels', []):
+                channel = MonitoredChannel.from_dict(data)
+                self._channels[channel.channel_id] = channel
+        elif entry.get('op') == 'remove':
+            for channel_id in entry.get('ids', []):
+                self._channels.pop(channel_id, None)
+
+    async def upsert(self, channels: List[MonitoredChannel]) -> None:
+        await self._append({'op': 'add', 'channels': [channel.to_dict() for channel in channels]})
+
+    async def delete(self, channel_ids: List[int]) -> None:
+        await self._append({'op': 'remove', 'ids': list(channel_ids)})
+
+    async def _append(self, entry: dict) -> None:
+        async with self._write_lock:
+            self._apply(entry)
+            self._ops += 1
+            await asyncio.to_thread(self._write_line, json.dumps(entry, ensure_ascii=False))
+
+            if self._ops > max(self.COMPACT_MIN_OPS, self.COMPACT_FACTOR * len(self._channels)):
+                await asyncio.to_thread(self._compact)
+
+    def _write_line(self, line: str) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self) -> None:
+        snapshot = {'op': 'add', 'channels': [channel.to_dict() for channel in self._channels.values()]}
+        atomic_write_text(self.path, json.dumps(snapshot, ensure_ascii=False) + "\n")
+        self._ops = 1
+        self.logger.info(f"Compacted channel registry log ({len(self._channels)} channels)")
+
+
+class SQLiteRegistry(ChannelRegistry):
+    """Registry berbasis SQLite, schema mengikuti tabel monitored_channels di init.sql"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS monitored_channels (
+                    channel_id INTEGER PRIMARY KEY,
+                    channel_name TEXT,
+                    server_id INTEGER,
+                    server_name TEXT,
+                    category_id INTEGER,
+                    added_at TEXT,
+                    is_active INTEGER DEFAULT 1
+                );
+                CREATE INDEX IF NOT EXISTS idx_monitored_channels_active ON monitored_channels(is_active);
+            """)
+        return self._conn
+
+    async def load(self) -> List[MonitoredChannel]:
+        async with self._lock:
+            return await asyncio.to_thread(self._load)
+
+    def _load(self) -> List[MonitoredChannel]:
+        rows = self._connect().execute(
+            "SELECT channel_id, channel_name, server_id, server_name, category_id, added_at "
+            "FROM monitored_channels WHERE is_active = 1"
+        ).fetchall()
+        return [MonitoredChannel(*row) for row in rows]
+
+    async def upsert(self, channels: List[MonitoredChannel]) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._upsert, channels)
+
+    def _upsert(self, channels: List[MonitoredChannel]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO monitored_channels "
+                "(channel_id, channel_name, server_id, server_name, category_id, added_at, is_active) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT(channel_id) DO UPDATE SET channel_name = excluded.channel_name, "
+                "server_id = excluded.server_id, server_name = excluded.server_name, "
+                "category_id = excluded.category_id, added_at = excluded.added_at, is_active = 1",
+                [(c.channel_id, c.channel_name, c.server_id, c.server_name, c.category_id, c.added_at)
+                 for c in channels]
+            )
+
+    async def delete(self, channel_ids: List[int]) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._delete, channel_ids)
+
+    def _delete(self, channel_ids: List[int]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE monitored_channels SET is_active = 0 WHERE channel_id = ?",
+                [(channel_id,) for channel_id in channel_ids]
+            )
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class PostgresRegistry(ChannelRegistry):
+    """Registry berbasis tabel monitored_channels di PostgreSQL (scripts/init.sql)"""
+
+    def __init__(self, config: PostgresConfig):
+        if asyncpg is None:
+            raise RuntimeError("asyncpg is required for the postgres channel registry")
+        self.config = config
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.pool = None
+
+    async def _get_pool(self):
+        if self.pool is None:
+            self.pool = await asyncpg.create_pool(
+                self.config.uri,
+                min_size=self.config.min_pool_size,
+                max_size=self.config.max_pool_size
+            )
+            async with self.pool.acquire() as conn:
+                # Kolom category_id tidak ada di versi init.sql yang lama
+                await conn.execute(
+                    "ALTER TABLE monitored_channels ADD COLUMN IF NOT EXISTS category_id BIGINT"
+                )
+        return self.pool
+
+    async def load(self) -> List[MonitoredChannel]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "SELECT channel_id, channel_name, server_id, server_name, category_id, added_at "
+            "FROM monitored_channels WHERE is_active"
+        )
+        return [
+            MonitoredChannel(
+                channel_id=row['channel_id'],
+                channel_name=row['channel_name'],
+                server_id=row['server_id'],
+                server_name=row['server_name'],
+                category_id=row['category_id'],
+                added_at=row['added_at'].isoformat() if row['added_at'] else None
+            )
+            for row in rows
+        ]
+
+    async def upsert(self, channels: List[MonitoredChannel]) -> None:
+        pool = await self._get_pool()
+        await pool.executemany(
+            "INSERT INTO monitored_channels "
+            "(channel_id, channel_name, server_id, server_name, category_id, is_active) "
+            "VALUES ($1, $2, $3, $4, $5, TRUE) "
+            "ON CONFLICT (channel_id) DO UPDATE SET channel_name = EXCLUDED.channel_name, "
+            "server_id = EXCLUDED.server_id, server_name = EXCLUDED.server_name, "
+            "category_id = EXCLUDED.category_id, is_active = TRUE",
+            [(c.channel_id, c.channel_name, c.server_id, c.server_name, c.category_id) for c in channels]
+        )
+
+    async def delete(self, channel_ids: List[int]) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            "UPDATE monitored_channels SET is_active = FALSE WHERE channel_id = ANY($1::bigint[])",
+            list(channel_ids)
+        )
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+
+def create_registry(config: ChannelRegistryConfig, postgres_config: Optional[PostgresConfig] = None) -> ChannelRegistry:
+    """Create registry backend sesuai konfigurasi"""
+    backend = config.backend.lower()
+    if backend == 'json':
+        return JsonFileRegistry(config.path)
+    if backend == 'log':
+        return AppendLogRegistry(config.path)
+    if backend == 'sqlite':
+        return SQLiteRegistry(config.path)
+    if backend == 'postgres':
+        return PostgresRegistry(postgres_config or PostgresConfig.from_env())
+    raise ValueError(f"Unknown channel registry backend: {config.backend}")
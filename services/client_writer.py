@@ -0,0 +1,179 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Batas jumlah buffer per sendmsg (iovec)
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+if IOV_MAX <= 0:
+    IOV_MAX = 1024
+
+
+class ClientWriter:
+    """
+    Outgoing queue dan writer thread untuk satu socket client
+
+    Frame yang di-put hanya dimasukkan ke queue (object bytes yang sama
+    dipakai untuk semua client, tidak di-copy). Writer thread menunggu
+    coalesce_interval setelah frame pertama masuk, atau sampai coalesce_bytes
+    terkumpul, lalu mengirim semua frame pending dengan satu sendmsg
+    (vectored write). Jika queue melebihi max_queue_bytes, put() return False
+    dan client dianggap slow consumer.
+    """
+
+    def __init__(self, client_socket: socket.socket, coalesce_interval: float, coalesce_bytes: int,
+                 max_queue_bytes: int, on_error: Callable[[socket.socket, Exception], None]):
+        """
+        Initialize client writer
+
+        Args:
+            client_socket: Socket client
+            coalesce_interval: Lama menunggu frame lain sebelum kirim (detik, 0 = langsung)
+            coalesce_bytes: Kirim langsung jika pending sudah sebesar ini
+            max_queue_bytes: Batas bytes pending sebelum client dianggap slow consumer
+            on_error: Dipanggil (dari writer thread) jika send gagal
+        """
+        self.socket = client_socket
+        self.coalesce_interval = coalesce_interval
+        self.coalesce_bytes = coalesce_bytes
+        self.max_queue_bytes = max_queue_bytes
+        self.on_error = on_error
+
+        self._frames: Deque[bytes] = deque()
+        self._pending_bytes = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        # Waktu terakhir send berhasil memindahkan data (peer masih membaca)
+        self.last_progress = time.monotonic()
+
+        # Stats tracking
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.syscalls = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, data: bytes) -> bool:
+        """Masukkan frame ke queue; False jika writer sudah close atau queue penuh"""
+        with self._cond:
+            if self._closed:
+                return False
+            if self._pending_bytes + len(data) > self.max_queue_bytes and self._frames:
+                return False
+            self._frames.append(data)
+            self._pending_bytes += len(data)
+            # Bangunkan writer untuk frame pertama dan saat cap tercapai
+            if len(self._frames) == 1 or self._pending_bytes >= self.coalesce_bytes:
+                self._cond.notify()
+        return True
+
+    def close(self) -> None:
+        """Stop writer thread; frame yang belum terkirim dibuang"""
+        with self._cond:
+            self._closed = True
+            self._frames.clear()
+            self._pending_bytes = 0
+            self._cond.notify()
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_bytes
+
+    def _next_batch(self) -> Optional[List[bytes]]:
+        """Tunggu frame, tunggu tick coalescing, lalu ambil frame sampai coalesce_bytes"""
+        with self._cond:
+            while not self._frames and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            if self.coalesce_interval > 0 and self._pending_bytes < self.coalesce_bytes:
+                self._cond.wait_for(
+                    lambda: self._closed or self._pending_bytes >= self.coalesce_bytes,
+                    timeout=self.coalesce_interval
+                )
+                if self._closed:
+                    return None
+
+            batch = [self._frames.popleft()]
+            size = len(batch[0])
+            while self._frames and size + len(self._frames[0]) <= self.coalesce_bytes:
+                frame = self._frames.popleft()
+                batch.append(frame)
+                size += len(frame)
+            self._pending_bytes -= size
+            return batch
+
+    def _run(self) -> None:
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                self._send_batch(batch)
+        except Exception as e:
+            if not self._closed:
+                self.on_error(self.socket, e)
+
+    def _send_batch(self, batch: List[Any]) -> None:
+        """Kirim semua buffer dengan sendmsg, lanjutkan dari posisi partial write"""
+        if not hasattr(self.socket, 'sendmsg'):
+            # Platform tanpa sendmsg (Windows): satu join lalu send
+            self._sendall(b"".join(batch))
+            self.frames_sent += len(batch)
+            return
+
+        frames = len(batch)
+        index = 0
+        while index < len(batch):
+            try:
+                sent = self.socket.sendmsg(batch[index:index + IOV_MAX])
+            except socket.timeout:
+                # Timeout recv dari thread handler juga berlaku untuk send; coba lagi
+                if self._closed:
+                    return
+                continue
+            self.syscalls += 1
+            self.bytes_sent += sent
+            if sent:
+                self.last_progress = time.monotonic()
+            while sent:
+                length = len(batch[index])
+                if sent >= length:
+                    sent -= length
+                    index += 1
+                else:
+                    # Partial write: sisa buffer sebagai memoryview, tanpa copy
+                    batch[index] = memoryview(batch[index])[sent:]
+                    sent = 0
+        self.frames_sent += frames
+
+    def _sendall(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            try:
+                sent = self.socket.send(view)
+            except socket.timeout:
+                if self._closed:
+                    return
+                continue
+            self.syscalls += 1
+            self.bytes_sent += sent
+            if sent:
+                self.last_progress = time.monotonic()
+            view = view[sent:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "syscalls": self.syscalls,
+            "pending_bytes": self._pending_bytes
+        }
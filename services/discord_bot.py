@@ -1,11 +1,22 @@
 import asyncio
+import math
 import discord
+from datetime import datetime, timezone
 from discord.ext import commands
 from typing import Optional
 from config import BotConfig
+from models.channel import MonitoredChannel
+from models.message import DiscordMessage
 from services.channel_manager import ChannelManager
+from services.gap_recovery import GapRecovery
+from services.history_backfill import HistoryBackfill, parse_since
+from services.message_dispatcher import MessageDispatcher
 from services.message_processor import MessageProcessor
+from services.recent_cache import RecentMessageCache
 from services.socket_server import SocketServer
+from services.spam_filter import SpamFilter
+from services.status_cache import StatusCache
+from services.traffic_capture import TrafficRecorder
 from utils.logger import Logger
 
 
@@ -13,11 +24,23 @@ class DiscordBot:
     """Discord Bot service yang sederhana"""
     
     def __init__(self, config: BotConfig, channel_manager: ChannelManager, 
-                 message_processor: MessageProcessor, socket_server: SocketServer):
+                 message_processor: MessageProcessor, socket_server: SocketServer,
+                 dispatcher: Optional[MessageDispatcher] = None,
+                 backfill: Optional[HistoryBackfill] = None,
+                 gap_recovery: Optional[GapRecovery] = None,
+                 spam_filter: Optional[SpamFilter] = None,
+                 recent_cache: Optional[RecentMessageCache] = None,
+                 recorder: Optional[TrafficRecorder] = None):
         self.config = config
         self.channel_manager = channel_manager
         self.message_processor = message_processor
         self.socket_server = socket_server
+        self.dispatcher = dispatcher
+        self.backfill = backfill
+        self.gap_recovery = gap_recovery
+        self.spam_filter = spam_filter
+        self.recent_cache = recent_cache
+        self.recorder = recorder
         self.logger = Logger.get_logger(self.__class__.__name__, config.log_file, config.log_level)
         
         # Setup bot
@@ -25,7 +48,21 @@ class DiscordBot:
         intents.message_content = True
         intents.guilds = True
         intents.members = True
-        self.bot = commands.Bot(command_prefix=config.command_prefix, intents=intents)
+        # Edit/delete ditangani lewat raw events, jadi message cache bisa kecil
+        self.bot = commands.Bot(
+            command_prefix=config.command_prefix,
+            intents=intents,
+            max_messages=config.message_cache_size or None
+        )
+        
+        self.status_cache = StatusCache(
+            channel_manager, socket_server, self.bot.get_channel,
+            refresh_interval=config.status_refresh_interval
+        )
+        self.message_processor.add_broadcaster(self.status_cache.observe)
+        # Didaftarkan sekali di sini, bukan di on_ready (yang terpanggil lagi setiap reconnect
+        # tanpa resume); sebelum server jalan message tetap masuk replay buffer
+        self.message_processor.add_broadcaster(self.socket_server.broadcast_message)
         
         self._register_events()
         self._register_commands()
@@ -36,24 +73,106 @@ class DiscordBot:
         @self.bot.event
         async def on_ready():
             self.logger.info(f'{self.bot.user} connected!')
-            await self.socket_server.start()
-            self.message_processor.add_broadcaster(self.socket_server.broadcast_message)
+            # on_ready bisa terpanggil berkali-kali, jadi semua langkah di sini harus idempotent
+            if not self.socket_server.server_running:
+                await self.socket_server.start()
+            if self.dispatcher:
+                await self.dispatcher.start()
+            if self.backfill:
+                await self.backfill.resume(self.bot.get_channel)
+            await self._recover_gap()
+        
+        @self.bot.event
+        async def on_resumed():
+            self.logger.info("Gateway session resumed")
+            await self._recover_gap()
         
         @self.bot.event
         async def on_message(message):
             if message.author != self.bot.user and self.channel_manager.is_monitored(message.channel.id):
-                await self.message_processor.process_message(message, "NEW")
+                # Skip message yang sudah dikirim oleh gap recovery
+                if not self.gap_recovery or self.gap_recovery.mark_seen(message.channel.id, message.id):
+                    await self._submit_message(message, "NEW")
             await self.bot.process_commands(message)
         
         @self.bot.event
-        async def on_message_edit(before, after):
-            if self.channel_manager.is_monitored(after.channel.id):
-                await self.message_processor.process_message(after, "EDITED")
+        async def on_raw_message_edit(payload):
+            if not self.channel_manager.is_monitored(payload.channel_id):
+                return
+            # Update tanpa edited_timestamp adalah embed unfurl, bukan edit user
+            if payload.data.get('edited_timestamp') is None:
+                return
+            
+            message = getattr(payload, 'message', None)  # discord.py >= 2.5
+            if message is not None:
+                await self._submit_message(message, "EDITED")
+                return
+            
+            message_data = DiscordMessage.from_raw_event(
+                "EDITED", payload.channel_id, payload.guild_id,
+                channel=self.bot.get_channel(payload.channel_id),
+                data=payload.data,
+                message_id=payload.message_id
+            )
+            await self._submit(message_data)
+        
+        @self.bot.event
+        async def on_raw_message_delete(payload):
+            if not self.channel_manager.is_monitored(payload.channel_id):
+                return
+            
+            if payload.cached_message is not None:
+                await self._submit_message(payload.cached_message, "DELETED")
+                return
+            
+            message_data = DiscordMessage.from_raw_event(
+                "DELETED", payload.channel_id, payload.guild_id,
+                channel=self.bot.get_channel(payload.channel_id),
+                message_id=payload.message_id
+            )
+            await self._submit(message_data)
         
         @self.bot.event
-        async def on_message_delete(message):
-            if self.channel_manager.is_monitored(message.channel.id):
-                await self.message_processor.process_message(message, "DELETED")
+        async def on_raw_bulk_message_delete(payload):
+            if not self.channel_manager.is_monitored(payload.channel_id):
+                return
+            
+            # Satu event untuk semua message, bukan N kali process
+            message_data = DiscordMessage.from_raw_event(
+                "BULK_DELETED", payload.channel_id, payload.guild_id,
+                channel=self.bot.get_channel(payload.channel_id),
+                message_ids=sorted(payload.message_ids)
+            )
+            await self._submit(message_data)
+    
+    async def _recover_gap(self) -> None:
+        """Ambil message yang terlewat selama disconnect di background"""
+        if not self.gap_recovery:
+            return
+        await self.gap_recovery.start()
+        self.gap_recovery.schedule(
+            self.channel_manager.get_monitored_channels(), self.bot.get_channel, self._submit
+        )
+    
+    async def _submit_message(self, message, message_type: str) -> None:
+        """Convert discord.Message lalu submit ke pipeline"""
+        try:
+            message_data = DiscordMessage.from_discord_message(message, message_type)
+        except Exception as e:
+            self.logger.error(f"Error converting message: {e}")
+            return
+        await self._submit(message_data)
+    
+    async def _submit(self, message_data: DiscordMessage) -> None:
+        """Submit event ke dispatcher, atau proses inline jika dispatcher tidak aktif"""
+        if self.recorder:
+            self.recorder.record(message_data)
+        if self.spam_filter and not self.spam_filter.check(message_data):
+            return
+        if self.dispatcher and self.dispatcher.is_running:
+            await self.dispatcher.dispatch(message_data)
+        else:
+            await self.message_processor.process_event(message_data)
     
     def _register_commands(self):
         """Register bot commands"""
@@ -62,7 +181,9 @@ class DiscordBot:
         async def listen(ctx, channel_id: Optional[int] = None):
             """Monitor channel untuk pesan"""
             target_id = channel_id or ctx.channel.id
-            success = self.channel_manager.add_channel(target_id)
+            channel = self.bot.get_channel(target_id)
+            info = MonitoredChannel.from_discord_channel(channel) if channel else None
+            success = await self.channel_manager.add_channel(target_id, info)
             msg = f"{'Started' if success else 'Already'} monitoring <#{target_id}>"
             await ctx.send(msg)
         
@@ -70,39 +191,139 @@ class DiscordBot:
         async def unlisten(ctx, channel_id: Optional[int] = None):
             """Stop monitoring channel"""
             target_id = channel_id or ctx.channel.id
-            success = self.channel_manager.remove_channel(target_id)
+            success = await self.channel_manager.remove_channel(target_id)
             msg = f"{'Stopped' if success else 'Not'} monitoring <#{target_id}>"
             await ctx.send(msg)
         
-        @self.bot.command(name='ping')
-        async def ping(ctx):
-            """Ping bot"""
-            await ctx.send('Pong!')
+        @self.bot.command()
+        @commands.guild_only()
+        async def listen_guild(ctx):
+            """Monitor semua text channel di guild ini"""
+            channels = [MonitoredChannel.from_discord_channel(ch) for ch in ctx.guild.text_channels]
+            added = await self.channel_manager.add_channels(channels)
+            await ctx.send(f"Started monitoring {added} channels in {ctx.guild.name}")
         
         @self.bot.command()
-        async def status(ctx):
-            """Show monitoring status"""
-            channels = self.channel_manager.get_monitored_channels()
-            
-            if not channels:
-                await ctx.send("No channels monitored")
+        @commands.guild_only()
+        async def unlisten_guild(ctx):
+            """Stop monitoring semua channel di guild ini"""
+            removed = await self.channel_manager.remove_guild(ctx.guild.id)
+            await ctx.send(f"Stopped monitoring {removed} channels in {ctx.guild.name}")
+        
+        @self.bot.command()
+        async def listen_category(ctx, category_id: int):
+            """Monitor semua text channel dalam satu category"""
+            category = self.bot.get_channel(category_id)
+            if not isinstance(category, discord.CategoryChannel):
+                await ctx.send(f"Category {category_id} not found")
+                return
+            channels = [MonitoredChannel.from_discord_channel(ch) for ch in category.text_channels]
+            added = await self.channel_manager.add_channels(channels)
+            await ctx.send(f"Started monitoring {added} channels in {category.name}")
+        
+        @self.bot.command()
+        async def unlisten_category(ctx, category_id: int):
+            """Stop monitoring semua channel dalam satu category"""
+            removed = await self.channel_manager.remove_category(category_id)
+            await ctx.send(f"Stopped monitoring {removed} channels in category {category_id}")
+        
+        @self.bot.command()
+        async def backfill(ctx, channel: discord.TextChannel, since: Optional[str] = None):
+            """Ambil history channel ke storage (since: 2024-01-31, 7d, 12h)"""
+            if not self.backfill:
+                await ctx.send("Backfill requires a storage backend")
+                return
+            if self.backfill.is_running(channel.id):
+                await ctx.send(f"Backfill of {channel.mention} is already running")
+                return
+            try:
+                since_dt = parse_since(since)
+            except ValueError:
+                await ctx.send(f"Invalid since '{since}', use a date (2024-01-31) or duration (7d, 12h)")
                 return
             
-            channel_list = []
-            for ch_id in channels:
-                channel = self.bot.get_channel(ch_id)
-                name = channel.name if channel else "Unknown"
-                channel_list.append(f"• {name} ({ch_id})")
+            # Message setelah channel mulai di-monitor sudah ditangkap live
+            info = self.channel_manager.get_channel_info(channel.id)
+            until = None
+            if info and self.channel_manager.is_monitored(channel.id):
+                until = datetime.fromisoformat(info.added_at).replace(tzinfo=timezone.utc)
             
-            status = [
-                "**Status:**",
-                f"Socket: {'Running' if self.socket_server.is_running else 'Stopped'}",
-                f"Clients: {self.socket_server.client_count}",
-                f"Channels ({len(channels)}):",
-                *channel_list
-            ]
+            async def report(job):
+                if job['done']:
+                    await ctx.send(f"Backfill of {channel.mention} done: {job['saved']} messages")
+                else:
+                    await ctx.send(f"Backfill of {channel.mention} stopped: {job['error']}")
             
-            await ctx.send("\n".join(status))
+            job = self.backfill.start(channel, since_dt, until, on_finished=report)
+            origin = f"from message {job['cursor']}" if job['cursor'] else f"since {job['since'] or 'the beginning'}"
+            await ctx.send(f"Backfilling {channel.mention} {origin}")
+        
+        @backfill.error
+        async def backfill_error(ctx, error):
+            if isinstance(error, (commands.BadArgument, commands.MissingRequiredArgument)):
+                await ctx.send("Usage: backfill <channel> [since]")
+            else:
+                self.logger.error(f"Backfill command error: {error}")
+        
+        @self.bot.command()
+        async def spamstats(ctx):
+            """Show statistik spam filter"""
+            if not self.spam_filter:
+                await ctx.send("Spam filter is disabled")
+                return
+            stats = self.spam_filter.get_stats()
+            reasons = ", ".join(f"{name}: {count}" for name, count in stats['reasons'].items()) or "none"
+            await ctx.send(
+                f"**Spam filter** ({stats['action']})\n"
+                f"Checked: {stats['checked']} | Flagged: {stats['flagged']} | Dropped: {stats['dropped']}\n"
+                f"Reasons: {reasons}\n"
+                f"Memory: {stats['memory_bytes'] // 1024} KiB"
+            )
+        
+        @self.bot.command()
+        async def cachestats(ctx):
+            """Show statistik recent message cache"""
+            if not self.recent_cache:
+                await ctx.send("Recent cache is disabled")
+                return
+            stats = self.recent_cache.get_stats()
+            hit_ratio = f"{stats['hit_ratio']:.1%}" if stats['hit_ratio'] is not None else "n/a"
+            await ctx.send(
+                f"**Recent cache** ({stats['channels']} channels, {stats['messages']} messages)\n"
+                f"Hits: {stats['hits']} | Misses: {stats['misses']} | Hit ratio: {hit_ratio}\n"
+                f"Storage loads: {stats['storage_loads']} | Redis hits: {stats['redis_hits']} | "
+                f"Evictions: {stats['evictions']}"
+            )
+        
+        @self.bot.command()
+        async def logstats(ctx):
+            """Show statistik logging (queue dan log yang di-sample)"""
+            stats = Logger.get_stats()
+            samplers = "\n".join(
+                f"{name}: {counts['allowed']} logged, {counts['suppressed']} suppressed"
+                for name, counts in stats['samplers'].items()
+            ) or "none"
+            await ctx.send(
+                f"**Logging** (queued: {stats['queued']}, dropped: {stats['dropped']})\n{samplers}"
+            )
+        
+        @self.bot.command(name='ping')
+        async def ping(ctx):
+            """Ping bot"""
+            await ctx.send('Pong!')
+        
+        @self.bot.command()
+        @commands.cooldown(1, 5, commands.BucketType.channel)
+        async def status(ctx, page: int = 1):
+            """Show monitoring status (paginated)"""
+            await ctx.send(await self.status_cache.get_page(page))
+        
+        @status.error
+        async def status_error(ctx, error):
+            if isinstance(error, commands.CommandOnCooldown):
+                await ctx.send(f"Status is on cooldown, try again in {error.retry_after:.0f}s")
+            else:
+                self.logger.error(f"Status command error: {error}")
     
     async def start(self):
         """Start bot"""
@@ -115,6 +336,22 @@ class DiscordBot:
     async def stop(self):
         """Stop bot"""
         try:
+            if self.backfill:
+                await self.backfill.stop()
             await self.bot.close()
+            if self.gap_recovery:
+                await self.gap_recovery.stop()
+            if self.dispatcher:
+                await self.dispatcher.stop()
         except Exception as e:
-            self.logger.error(f"Stop error: {e}")
\ No newline at end of file
+            self.logger.error(f"Stop error: {e}")
+    
+    @property
+    def is_connected(self) -> bool:
+        """Check apakah gateway connected dan bot sudah ready"""
+        return self.bot.is_ready() and not self.bot.is_closed() and math.isfinite(self.bot.latency)
+    
+    @property
+    def latency(self) -> Optional[float]:
+        """Gateway heartbeat latency (detik), None jika belum ada"""
+        return self.bot.latency if math.isfinite(self.bot.latency) else None
@@ -0,0 +1,498 @@
+import asyncio
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config import EventLogConfig
+from models.message import DiscordMessage
+from utils.logger import Logger
+
+# Setiap record: offset (u64), panjang payload (u32), crc32 payload (u32), lalu payload JSON
+RECORD_HEADER = struct.Struct('>QII')
+# Sparse index per segment: offset relatif terhadap base segment (u32), posisi byte di file .log (u32)
+INDEX_ENTRY = struct.Struct('>II')
+
+LOG_SUFFIX = '.log'
+INDEX_SUFFIX = '.index'
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+def segment_path(directory: str, base_offset: int, suffix: str) -> Path:
+    """Nama file segment = offset record pertamanya, zero-padded supaya urut secara leksikal"""
+    return Path(directory) / f"{base_offset:020d}{suffix}"
+
+
+def list_segments(directory: str) -> List[int]:
+    """Base offset semua segment di directory, urut naik"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-len(LOG_SUFFIX)]) for name in names
+                  if name.endswith(LOG_SUFFIX) and name[:-len(LOG_SUFFIX)].isdigit())
+
+
+def scan_records(data, position: int, expected_offset: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+    """
+    Iterasi record valid di buffer mulai dari position
+
+    Berhenti di record yang belum lengkap (masih ditulis), crc-nya salah
+    (torn write saat crash) atau offset-nya tidak berurutan.
+
+    Yields:
+        tuple: (offset, posisi payload, panjang payload)
+    """
+    size = len(data)
+    while position + RECORD_HEADER.size <= size:
+        offset, length, crc = RECORD_HEADER.unpack_from(data, position)
+        start = position + RECORD_HEADER.size
+        if start + length > size or (expected_offset is not None and offset != expected_offset):
+            return
+        if zlib.crc32(data[start:start + length]) != crc:
+            return
+        yield offset, start, length
+        position = start + length
+        expected_offset = offset + 1
+
+
+class EventLog:
+    """
+    Append-only event log yang dibagi menjadi segment berukuran tetap
+
+    Setiap message yang diproses mendapat offset berurutan yang tetap berlaku
+    setelah restart. Segment aktif di-roll saat mencapai segment_bytes;
+    setiap index_interval_bytes satu entry ditambahkan ke sparse index
+    segment, sehingga EventLogReader bisa lompat ke offset mana pun dengan
+    binary search. Retention menghapus segment lama berdasarkan total ukuran
+    dan umur. fsync: "always" (per record, di thread), "interval" (background
+    setiap fsync_interval detik) atau "never" (diserahkan ke OS).
+    """
+
+    def __init__(self, config: EventLogConfig):
+        """
+        Initialize event log
+
+        Args:
+            config: Konfigurasi event log
+        """
+        if config.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown EVENT_LOG_FSYNC policy: {config.fsync}")
+        self.config = config
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._segments: List[int] = []
+        self._log_fd: Optional[int] = None
+        self._index_fd: Optional[int] = None
+        self._base_offset = 0
+        self._position = 0
+        self._indexed_position = 0
+        self._next_offset = 0
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # Stats tracking
+        self._appended = 0
+        self._bytes_written = 0
+        self._fsyncs = 0
+        self._segments_deleted = 0
+        self._truncated_bytes = 0
+
+    @property
+    def next_offset(self) -> int:
+        """Offset yang akan dipakai record berikutnya"""
+        return self._next_offset
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.open)
+        if self.config.fsync == 'interval':
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def open(self) -> None:
+        """Buka segment terakhir (atau buat yang pertama) dan pulihkan ekor yang terpotong"""
+        Path(self.config.directory).mkdir(parents=True, exist_ok=True)
+        self._segments = list_segments(self.config.directory)
+        if not self._segments:
+            self._open_segment(0)
+            return
+        self._recover(self._segments[-1])
+        self.logger.info(
+            f"Opened event log {self.config.directory}: {len(self._segments)} segments, "
+            f"next offset {self._next_offset}"
+        )
+
+    def _recover(self, base_offset: int) -> None:
+        """
+        Validasi segment aktif dari index entry terakhir yang valid
+
+        Index yang menunjuk melewati akhir log dan record yang tidak lengkap
+        di ekor (crash saat append) dibuang, jadi append berikutnya selalu
+        melanjutkan record terakhir yang utuh.
+        """
+        log_path = segment_path(self.config.directory, base_offset, LOG_SUFFIX)
+        index_path = segment_path(self.config.directory, base_offset, INDEX_SUFFIX)
+        data = log_path.read_bytes()
+        index = index_path.read_bytes() if index_path.exists() else b""
+
+        entries = len(index) // INDEX_ENTRY.size
+        position, offset = 0, base_offset
+        while entries:
+            relative, entry_position = INDEX_ENTRY.unpack_from(index, (entries - 1) * INDEX_ENTRY.size)
+            if entry_position < len(data):
+                position, offset = entry_position, base_offset + relative
+                break
+            entries -= 1
+
+        for record_offset, start, length in scan_records(data, position, offset):
+            position = start + length
+            offset = record_offset + 1
+
+        if position < len(data):
+            self._truncated_bytes += len(data) - position
+            self.logger.warning(
+                f"Truncating {len(data) - position} bytes of incomplete records from {log_path.name}"
+            )
+            os.truncate(log_path, position)
+        if len(index) != entries * INDEX_ENTRY.size:
+            with open(index_path, 'ab') as f:
+                f.truncate(entries * INDEX_ENTRY.size)
+
+        self._open_segment(base_offset, position, offset)
+        self._indexed_position = (
+            INDEX_ENTRY.unpack_from(index, (entries - 1) * INDEX_ENTRY.size)[1] if entries else 0
+        )
+
+    def _open_segment(self, base_offset: int, position: int = 0, next_offset: Optional[int] = None) -> None:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        self._log_fd = os.open(segment_path(self.config.directory, base_offset, LOG_SUFFIX), flags, 0o644)
+        self._index_fd = os.open(segment_path(self.config.directory, base_offset, INDEX_SUFFIX), flags, 0o644)
+        self._base_offset = base_offset
+        self._position = position
+        self._indexed_position = 0
+        self._next_offset = base_offset if next_offset is None else next_offset
+        if base_offset not in self._segments:
+            self._segments.append(base_offset)
+
+    def append(self, payload: bytes) -> int:
+        """
+        Tulis satu record (thread-safe)
+
+        Returns:
+            int: Offset record
+        """
+        with self._lock:
+            if self._log_fd is None:
+                raise RuntimeError("Event log is not open")
+            record_size = RECORD_HEADER.size + len(payload)
+            if self._position and self._position + record_size > self.config.segment_bytes:
+                self._roll()
+
+            offset = self._next_offset
+            # Entry pertama setiap segment selalu di-index (posisi 0)
+            if self._position == 0 or self._position - self._indexed_position >= self.config.index_interval_bytes:
+                os.write(self._index_fd, INDEX_ENTRY.pack(offset - self._base_offset, self._position))
+                self._indexed_position = self._position
+            os.write(self._log_fd, RECORD_HEADER.pack(offset, len(payload), zlib.crc32(payload)) + payload)
+
+            self._position += record_size
+            self._next_offset = offset + 1
+            self._appended += 1
+            self._bytes_written += record_size
+            self._dirty = True
+            if self.config.fsync == 'always':
+                self._fsync()
+            return offset
+
+    async def append_message(self, message_data: DiscordMessage) -> int:
+        """Serialize dan tulis DiscordMessage; fsync "always" dijalankan di thread"""
+        payload = json.dumps(message_data.to_dict(), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        if self.config.fsync == 'always':
+            return await asyncio.to_thread(self.append, payload)
+        return self.append(payload)
+
+    def _roll(self) -> None:
+        """Tutup segment aktif dan mulai segment baru (dipanggil dengan lock)"""
+        if self.config.fsync != 'never':
+            self._fsync()
+        os.close(self._log_fd)
+        os.close(self._index_fd)
+        self._open_segment(self._next_offset)
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        """Hapus segment tertua yang melewati batas ukuran atau umur (segment aktif tidak pernah dihapus)"""
+        retention_seconds = self.config.retention_hours * 3600
+        sizes = {
+            base: segment_path(self.config.directory, base, LOG_SUFFIX).stat().st_size
+            for base in self._segments[:-1]
+        }
+        total = sum(sizes.values()) + self._position
+        now = time.time()
+        while len(self._segments) > 1:
+            base = self._segments[0]
+            log_path = segment_path(self.config.directory, base, LOG_SUFFIX)
+            over_size = self.config.retention_bytes and total > self.config.retention_bytes
+            # Umur segment = waktu record terakhirnya ditulis
+            expired = retention_seconds and now - log_path.stat().st_mtime > retention_seconds
+            if not over_size and not expired:
+                break
+            log_path.unlink(missing_ok=True)
+            segment_path(self.config.directory, base, INDEX_SUFFIX).unlink(missing_ok=True)
+            self._segments.pop(0)
+            total -= sizes[base]
+            self._segments_deleted += 1
+            self.logger.info(f"Deleted event log segment {base} by retention")
+
+    def _fsync(self) -> None:
+        os.fsync(self._log_fd)
+        os.fsync(self._index_fd)
+        self._dirty = False
+        self._fsyncs += 1
+
+    def flush(self) -> None:
+        """fsync segment aktif jika ada record yang belum di-fsync"""
+        with self._lock:
+            if self._log_fd is not None and self._dirty:
+                self._fsync()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.fsync_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except OSError as e:
+                self.logger.error(f"Error syncing event log: {e}")
+
+    async def close(self) -> None:
+        """Stop fsync loop, fsync terakhir dan tutup segment aktif"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        with self._lock:
+            if self._log_fd is None:
+                return
+            if self.config.fsync != 'never':
+                self._fsync()
+            os.close(self._log_fd)
+            os.close(self._index_fd)
+            self._log_fd = self._index_fd = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event log statistics"""
+        return {
+            "directory": self.config.directory,
+            "fsync": self.config.fsync,
+            "segments": len(self._segments),
+            "first_offset": self._segments[0] if self._segments else 0,
+            "next_offset": self._next_offset,
+            "appended": self._appended,
+            "bytes_written": self._bytes_written,
+            "fsyncs": self._fsyncs,
+            "segments_deleted": self._segments_deleted,
+            "truncated_bytes": self._truncated_bytes
+        }
+
+
+class EventLogReader:
+    """
+    Reader event log berbasis mmap
+
+    Bisa dipakai dari proses lain selagi EventLog menulis (record yang belum
+    lengkap di ekor diabaikan sampai selesai ditulis). Lompat ke offset:
+    binary search base offset segment, lalu binary search sparse index
+    segment, lalu scan maksimal index_interval_bytes.
+
+    Pemakaian:
+
+        with EventLogReader("data/event_log") as reader:
+            for offset, message in reader.iter_messages(start_offset):
+                ...
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # base offset -> (ukuran file saat di-map, mmap log, mmap index)
+        self._maps: Dict[int, Tuple[int, Optional[mmap.mmap], Optional[mmap.mmap]]] = {}
+        # base offset -> timestamp record pertama (segment tidak berubah di awal)
+        self._first_timestamps: Dict[int, str] = {}
+
+    def _segments(self) -> List[int]:
+        segments = list_segments(self.directory)
+        # Segment yang sudah dihapus retention tidak di-map lagi
+        for base in set(self._maps) - set(segments):
+            self._unmap(base)
+            self._first_timestamps.pop(base, None)
+        return segments
+
+    @staticmethod
+    def _mmap_file(path: Path) -> Tuple[int, Optional[mmap.mmap]]:
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                # File kosong tidak bisa di-mmap
+                return size, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except FileNotFoundError:
+            return 0, None
+
+    def _map(self, base: int) -> Tuple[Optional[mmap.mmap], Optional[mmap.mmap]]:
+        """mmap log dan index segment, di-map ulang jika file sudah bertambah"""
+        log_path = segment_path(self.directory, base, LOG_SUFFIX)
+        try:
+            size = log_path.stat().st_size
+        except FileNotFoundError:
+            return None, None
+        cached = self._maps.get(base)
+        if cached is not None and cached[0] == size:
+            return cached[1], cached[2]
+        self._unmap(base)
+        size, log_map = self._mmap_file(log_path)
+        _, index_map = self._mmap_file(segment_path(self.directory, base, INDEX_SUFFIX))
+        self._maps[base] = (size, log_map, index_map)
+        return log_map, index_map
+
+    def _unmap(self, base: int) -> None:
+        # Tidak di-close: read() yang sedang berjalan mungkin masih memakai map lama
+        # (segment sudah dihapus retention atau file bertambah); mmap ditutup saat
+        # referensi terakhirnya hilang, dan data file yang sudah di-unlink tetap valid
+        self._maps.pop(base, None)
+
+    @staticmethod
+    def _seek(index_map: Optional[mmap.mmap], base: int, offset: int) -> Tuple[int, int]:
+        """Binary search index: posisi entry terakhir dengan offset <= target"""
+        if index_map is None:
+            return 0, base
+        low, high = 0, len(index_map) // INDEX_ENTRY.size - 1
+        position, found = 0, base
+        while low <= high:
+            middle = (low + high) // 2
+            relative, entry_position = INDEX_ENTRY.unpack_from(index_map, middle * INDEX_ENTRY.size)
+            if base + relative <= offset:
+                position, found = entry_position, base + relative
+                low = middle + 1
+            else:
+                high = middle - 1
+        return position, found
+
+    def read(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        """
+        Iterasi record mulai dari offset (atau record tertua jika sudah dihapus retention)
+
+        Yields:
+            tuple: (offset, payload)
+        """
+        segments = self._segments()
+        # Segment terakhir dengan base <= offset
+        low, high = 0, len(segments)
+        while low < high:
+            middle = (low + high) // 2
+            if segments[middle] <= offset:
+                low = middle + 1
+            else:
+                high = middle
+        start = max(low - 1, 0)
+
+        count = 0
+        base = segments[start] if segments else None
+        while base is not None:
+            log_map, index_map = self._map(base)
+            if log_map is not None:
+                position, expected = self._seek(index_map, base, offset) if offset > base else (0, base)
+                for record_offset, payload_start, length in scan_records(log_map, position, expected):
+                    if record_offset < offset:
+                        continue
+                    if limit is not None and count >= limit:
+                        return
+                    yield record_offset, log_map[payload_start:payload_start + length]
+                    count += 1
+                    offset = record_offset + 1
+
+            # Daftar segment dibaca ulang: selama iterasi segment baru bisa di-roll
+            # dan segment lama dihapus retention
+            segments = self._segments()
+            following = next((segment for segment in segments if segment > base), None)
+            if (following is not None and offset < following and base in segments
+                    and self._map(base)[0] is not log_map):
+                # Segment sempat bertambah setelah di-map, lanjutkan sisanya dulu
+                continue
+            base = following
+
+    def iter_messages(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[Tuple[int, dict]]:
+        """Seperti read(), payload di-decode jadi dict message"""
+        for record_offset, payload in self.read(offset, limit):
+            yield record_offset, json.loads(payload)
+
+    def iter_records(self, since: Optional[str] = None) -> Iterator[dict]:
+        """Message dengan timestamp > since (semua jika None), untuk tool seperti archiver"""
+        offset = self.offset_for_timestamp(since) if since else 0
+        for _, message in self.iter_messages(offset):
+            if since is None or message.get('timestamp', '') > since:
+                yield message
+
+    def _first_timestamp(self, base: int) -> Optional[str]:
+        if base not in self._first_timestamps:
+            first = next(self.iter_messages(base, limit=1), None)
+            if first is None:
+                return None
+            self._first_timestamps[base] = first[1].get('timestamp', '')
+        return self._first_timestamps[base]
+
+    def offset_for_timestamp(self, since: str) -> int:
+        """
+        Offset awal untuk membaca message dengan timestamp > since
+
+        Binary search segment berdasarkan timestamp record pertamanya; hasilnya
+        awal segment tersebut, jadi caller tetap memfilter per record. Timestamp
+        hanya hampir urut (dispatcher memproses channel secara paralel), record
+        yang jauh keluar urutan di segment sebelumnya bisa terlewat.
+        """
+        segments = self._segments()
+        low, high = 0, len(segments)
+        while low < high:
+            middle = (low + high) // 2
+            timestamp = self._first_timestamp(segments[middle])
+            if timestamp is not None and timestamp <= since:
+                low = middle + 1
+            else:
+                high = middle
+        if not segments:
+            return 0
+        return segments[max(low - 1, 0)]
+
+    @property
+    def first_offset(self) -> int:
+        segments = self._segments()
+        return segments[0] if segments else 0
+
+    @property
+    def next_offset(self) -> int:
+        """Offset setelah record lengkap terakhir"""
+        segments = self._segments()
+        for base in reversed(segments):
+            log_map, index_map = self._map(base)
+            if log_map is None:
+                continue
+            position, expected = self._seek(index_map, base, 1 << 63)
+            next_offset = expected
+            for record_offset, _, _ in scan_records(log_map, position, expected):
+                next_offset = record_offset + 1
+            return next_offset
+        return 0
+
+    def close(self) -> None:
+        for _, log_map, index_map in self._maps.values():
+            for mapped in (log_map, index_map):
+                if mapped is not None:
+                    mapped.close()
+        self._maps.clear()
+
+    def __enter__(self) -> 'EventLogReader':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import time
+import discord
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional, Set
+from config import GapRecoveryConfig
+from models.message import DiscordMessage
+from utils.atomic_file import atomic_write_text
+from utils.logger import Logger
+from utils.rate_limiter import RateLimiter
+
+
+class GapRecovery:
+    """
+    Service untuk memulihkan message yang terlewat saat gateway terputus
+
+    Message id terakhir per channel dicatat dari on_message dan disimpan
+    berkala ke state file. Setelah on_ready/on_resumed, history setiap
+    monitored channel diambil mulai dari id tersebut (paralel, dibatasi
+    semaphore dan token bucket), lalu dikirim ke pipeline biasa dengan
+    type RECOVERED. Id yang baru dilihat disimpan di set terbatas supaya
+    event yang di-replay gateway tidak diproses dua kali.
+    """
+
+    def __init__(self, config: GapRecoveryConfig):
+        """
+        Initialize gap recovery
+
+        Args:
+            config: Gap recovery configuration
+        """
+        self.config = config
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._last_seen: Dict[int, int] = self._load_state()
+        self._recent_ids: Set[int] = set()
+        self._recent_order: Deque[int] = deque()
+        self._dirty = False
+
+        self._semaphore = asyncio.Semaphore(config.max_concurrent)
+        self._limiter = RateLimiter(config.requests_per_second)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._recovery_task: Optional[asyncio.Task] = None
+
+        # Stats tracking
+        self._recoveries = 0
+        self._recovered_messages = 0
+        self._duplicates_skipped = 0
+        self._truncated_channels = 0
+        self._last_recovery: Optional[Dict[str, Any]] = None
+
+    def _load_state(self) -> Dict[int, int]:
+        try:
+            with open(self.config.state_file, 'r', encoding='utf-8') as f:
+                return {int(channel_id): message_id for channel_id, message_id in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.error(f"Error loading last-seen state: {e}")
+            return {}
+
+    def mark_seen(self, channel_id: int, message_id: int) -> bool:
+        """
+        Catat message yang masuk pipeline
+
+        Returns:
+            bool: False jika message ini sudah pernah dilihat (duplikat)
+        """
+        if message_id in self._recent_ids:
+            self._duplicates_skipped += 1
+            return False
+
+        self._recent_ids.add(message_id)
+        self._recent_order.append(message_id)
+        if len(self._recent_order) > self.config.recent_ids_size:
+            self._recent_ids.discard(self._recent_order.popleft())
+
+        if message_id > self._last_seen.get(channel_id, 0):
+            self._last_seen[channel_id] = message_id
+            self._dirty = True
+        return True
+
+    async def start(self) -> None:
+        """Start flush loop untuk state file"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Tulis last-seen ke state file jika ada perubahan"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        snapshot = {str(channel_id): message_id for channel_id, message_id in self._last_seen.items()}
+        try:
+            await asyncio.to_thread(atomic_write_text, self.config.state_file, json.dumps(snapshot))
+        except Exception as e:
+            self._dirty = True
+            self.logger.error(f"Error saving last-seen state: {e}")
+
+    def schedule(self, channel_ids: Iterable[int], channel_resolver: Callable[[int], Any],
+                 submit: Callable[[DiscordMessage], Awaitable[None]]) -> bool:
+        """
+        Jalankan recovery di background (dipanggil dari on_ready/on_resumed)
+
+        Returns:
+            bool: False jika recovery sebelumnya masih berjalan
+        """
+        if self._recovery_task is not None and not self._recovery_task.done():
+            return False
+        self._recovery_task = asyncio.create_task(self.recover(channel_ids, channel_resolver, submit))
+        return True
+
+    async def recover(self, channel_ids: Iterable[int], channel_resolver: Callable[[int], Any],
+                      submit: Callable[[DiscordMessage], Awaitable[None]]) -> int:
+        """
+        Ambil message setelah last-seen id untuk semua channel, lalu submit ke pipeline
+
+        Message yang dibuat setelah recovery dimulai datang lewat on_message,
+        jadi recovery hanya sampai waktu mulai.
+
+        Returns:
+            int: Jumlah message yang dipulihkan
+        """
+        started = time.monotonic()
+        until = datetime.now(timezone.utc)
+        targets = [
+            (channel, self._last_seen[channel_id])
+            for channel_id in channel_ids
+            if channel_id in self._last_seen and (channel := channel_resolver(channel_id)) is not None
+        ]
+
+        results = await asyncio.gather(
+            *(self._recover_channel(channel, after_id, until, submit) for channel, after_id in targets),
+            return_exceptions=True
+        )
+
+        recovered = 0
+        for (channel, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Gap recovery for #{channel} failed: {result}")
+            else:
+                recovered += result
+
+        self._recoveries += 1
+        self._recovered_messages += recovered
+        self._last_recovery = {
+            "at": until.isoformat(),
+            "channels": len(targets),
+            "messages": recovered,
+            "duration": round(time.monotonic() - started, 2)
+        }
+        self.logger.info(f"Gap recovery checked {len(targets)} channels, recovered {recovered} messages")
+        await self.flush()
+        return recovered
+
+    async def _recover_channel(self, channel, after_id: int, until: datetime,
+                               submit: Callable[[DiscordMessage], Awaitable[None]]) -> int:
+        """Page history satu channel setelah after_id, oldest first"""
+        recovered = 0
+        async with self._semaphore:
+            while recovered < self.config.max_messages_per_channel:
+                limit = min(self.config.page_size, self.config.max_messages_per_channel - recovered)
+                await self._limiter.acquire()
+                page = [
+                    message async for message in channel.history(
+                        limit=limit, after=discord.Object(id=after_id),
+                        before=until, oldest_first=True
+                    )
+                ]
+                for message in page:
+                    if not self.mark_seen(channel.id, message.id):
+                        continue
+                    await submit(DiscordMessage.from_discord_message(
+                        message, "RECOVERED", timestamp=message.created_at.replace(tzinfo=None).isoformat()
+                    ))
+                    recovered += 1
+
+                if len(page) < limit:
+                    return recovered
+                after_id = page[-1].id
+
+        # Sisa gap terlalu besar untuk dikirim ke pipeline live, pakai !backfill
+        self._truncated_channels += 1
+        self.logger.warning(
+            f"Gap in #{channel} exceeds {self.config.max_messages_per_channel} messages, "
+            f"remaining history after {after_id} not recovered"
+        )
+        return recovered
+
+    async def stop(self) -> None:
+        """Stop recovery dan flush loop, lalu simpan state terakhir"""
+        for task in (self._recovery_task, self._flush_task):
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._flush_task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get gap recovery statistics"""
+        return {
+            "tracked_channels": len(self._last_seen),
+            "recoveries": self._recoveries,
+            "recovered_messages": self._recovered_messages,
+            "duplicates_skipped": self._duplicates_skipped,
+            "truncated_channels": self._truncated_channels,
+            "last_recovery": self._last_recovery,
+            "running": self._recovery_task is not None and not self._recovery_task.done()
+        }
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from aiohttp import web
+from config import HealthConfig
+from services.message_dispatcher import MessageDispatcher
+from services.socket_server import SocketServer
+from services.storage_backend import StorageBackend
+from utils.logger import Logger
+
+
+class HealthServer:
+    """
+    HTTP endpoint untuk health check, terpisah dari socket server
+
+    - GET /health: liveness, 200 selama event loop masih merespon
+    - GET /ready: 200 jika gateway connected, socket server listening,
+      storage reachable (jika dikonfigurasi) dan lag di bawah max_lag
+    - GET /metrics: nilai yang sama dalam format Prometheus text
+
+    Semua check hanya membaca state yang sudah ada di memory, jadi probe
+    tidak menyentuh broadcast path maupun database.
+    """
+
+    def __init__(self, config: HealthConfig, discord_bot, socket_server: SocketServer,
+                 storage: Optional[StorageBackend] = None,
+                 dispatcher: Optional[MessageDispatcher] = None):
+        """
+        Initialize health server
+
+        Args:
+            config: Health configuration
+            discord_bot: DiscordBot (is_connected, latency)
+            socket_server: SocketServer
+            storage: Optional storage backend
+            dispatcher: Optional dispatcher untuk pipeline lag
+        """
+        self.config = config
+        self.discord_bot = discord_bot
+        self.socket_server = socket_server
+        self.storage = storage
+        self.dispatcher = dispatcher
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._runner: Optional[web.AppRunner] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._loop_lag = 0.0
+        self._started_at = time.monotonic()
+
+    async def start(self) -> None:
+        """Start HTTP server dan loop lag monitor"""
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get('/health', self._handle_health)
+        app.router.add_get('/ready', self._handle_ready)
+        app.router.add_get('/metrics', self._handle_metrics)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.config.host, self.config.port).start()
+        self._loop_task = asyncio.create_task(self._monitor_loop())
+        self.logger.info(f"Health server listening on {self.config.host}:{self.config.port}")
+
+    async def _monitor_loop(self) -> None:
+        """Ukur loop lag: selisih antara waktu bangun yang diminta dan yang terjadi"""
+        interval = self.config.loop_check_interval
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            self._loop_lag = max(0.0, time.monotonic() - expected)
+
+    def check(self) -> Dict[str, Any]:
+        """Kumpulkan status semua komponen"""
+        storage_ok = self.storage.is_available if self.storage else None
+        pipeline_lag = self.dispatcher.lag if self.dispatcher else 0.0
+        lag = max(pipeline_lag, self._loop_lag)
+
+        checks = {
+            "gateway": {"ok": self.discord_bot.is_connected, "latency": self.discord_bot.latency},
+            "socket_server": {"ok": self.socket_server.is_running, "clients": self.socket_server.client_count},
+            "storage": {
+                "ok": storage_ok,
+                "error": self.storage.last_error if self.storage and not storage_ok else None
+            },
+            "lag": {
+                "ok": lag < self.config.max_lag,
+                "pipeline": round(pipeline_lag, 3),
+                "event_loop": round(self._loop_lag, 3),
+                "pending": sum(queue.qsize() for queue in self.dispatcher.queues) if self.dispatcher else 0
+            }
+        }
+        # Storage yang tidak dikonfigurasi (ok=None) tidak membuat not ready
+        ready = all(check["ok"] is not False for check in checks.values())
+        return {
+            "status": "ready" if ready else "not_ready",
+            "uptime": round(time.monotonic() - self._started_at, 1),
+            "checks": checks
+        }
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "uptime": round(time.monotonic() - self._started_at, 1)})
+
+    async def _handle_ready(self, request: web.Request) -> web.Response:
+        result = self.check()
+        return web.json_response(result, status=200 if result["status"] == "ready" else 503)
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        result = self.check()
+        checks = result["checks"]
+        latency = checks["gateway"]["latency"]
+        socket_stats = self.socket_server.get_stats()
+        metrics = {
+            "listencord_ready": result["status"] == "ready",
+            "listencord_gateway_connected": checks["gateway"]["ok"],
+            "listencord_gateway_latency_seconds": latency if latency is not None else float('nan'),
+            "listencord_socket_server_listening": checks["socket_server"]["ok"],
+            "listencord_socket_clients": checks["socket_server"]["clients"],
+            "listencord_socket_rejected_total": socket_stats["rejected"],
+            "listencord_socket_evicted_total": socket_stats["evicted"],
+            "listencord_storage_available": bool(checks["storage"]["ok"]),
+            "listencord_pipeline_lag_seconds": checks["lag"]["pipeline"],
+            "listencord_event_loop_lag_seconds": checks["lag"]["event_loop"],
+            "listencord_pipeline_pending": checks["lag"]["pending"]
+        }
+        body = "".join(f"{name} {float(value)}\n" for name, value in metrics.items())
+        return web.Response(text=body, content_type='text/plain')
+
+    async def stop(self) -> None:
+        """Stop HTTP server"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
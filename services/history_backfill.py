@@ -0,0 +1,233 @@
+import asyncio
+import json
+import re
+import discord
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config import BackfillConfig
+from models.message import DiscordMessage
+from services.storage_backend import StorageBackend
+from utils.atomic_file import atomic_write_text
+from utils.logger import Logger
+from utils.rate_limiter import RateLimiter
+
+_RELATIVE_SINCE = re.compile(r'^(\d+)([dhm])$')
+_RELATIVE_UNITS = {'d': 'days', 'h': 'hours', 'm': 'minutes'}
+
+
+def parse_since(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse argumen since dari command
+
+    Menerima tanggal ISO (2024-01-31, 2024-01-31T12:00) atau durasi relatif
+    (7d, 12h, 30m). Hasilnya datetime UTC yang timezone-aware.
+    """
+    if not value:
+        return None
+
+    match = _RELATIVE_SINCE.match(value.lower())
+    if match:
+        delta = timedelta(**{_RELATIVE_UNITS[match.group(2)]: int(match.group(1))})
+        return datetime.now(timezone.utc) - delta
+
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class HistoryBackfill:
+    """
+    Service untuk mengambil history channel lewat channel.history() ke storage
+
+    Beberapa channel di-backfill bersamaan (dibatasi semaphore), dan semua
+    request halaman lewat satu token bucket supaya tetap di bawah rate limit
+    Discord dan menyisakan kuota untuk bot. Setiap halaman langsung ditulis
+    lewat save_messages, lalu cursor (message id terakhir) di-checkpoint,
+    jadi restart melanjutkan dari halaman terakhir, bukan dari awal.
+    """
+
+    MAX_RETRIES = 3
+
+    def __init__(self, storage: StorageBackend, config: BackfillConfig):
+        """
+        Initialize backfill service
+
+        Args:
+            storage: Storage backend tujuan
+            config: Backfill configuration
+        """
+        self.storage = storage
+        self.config = config
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._semaphore = asyncio.Semaphore(config.max_concurrent)
+        self._limiter = RateLimiter(config.requests_per_second)
+        self._state_lock = asyncio.Lock()
+        self._jobs: Dict[int, asyncio.Task] = {}
+        self._state: Dict[str, Dict[str, Any]] = self._load_state()
+
+        # Stats tracking
+        self._pages_fetched = 0
+        self._retries = 0
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.config.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.error(f"Error loading backfill state: {e}")
+            return {}
+
+    async def _save_state(self) -> None:
+        async with self._state_lock:
+            await asyncio.to_thread(atomic_write_text, self.config.state_file, json.dumps(self._state, indent=2))
+
+    def is_running(self, channel_id: int) -> bool:
+        """Check apakah backfill channel sedang berjalan"""
+        task = self._jobs.get(channel_id)
+        return task is not None and not task.done()
+
+    def start(self, channel, since: Optional[datetime] = None, until: Optional[datetime] = None,
+              on_finished: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """
+        Mulai (atau lanjutkan) backfill satu channel
+
+        Tanpa since, backfill melanjutkan dari cursor checkpoint sebelumnya
+        (atau dari awal channel jika belum pernah). Dengan since yang berbeda
+        dari job sebelumnya, job dimulai ulang dari since.
+
+        Args:
+            channel: discord channel (TextChannel/Thread) dengan .history()
+            since: Ambil message setelah waktu ini
+            until: Ambil message sebelum waktu ini (default: sekarang)
+            on_finished: Callback saat job selesai atau gagal
+
+        Returns:
+            dict: State job
+        """
+        if self.is_running(channel.id):
+            return self._state[str(channel.id)]
+
+        until = until or datetime.now(timezone.utc)
+        previous = self._state.get(str(channel.id))
+        since_iso = since.isoformat() if since else None
+
+        if previous and (since is None or previous.get('since') == since_iso):
+            job = previous
+            job['until'] = max(job['until'], until.isoformat())
+        else:
+            job = {'since': since_iso, 'until': until.isoformat(), 'cursor': None, 'saved': 0}
+        job.update(channel_id=channel.id, done=False, error=None)
+
+        self._state[str(channel.id)] = job
+        task = asyncio.create_task(self._run(channel, job, on_finished))
+        self._jobs[channel.id] = task
+        task.add_done_callback(lambda _: self._jobs.pop(channel.id, None))
+        return job
+
+    async def resume(self, channel_resolver: Callable[[int], Any]) -> int:
+        """Lanjutkan job yang belum selesai (misal setelah restart)"""
+        resumed = 0
+        for channel_id, job in list(self._state.items()):
+            if job.get('done') or job.get('error') or self.is_running(int(channel_id)):
+                continue
+            channel = channel_resolver(int(channel_id))
+            if channel is None:
+                continue
+            self.start(channel, until=datetime.fromisoformat(job['until']))
+            resumed += 1
+
+        if resumed:
+            self.logger.info(f"Resumed {resumed} backfill jobs")
+        return resumed
+
+    async def _run(self, channel, job: Dict[str, Any],
+                   on_finished: Optional[Callable[[Dict[str, Any]], Awaitable[None]]]) -> None:
+        """Page history dari cursor sampai until, oldest first"""
+        async with self._semaphore:
+            self.logger.info(f"Backfill #{channel} started (cursor {job['cursor']})")
+            until = datetime.fromisoformat(job['until'])
+            since = datetime.fromisoformat(job['since']) if job['since'] else None
+
+            try:
+                while True:
+                    after = discord.Object(id=job['cursor']) if job['cursor'] else since
+                    page = await self._fetch_page(channel, after, until)
+                    if not page:
+                        job['done'] = True
+                        break
+
+                    messages = [
+                        DiscordMessage.from_discord_message(
+                            message, "BACKFILL",
+                            timestamp=message.created_at.replace(tzinfo=None).isoformat()
+                        )
+                        for message in page
+                    ]
+                    if await self.storage.save_messages(messages) < 0:
+                        raise RuntimeError(f"storage write failed: {self.storage.last_error}")
+
+                    job['cursor'] = page[-1].id
+                    job['saved'] += len(messages)
+                    job['updated_at'] = datetime.utcnow().isoformat()
+                    await self._save_state()
+
+                    if len(page) < self.config.page_size:
+                        job['done'] = True
+                        break
+            except asyncio.CancelledError:
+                # Checkpoint sudah tersimpan per halaman, job dilanjutkan saat resume
+                raise
+            except Exception as e:
+                job['error'] = str(e)
+                self.logger.error(f"Backfill #{channel} failed: {e}")
+
+            await self._save_state()
+            if job['done']:
+                self.logger.info(f"Backfill #{channel} done: {job['saved']} messages")
+
+        if on_finished:
+            try:
+                await on_finished(job)
+            except Exception as e:
+                self.logger.error(f"Error reporting backfill result: {e}")
+
+    async def _fetch_page(self, channel, after, until: datetime) -> list:
+        """Ambil satu halaman (satu request), retry untuk error server"""
+        for attempt in range(self.MAX_RETRIES + 1):
+            await self._limiter.acquire()
+            try:
+                # discord.py sendiri menunggu jika kena 429 / bucket habis
+                page = [
+                    message async for message in channel.history(
+                        limit=self.config.page_size, after=after, before=until, oldest_first=True
+                    )
+                ]
+                self._pages_fetched += 1
+                return page
+            except discord.Forbidden:
+                raise
+            except discord.HTTPException as e:
+                if attempt == self.MAX_RETRIES or e.status < 500:
+                    raise
+                self._retries += 1
+                await asyncio.sleep(2 ** attempt)
+        return []
+
+    async def stop(self) -> None:
+        """Cancel semua job yang berjalan (progress sudah di-checkpoint)"""
+        tasks = list(self._jobs.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backfill statistics"""
+        return {
+            "running": sorted(self._jobs),
+            "jobs": len(self._state),
+            "pages_fetched": self._pages_fetched,
+            "retries": self._retries
+        }
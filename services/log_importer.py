@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from models.message import DiscordMessage
+from services.storage_backend import StorageBackend
+from utils.atomic_file import atomic_write_text
+from utils.logger import Logger
+from utils.message_log import iter_log_chunks, parse_log_chunk
+
+
+def parse_messages(block: bytes) -> Tuple[List[DiscordMessage], int]:
+    """
+    Parse satu chunk log jadi DiscordMessage (module-level supaya bisa jalan di process pool)
+
+    Returns:
+        tuple: (messages, jumlah record yang bukan message valid)
+    """
+    messages = []
+    invalid = 0
+    for record in parse_log_chunk(block):
+        try:
+            messages.append(DiscordMessage.from_dict(record))
+        except TypeError:
+            # Record tanpa field wajib
+            invalid += 1
+    return messages, invalid
+
+
+class LogImporter:
+    """
+    Import history dari message log (discord_messages.txt) ke storage backend
+
+    File dibaca per chunk, jadi memory konstan berapapun ukuran log. Chunk
+    berikutnya di-parse (di thread, atau process pool jika workers > 1) selagi
+    chunk sebelumnya ditulis ke storage. Duplikat (document_id yang sudah ada)
+    diabaikan oleh backend, jadi import aman diulang. Byte offset setelah chunk
+    terakhir yang tersimpan dicatat di checkpoint file untuk resume setelah interupsi.
+    """
+
+    def __init__(self, storage: StorageBackend, log_file: str, checkpoint_file: Optional[str] = None,
+                 batch_size: int = 5000, workers: int = 1, progress_interval: float = 5.0):
+        """
+        Initialize importer
+
+        Args:
+            storage: Storage backend tujuan
+            log_file: Path message log
+            checkpoint_file: Path file checkpoint (default: <log_file>.import.json)
+            batch_size: Jumlah record per save_messages
+            workers: Jumlah process untuk parsing (1 = parsing di thread)
+            progress_interval: Interval (detik) log progress
+        """
+        self.storage = storage
+        self.log_file = log_file
+        self.checkpoint_file = checkpoint_file or f"{log_file}.import.json"
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.progress_interval = progress_interval
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        # Stats tracking
+        self._stats = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0, "offset": 0}
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        """Load checkpoint, abaikan jika milik file lain atau file sudah diganti"""
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return {}
+
+        stat = os.stat(self.log_file)
+        if checkpoint.get('inode') != stat.st_ino or checkpoint.get('offset', 0) > stat.st_size:
+            self.logger.warning(f"Checkpoint {self.checkpoint_file} does not match {self.log_file}, starting over")
+            return {}
+        return checkpoint
+
+    def _save_checkpoint(self) -> None:
+        atomic_write_text(self.checkpoint_file, json.dumps({
+            **self._stats,
+            'log_file': os.path.abspath(self.log_file),
+            'inode': os.stat(self.log_file).st_ino,
+            'updated_at': datetime.utcnow().isoformat()
+        }))
+
+    async def run(self, restart: bool = False) -> Dict[str, Any]:
+        """
+        Jalankan import sampai akhir log
+
+        Args:
+            restart: Abaikan checkpoint dan mulai dari awal file
+
+        Returns:
+            dict: Statistik import
+        """
+        if not await self.storage.initialize():
+            raise RuntimeError(f"Storage not available: {self.storage.last_error}")
+
+        checkpoint = {} if restart else self._load_checkpoint()
+        for key in self._stats:
+            self._stats[key] = checkpoint.get(key, 0)
+
+        start_offset = self._stats['offset']
+        total_size = os.path.getsize(self.log_file)
+        if start_offset:
+            self.logger.info(f"Resuming import of {self.log_file} at byte {start_offset:,} / {total_size:,}")
+
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        chunks = iter_log_chunks(self.log_file, start_offset)
+        # Chunk yang sedang di-parse, diproses berurutan supaya checkpoint monoton
+        in_flight: Deque[Tuple[asyncio.Future, int]] = deque()
+        exhausted = False
+        started = time.monotonic()
+        last_report = started
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) <= self.workers:
+                    item = await asyncio.to_thread(next, chunks, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    block, offset = item
+                    in_flight.append((loop.run_in_executor(executor, parse_messages, block), offset))
+
+                if not in_flight:
+                    break
+
+                future, offset = in_flight.popleft()
+                messages, invalid = await future
+                await self._save(messages)
+                self._stats['read'] += len(messages) + invalid
+                self._stats['invalid'] += invalid
+                self._stats['offset'] = offset
+                await asyncio.to_thread(self._save_checkpoint)
+
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    self._report_progress(start_offset, total_size, now - started)
+                    last_report = now
+        finally:
+            for future, _ in in_flight:
+                future.cancel()
+            chunks.close()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        self._report_progress(start_offset, total_size, elapsed)
+        return {**self._stats, "elapsed": round(elapsed, 2)}
+
+    async def _save(self, messages: List[DiscordMessage]) -> None:
+        """Tulis messages dari satu chunk dalam batch, duplikat dihitung dari selisih row baru"""
+        for index in range(0, len(messages), self.batch_size):
+            batch = messages[index:index + self.batch_size]
+            saved = await self.storage.save_messages(batch)
+            if saved < 0:
+                raise RuntimeError(f"Storage write failed after byte {self._stats['offset']:,}: "
+                                   f"{self.storage.last_error}")
+            self._stats['imported'] += saved
+            self._stats['duplicates'] += len(batch) - saved
+
+    def _report_progress(self, start_offset: int, total_size: int, elapsed: float) -> None:
+        offset = self._stats['offset']
+        percent = offset / total_size * 100 if total_size else 100.0
+        mb_per_sec = (offset - start_offset) / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        self.logger.info(
+            f"Import {percent:5.1f}% ({offset:,}/{total_size:,} bytes, {mb_per_sec:.1f} MB/s) - "
+            f"read {self._stats['read']:,}, imported {self._stats['imported']:,}, "
+            f"duplicates {self._stats['duplicates']:,}, invalid {self._stats['invalid']:,}"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get importer statistics"""
+        return dict(self._stats)
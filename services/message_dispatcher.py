@@ -0,0 +1,161 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+from config import DispatcherConfig
+from models.message import DiscordMessage
+from utils.logger import Logger
+
+
+class MessageDispatcher:
+    """
+    Dispatcher yang membagi event ke sejumlah worker queue berdasarkan channel_id
+
+    Semua event dari channel yang sama masuk ke queue yang sama, jadi urutan
+    per channel tetap terjaga, sedangkan channel berbeda diproses paralel.
+    """
+
+    def __init__(self, handler: Callable[[DiscordMessage], Awaitable[None]], config: DispatcherConfig):
+        """
+        Initialize dispatcher
+
+        Args:
+            handler: Coroutine function yang memproses satu event
+            config: DispatcherConfig object
+        """
+        self.handler = handler
+        self.config = config
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._drop_log = Logger.sampler("dispatcher.dropped")
+        self.queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        # Per worker: (waktu event sekarang mulai diproses, lama event itu menunggu di queue)
+        self._in_flight: List[Optional[Tuple[float, float]]] = []
+
+        # Stats tracking
+        self._dispatched = 0
+        self._processed = 0
+        self._errors = 0
+        self._dropped = 0
+        self._backpressure_waits = 0
+        self._backpressure_seconds = 0.0
+        self._max_depth = 0
+
+    async def start(self) -> None:
+        """Start semua worker"""
+        if self.is_running:
+            return
+
+        worker_count = max(1, self.config.workers)
+        self.queues = [asyncio.Queue(maxsize=self.config.queue_size) for _ in range(worker_count)]
+        self._in_flight = [None] * worker_count
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"dispatch-worker-{index}")
+            for index in range(worker_count)
+        ]
+        self.logger.info(f"Message dispatcher started with {worker_count} workers")
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop semua worker, optionally tunggu queue kosong dulu"""
+        if not self.is_running:
+            return
+
+        if drain:
+            await asyncio.gather(*(queue.join() for queue in self.queues))
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.logger.info("Message dispatcher stopped")
+
+    async def dispatch(self, message_data: DiscordMessage) -> bool:
+        """
+        Masukkan event ke queue milik channel-nya
+
+        Returns:
+            bool: False jika event di-drop karena queue penuh
+        """
+        queue = self.queues[self._queue_index(message_data.channel_id)]
+
+        if queue.full():
+            if self.config.drop_when_full:
+                self._dropped += 1
+                if self._drop_log.allow():
+                    self.logger.warning(
+                        f"Dispatch queue full, dropped event from channel {message_data.channel_id}"
+                        f"{self._drop_log.note()}"
+                    )
+                return False
+
+            # Backpressure: tahan gateway handler sampai worker sempat mengejar
+            self._backpressure_waits += 1
+            started = time.monotonic()
+            await queue.put((started, message_data))
+            self._backpressure_seconds += time.monotonic() - started
+        else:
+            queue.put_nowait((time.monotonic(), message_data))
+
+        self._dispatched += 1
+        self._max_depth = max(self._max_depth, queue.qsize())
+        return True
+
+    def _queue_index(self, channel_id: int) -> int:
+        """Pilih queue untuk channel"""
+        # Bit rendah snowflake (increment/worker id) kurang tersebar,
+        # jadi campur dengan bagian timestamp-nya
+        return (channel_id ^ (channel_id >> 22)) % len(self.queues)
+
+    async def _worker(self, index: int) -> None:
+        """Worker loop untuk satu queue"""
+        queue = self.queues[index]
+        while True:
+            enqueued_at, message_data = await queue.get()
+            started = time.monotonic()
+            self._in_flight[index] = (started, started - enqueued_at)
+            try:
+                await self.handler(message_data)
+                self._processed += 1
+            except Exception as e:
+                self._errors += 1
+                self.logger.error(f"Error handling event from channel {message_data.channel_id}: {e}")
+            finally:
+                self._in_flight[index] = None
+                queue.task_done()
+
+    @property
+    def lag(self) -> float:
+        """
+        Umur event tertua yang belum selesai diproses (detik)
+
+        Queue FIFO, jadi event tertua per worker adalah yang sedang diproses:
+        lama menunggu di queue + lama diproses sejauh ini.
+        """
+        now = time.monotonic()
+        return max(
+            (waited + now - started for started, waited in filter(None, self._in_flight)),
+            default=0.0
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get dispatcher statistics"""
+        depths = [queue.qsize() for queue in self.queues]
+        return {
+            "running": self.is_running,
+            "workers": len(self._workers),
+            "queue_size": self.config.queue_size,
+            "queue_depths": depths,
+            "pending": sum(depths),
+            "lag": round(self.lag, 3),
+            "max_depth": self._max_depth,
+            "dispatched": self._dispatched,
+            "processed": self._processed,
+            "errors": self._errors,
+            "dropped": self._dropped,
+            "backpressure_waits": self._backpressure_waits,
+            "backpressure_seconds": round(self._backpressure_seconds, 3)
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Check apakah worker sedang berjalan"""
+        return bool(self._workers)
@@ -1,9 +1,12 @@
 import asyncio
+import logging
 from pathlib import Path
 from typing import Set, List, Callable, Awaitable, Optional
 from models.message import DiscordMessage
 from utils.logger import Logger
-from services.mongo_handler import MongoDBService
+from services.storage_backend import StorageBackend
+from services.attachment_mirror import AttachmentMirror
+from services.event_log import EventLog
 from datetime import datetime
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
 
@@ -13,27 +16,44 @@ class MessageProcessor:
     """Updated message processor dengan MongoDB integration"""
 
 
-    def __init__(self, message_log_file: str, mongodb_service: Optional[MongoDBService] = None):
+    def __init__(self, message_log_file: str, storage: Optional[StorageBackend] = None,
+                 attachment_mirror: Optional[AttachmentMirror] = None,
+                 event_log: Optional[EventLog] = None, text_log: bool = True,
+                 max_pending_saves: int = 2000):
         """
         Initialize message processor
         
         Args:
             message_log_file: Path untuk file log
-            mongodb_service: Optional MongoDB service instance
+            storage: Optional storage backend (MongoDB, PostgreSQL, ...)
+            attachment_mirror: Optional attachment mirror, rewrite URL CDN ke stored copy
+            event_log: Optional segmented event log, setiap message mendapat offset
+            text_log: Tulis message_log_file (bisa dimatikan jika event log aktif)
+            max_pending_saves: Maksimal save storage yang berjalan di background;
+                jika penuh, process_event menunggu (backpressure ke dispatcher)
         """
         self.message_log_file = message_log_file
-        self.mongodb_service = mongodb_service
+        self.storage = storage
+        self.attachment_mirror = attachment_mirror
+        self.event_log = event_log
+        self.text_log = text_log
         self.logger = Logger.get_logger(self.__class__.__name__)
+        # Log per-message di-sample supaya tidak membebani event loop saat traffic tinggi
+        self._event_log = Logger.sampler("processor.events")
+        self._error_log = Logger.sampler("processor.errors")
         self.broadcasters: List[Callable[[DiscordMessage], Awaitable[None]]] = []
+        # Save ke storage tidak ditunggu sebelum broadcast, supaya BatchWriter bisa mengisi batch
+        self._pending_saves: Set[asyncio.Task] = set()
+        self._save_slots = asyncio.Semaphore(max_pending_saves)
         
         # Ensure log directory exists
         Path(message_log_file).parent.mkdir(parents=True, exist_ok=True)
 
         self.logger.info("Initializing message processor...")
 
-        # if self.mongodb_service:
+        # if self.storage:
         #     self.logger.info("MongoDB service provided, will log messages to database")
-        #     if self.mongodb_service.is_available:
+        #     if self.storage.is_available:
         #         self.logger.info("MongoDB service is available")
         # else:
         #     self.logger.warning("No MongoDB service provided, will log messages to file only")
@@ -47,9 +67,9 @@ class MessageProcessor:
         # """Initialize message processor"""
         # self.logger.info("Initializing message processor...")
         
-        # if self.mongodb_service:
-        #     await self.mongodb_service.initialize()
-        #     if self.mongodb_service.is_available:
+        # if self.storage:
+        #     await self.storage.initialize()
+        #     if self.storage.is_available:
         #         self.logger.info("MongoDB service initialized successfully")
         #     else:
         #         self.logger.warning("MongoDB service not available, using file logging only")
@@ -66,65 +86,107 @@ class MessageProcessor:
         try:
             # Create message model
             message_data = DiscordMessage.from_discord_message(discord_message, message_type)
-
-            # Try to save ke database first
-
-            try:
-                # Cek apakah MongoDB service tersedia
-                # if not self.mongodb_service or not self.mongodb_service.is_available:
-                #     raise ConnectionFailure("MongoDB service is not available")
-                await self._log_to_database(message_data)
-                self.logger.debug(f"Message saved to MongoDB: {message_data.channel_id} at {message_data.timestamp}")
-                # self._messages_saved += 1
-            except Exception as e:
-                self.logger.error(f"Error saving to database: {e}")
-                self.logger.warning(
-                    f"Failed to save message to database, falling back to file logging: {self.mongodb_service._last_error}"
-                )
-                # self._errors += 1
-                database_success = False
-                await self._log_to_file(message_data)
+        except Exception as e:
+            self.logger.error(f"Error processing message: {e}")
+            return
+        
+        await self.process_event(message_data)
+    
+    async def process_event(self, message_data: DiscordMessage) -> None:
+        """Process DiscordMessage yang sudah jadi (misal dari raw gateway event)"""
+        message_type = message_data.type
+        try:
+            # Mirror attachment dulu supaya database dan broadcast pakai stored copy
+            if self.attachment_mirror:
+                await self.attachment_mirror.mirror(message_data)
+            
+            # Save ke storage di background, gagal -> fallback ke file
+            if self.storage:
+                await self._save_slots.acquire()
+                task = asyncio.create_task(self._save_in_background(message_data))
+                self._pending_saves.add(task)
+                task.add_done_callback(self._pending_saves.discard)
             
             # Log ke file
             await self._log_to_file(message_data)
+            if self.event_log:
+                await self._log_to_event_log(message_data)
             
             # Broadcast ke semua broadcaster
             await self._broadcast_message(message_data)
             
-            # Log ke console
-            self.logger.info(
-                f"[{message_type}] {message_data.server} #{message_data.channel} - "
-                f"{message_data.author}: {message_data.content[:50]}..."
-            )
+            # Log ke console (di-sample)
+            if self._event_log.allow():
+                self.logger.info(
+                    f"[{message_type}] {message_data.server} #{message_data.channel} - "
+                    f"{message_data.author}: {message_data.content[:50]}...{self._event_log.note()}",
+                    extra={"event_type": message_type, "channel_id": message_data.channel_id,
+                           "message_id": message_data.message_id}
+                )
             
         except Exception as e:
-            self.logger.error(f"Error processing message: {e}")
+            if self._error_log.allow():
+                self.logger.error(f"Error processing message: {e}{self._error_log.note()}")
+    
+    async def _save_in_background(self, message_data: DiscordMessage) -> None:
+        """Save ke storage; jika gagal, pastikan message tetap tercatat di file"""
+        try:
+            if not await self._log_to_database(message_data):
+                if self._error_log.allow():
+                    self.logger.error(
+                        f"Error saving to database, falling back to file logging: "
+                        f"{self.storage.last_error}{self._error_log.note()}"
+                    )
+                # Jika text log aktif, message sudah ada di file
+                if not self.text_log:
+                    await self._log_to_file(message_data, fallback=True)
+        finally:
+            self._save_slots.release()
+    
+    async def flush(self) -> None:
+        """Tunggu semua save storage yang masih berjalan (dipanggil sebelum storage.disconnect)"""
+        if self._pending_saves:
+            await asyncio.gather(*self._pending_saves, return_exceptions=True)
     
     async def _log_to_database(self, message_data: 'DiscordMessage') -> bool:
-        """Log message data ke MongoDB"""
-        # if not self.mongodb_service or not self.mongodb_service.is_available:
+        """Log message data ke storage backend"""
+        # if not self.storage or not self.storage.is_available:
         #     self.logger.warning("MongoDB service not available, skipping database logging")
         #     return False
             
         try:
-            success = await self.mongodb_service.save_message(message_data)
-            if success:
+            if not self.storage:
+                return False
+            success = await self.storage.save_message(message_data)
+            if success and self.logger.isEnabledFor(logging.DEBUG):
                 # self._db_saves += 1
-                self.logger.debug(f"Message saved to MongoDB: {message_data.channel_id} at {message_data.timestamp}")
+                self.logger.debug(f"Message saved to storage: {message_data.channel_id} at {message_data.timestamp}")
             return success
         
         except Exception as e:
-            self.logger.error(f"Error saving to database: {e}")
+            if self._error_log.allow():
+                self.logger.error(f"Error saving to database: {e}{self._error_log.note()}")
             # self._errors += 1
             return False
         
-    async def _log_to_file(self, message_data: DiscordMessage) -> None:
-        """Log message data ke file"""
+    async def _log_to_file(self, message_data: DiscordMessage, fallback: bool = False) -> None:
+        """Log message data ke file (fallback: tetap tulis walaupun text log dimatikan)"""
+        if not self.text_log and not fallback:
+            return
         try:
             with open(self.message_log_file, 'a', encoding='utf-8') as f:
                 f.write(f"{message_data.to_json()}\n{'='*50}\n")
         except Exception as e:
-            self.logger.error(f"Error writing to file: {e}")
+            if self._error_log.allow():
+                self.logger.error(f"Error writing to file: {e}{self._error_log.note()}")
+    
+    async def _log_to_event_log(self, message_data: DiscordMessage) -> None:
+        """Append message ke event log"""
+        try:
+            await self.event_log.append_message(message_data)
+        except Exception as e:
+            if self._error_log.allow():
+                self.logger.error(f"Error writing to event log: {e}{self._error_log.note()}")
     
     async def _broadcast_message(self, message_data: DiscordMessage) -> None:
         """Broadcast message ke semua broadcaster"""
@@ -142,5 +204,5 @@ class MessageProcessor:
         
         # Log errors jika ada
         for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                self.logger.error(f"Broadcaster {i} error: {result}")
+            if isinstance(result, Exception) and self._error_log.allow():
+                self.logger.error(f"Broadcaster {i} error: {result}{self._error_log.note()}")
@@ -1,13 +1,15 @@
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
-from typing import Optional, Dict, Any
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, OperationFailure, BulkWriteError
+from typing import Optional, Dict, Any, List
 from models.message import DiscordMessage
+from services.storage_backend import APPEND_SETTLE_SECONDS, StorageBackend
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from config import MongoDBConfig
+from utils.logger import Logger
 
-class MongoDBService:
+class MongoDBService(StorageBackend):
     """Service untuk mengelola MongoDB operations"""
     
     def __init__(self, config: MongoDBConfig):
@@ -21,7 +23,8 @@ class MongoDBService:
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
         self.collection = None
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._error_log = Logger.sampler("mongodb.errors")
         self._connection_failed = False
         self._is_connected = False
         
@@ -100,9 +103,18 @@ class MongoDBService:
             # Index untuk server_id dan channel_id (untuk filtering)
             await self.collection.create_index([("server_id", 1), ("channel_id", 1)])
             
+            # Index untuk recent messages per channel
+            await self.collection.create_index([("channel_id", 1), ("timestamp", -1)])
+            
             # Index untuk author_id (untuk filtering berdasarkan user)
             await self.collection.create_index("author_id")
             
+            # Index untuk memuat revisi message (RevisionStorage)
+            await self.collection.create_index([("message_id", 1), ("timestamp", 1)])
+            
+            # Index untuk export incremental urut waktu save (iter_appended)
+            await self.collection.create_index([("created_at", 1), ("_id", 1)])
+            
             # Compound index untuk queries yang sering digunakan
             await self.collection.create_index([
                 ("server_id", 1), 
@@ -161,7 +173,8 @@ class MongoDBService:
         try:
             # Ensure connection aktif
             if not await self._ensure_connection():
-                self.logger.error("MongoDB connection not available, cannot save message")
+                if self._error_log.allow():
+                    self.logger.error(f"MongoDB connection not available, cannot save message{self._error_log.note()}")
                 return False
             
             # Convert message data ke dict
@@ -169,14 +182,15 @@ class MongoDBService:
             
             # Add metadata
             message_dict['created_at'] = datetime.utcnow()
-            message_dict['_id'] = f"{message_data.channel_id}_{message_data.timestamp}_{message_data.author_id}"
+            message_dict['_id'] = message_data.document_id()
             
             # Insert ke MongoDB
             result = await self.collection.insert_one(message_dict)
             
             if result.inserted_id:
                 self._messages_saved += 1
-                self.logger.debug(f"Message saved to MongoDB: {result.inserted_id}")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Message saved to MongoDB: {result.inserted_id}")
                 return True
             else:
                 self.logger.error("Failed to save message: No document inserted")
@@ -184,13 +198,66 @@ class MongoDBService:
                 
         except OperationFailure as e:
             self._last_error = str(e)
-            self.logger.error(f"MongoDB operation failed: {e}")
+            if self._error_log.allow():
+                self.logger.error(f"MongoDB operation failed: {e}{self._error_log.note()}")
             return False
         except Exception as e:
             self._last_error = str(e)
-            self.logger.error(f"Unexpected error saving message: {e}")
+            if self._error_log.allow():
+                self.logger.error(f"Unexpected error saving message: {e}{self._error_log.note()}")
             return False
     
+    async def save_messages(self, messages: List['DiscordMessage']) -> int:
+        """
+        Save banyak message dengan satu insert_many
+        
+        Args:
+            messages: List DiscordMessage object
+            
+        Returns:
+            int: Jumlah dokumen baru (duplikat _id diabaikan), -1 jika gagal
+        """
+        if not messages:
+            return 0
+        
+        try:
+            if not await self._ensure_connection():
+                self.logger.error("MongoDB connection not available, cannot save messages")
+                return -1
+            
+            created_at = datetime.utcnow()
+            documents = []
+            for message_data in messages:
+                message_dict = message_data.to_dict()
+                message_dict['created_at'] = created_at
+                message_dict['_id'] = message_data.document_id()
+                documents.append(message_dict)
+            
+            # ordered=False supaya duplikat tidak menghentikan sisa batch
+            result = await self.collection.insert_many(documents, ordered=False)
+            inserted = len(result.inserted_ids)
+            
+        except BulkWriteError as e:
+            write_errors = e.details.get('writeErrors', [])
+            # 11000 = duplicate key, dokumen itu memang sudah tersimpan
+            if any(error.get('code') != 11000 for error in write_errors):
+                self._last_error = str(e)
+                self.logger.error(f"MongoDB bulk write failed: {e}")
+                return -1
+            inserted = e.details.get('nInserted', 0)
+        except OperationFailure as e:
+            self._last_error = str(e)
+            self.logger.error(f"MongoDB operation failed: {e}")
+            return -1
+        except Exception as e:
+            self._last_error = str(e)
+            self.logger.error(f"Unexpected error saving messages: {e}")
+            return -1
+        
+        self._messages_saved += inserted
+        self.logger.debug(f"Saved batch of {inserted}/{len(messages)} messages to MongoDB")
+        return inserted
+    
     async def get_message_count(self) -> int:
         """Get total jumlah messages dalam database"""
         try:
@@ -204,13 +271,14 @@ class MongoDBService:
             self.logger.error(f"Error getting message count: {e}")
             return -1
     
-    async def get_recent_messages(self, limit: int = 10) -> list:
-        """Get recent messages dari database"""
+    async def get_recent_messages(self, limit: int = 10, channel_id: Optional[int] = None) -> list:
+        """Get recent messages dari database (opsional hanya satu channel)"""
         try:
             if not await self._ensure_connection():
                 return []
             
-            cursor = self.collection.find().sort("timestamp", -1).limit(limit)
+            query = {'channel_id': channel_id} if channel_id is not None else {}
+            cursor = self.collection.find(query).sort("timestamp", -1).limit(limit)
             messages = await cursor.to_list(length=limit)
             
             return messages
@@ -219,6 +287,48 @@ class MongoDBService:
             self.logger.error(f"Error getting recent messages: {e}")
             return []
     
+    async def iter_messages(self, since: Optional[str] = None, batch_size: int = 1000):
+        """Stream messages urut timestamp (terlama dulu)"""
+        if not await self._ensure_connection():
+            raise ConnectionFailure(f"MongoDB not available: {self._last_error}")
+        
+        query = {'timestamp': {'$gt': since}} if since else {}
+        cursor = self.collection.find(query, {'created_at': 0}).sort("timestamp", 1).batch_size(batch_size)
+        async for document in cursor:
+            document.pop('_id', None)
+            yield document
+    
+    async def iter_appended(self, after: Optional[list] = None, batch_size: int = 1000):
+        """
+        Stream messages urut created_at (waktu save), cursor = [created_at, _id]
+
+        Dokumen yang lebih baru dari APPEND_SETTLE_SECONDS belum dikembalikan
+        supaya batch yang masih ditulis worker lain tidak terlewat cursor.
+        """
+        if not await self._ensure_connection():
+            raise ConnectionFailure(f"MongoDB not available: {self._last_error}")
+        
+        conditions = [{'created_at': {'$lte': datetime.utcnow() - timedelta(seconds=APPEND_SETTLE_SECONDS)}}]
+        if after:
+            after_ts, after_id = datetime.fromisoformat(after[0]), after[1]
+            conditions.append({'$or': [
+                {'created_at': {'$gt': after_ts}},
+                {'created_at': after_ts, '_id': {'$gt': after_id}}
+            ]})
+        cursor = self.collection.find({'$and': conditions}).sort([("created_at", 1), ("_id", 1)]).batch_size(batch_size)
+        async for document in cursor:
+            position = [document.pop('created_at').isoformat(), document.pop('_id')]
+            yield position, document
+    
+    async def get_revision(self, message_id: int, timestamp: str) -> Optional[dict]:
+        """Get dokumen message_id dengan timestamp tersebut"""
+        if not await self._ensure_connection():
+            raise ConnectionFailure(f"MongoDB not available: {self._last_error}")
+        
+        return await self.collection.find_one(
+            {'message_id': message_id, 'timestamp': timestamp}, {'_id': 0, 'created_at': 0}
+        )
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics"""
         return {
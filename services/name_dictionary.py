@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from utils.stream_codec import MessageNames
+
+
+class NameDictionary:
+    """
+    id -> nama yang sudah dikirim ke satu client (wire format "dict")
+
+    updates() mengembalikan entry yang belum diketahui client (atau namanya
+    berubah) untuk dikirim sebagai frame NAMES sebelum message-nya. Dibatasi
+    capacity (LRU); entry yang di-evict cukup dikirim ulang jika muncul lagi.
+    """
+
+    __slots__ = ('capacity', '_known', 'sent')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._known: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+
+        # Stats tracking
+        self.sent = 0
+
+    def updates(self, names: MessageNames) -> Optional[Dict[str, Dict[str, str]]]:
+        result = None
+        for kind, item_id, name in names:
+            key = (kind, item_id)
+            if self._known.get(key) == name:
+                self._known.move_to_end(key)
+                continue
+            self._known[key] = name
+            self._known.move_to_end(key)
+            if len(self._known) > self.capacity:
+                self._known.popitem(last=False)
+            if result is None:
+                result = {}
+            # Key JSON selalu string
+            result.setdefault(kind, {})[str(item_id)] = name
+            self.sent += 1
+        return result
+
+    def __len__(self) -> int:
+        return len(self._known)
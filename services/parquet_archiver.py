@@ -0,0 +1,187 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+from utils.atomic_file import atomic_write_text
+from utils.logger import Logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional, hanya dibutuhkan untuk archival
+    pa = None
+    pq = None
+
+
+class ParquetArchiver:
+    """
+    Service untuk archive message history ke Parquet, dipartisi per tanggal dan guild
+
+    Layout: <output_dir>/date=YYYY-MM-DD/guild=<server_id|dm>/part-*.parquet
+    Kolom server, channel, author dan type di-dictionary-encode karena nilainya
+    sangat berulang. Posisi terakhir yang sudah ditulis disimpan sebagai cursor
+    urutan insert dari source (rowid, created_at, offset log), bukan timestamp
+    message, karena backfill, gap recovery, import dan worker paralel terus
+    menambah message yang timestamp-nya lebih lama dari run sebelumnya.
+    """
+
+    # Kolom yang nilainya berulang, disimpan sebagai dictionary
+    DICTIONARY_COLUMNS = ('type', 'server', 'channel', 'author')
+    INT_COLUMNS = ('server_id', 'channel_id', 'author_id', 'message_id')
+
+    def __init__(self, output_dir: str, state_file: Optional[str] = None,
+                 rows_per_flush: int = 200_000, compression: str = 'zstd'):
+        """
+        Initialize archiver
+
+        Args:
+            output_dir: Root directory dataset Parquet
+            state_file: Path file state cursor (default: <output_dir>/_watermark.json)
+            rows_per_flush: Jumlah row yang di-buffer sebelum ditulis ke file
+            compression: Codec Parquet
+        """
+        if pa is None:
+            raise RuntimeError("pyarrow is required for Parquet archival")
+
+        self.output_dir = Path(output_dir)
+        self.state_file = state_file or str(self.output_dir / "_watermark.json")
+        self.rows_per_flush = rows_per_flush
+        self.compression = compression
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._run_id = int(time.time())
+        self._flushes = 0
+
+    def load_cursor(self, source: str) -> Any:
+        """
+        Cursor terakhir yang sudah di-archive untuk source ini (None = dari awal)
+
+        Raises:
+            ValueError: Jika state file dibuat oleh source lain (cursor tidak bisa dipakai)
+        """
+        state = self._load_state()
+        if state.get('source', source) != source:
+            raise ValueError(
+                f"{self.state_file} tracks source {state['source']!r}, not {source!r}; use a separate --state-file"
+            )
+        return state.get('cursor')
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_state(self, source: str, cursor: Any, watermark: Optional[str], rows: int) -> None:
+        atomic_write_text(self.state_file, json.dumps({
+            'source': source,
+            'cursor': cursor,
+            'watermark': watermark,
+            'rows': rows,
+            'updated_at': datetime.utcnow().isoformat()
+        }))
+
+    async def archive(self, records: Union[AsyncIterator[Tuple[Any, dict]], Iterable[Tuple[Any, dict]]],
+                      source: str) -> Dict[str, Any]:
+        """
+        Archive (cursor, record) urut insert yang dibaca setelah cursor tersimpan
+
+        Cursor hanya dimajukan setelah semua buffer ditulis, jadi run yang
+        terputus akan melanjutkan dari flush terakhir yang berhasil. State
+        lama yang hanya punya watermark timestamp dipakai sebagai filter
+        sekali saja (run pertama setelah upgrade membaca source dari awal).
+
+        Args:
+            records: Iterator (cursor, record) dari source, mulai setelah load_cursor(source)
+            source: Nama source, disimpan bersama cursor
+
+        Returns:
+            dict: Statistik run (rows, files, cursor, watermark = timestamp terbaru)
+        """
+        state = self._load_state()
+        legacy_watermark = state.get('watermark') if 'cursor' not in state else None
+        watermark = state.get('watermark')
+        total_rows = state.get('rows', 0)
+        buffers: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        buffered = 0
+        rows_written = 0
+        files_written = 0
+        cursor = state.get('cursor')
+
+        async for cursor, record in self._iterate(records):
+            timestamp = record.get('timestamp')
+            if not timestamp or (legacy_watermark is not None and timestamp <= legacy_watermark):
+                continue
+
+            buffers[self._partition(record)].append(record)
+            buffered += 1
+            watermark = max(watermark or timestamp, timestamp)
+
+            if buffered >= self.rows_per_flush:
+                files_written += await asyncio.to_thread(self._write_partitions, buffers)
+                rows_written += buffered
+                await asyncio.to_thread(self._save_state, source, cursor, watermark, total_rows + rows_written)
+                buffers, buffered = defaultdict(list), 0
+
+        if buffered:
+            files_written += await asyncio.to_thread(self._write_partitions, buffers)
+            rows_written += buffered
+        # Simpan juga jika hanya ada record yang dilewati, supaya tidak dibaca ulang
+        if cursor != state.get('cursor'):
+            await asyncio.to_thread(self._save_state, source, cursor, watermark, total_rows + rows_written)
+
+        self.logger.info(f"Archived {rows_written} messages into {files_written} files (cursor {cursor})")
+        return {"rows": rows_written, "files": files_written, "cursor": cursor, "watermark": watermark}
+
+    @staticmethod
+    async def _iterate(records: Union[AsyncIterator[Any], Iterable[Any]]) -> AsyncIterator[Any]:
+        """Terima async iterator (storage backend) maupun iterator biasa (message log)"""
+        if hasattr(records, '__aiter__'):
+            async for record in records:
+                yield record
+        else:
+            for index, record in enumerate(records):
+                yield record
+                if index % 10000 == 0:
+                    # Beri kesempatan task lain jalan saat membaca file besar
+                    await asyncio.sleep(0)
+
+    @staticmethod
+    def _partition(record: dict) -> Tuple[str, str]:
+        server_id = record.get('server_id')
+        return record['timestamp'][:10], str(server_id) if server_id is not None else 'dm'
+
+    def _write_partitions(self, buffers: Dict[Tuple[str, str], List[dict]]) -> int:
+        """Tulis satu file per partisi untuk flush ini"""
+        self._flushes += 1
+        for (date, guild), rows in buffers.items():
+            directory = self.output_dir / f"date={date}" / f"guild={guild}"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"part-{self._run_id}-{self._flushes:05d}.parquet"
+            pq.write_table(
+                self._to_table(rows), path,
+                compression=self.compression,
+                use_dictionary=list(self.DICTIONARY_COLUMNS)
+            )
+        return len(buffers)
+
+    def _to_table(self, rows: List[dict]) -> 'pa.Table':
+        """Convert rows ke Arrow table dengan kolom dictionary-encoded"""
+        columns = {
+            'timestamp': pa.array(
+                [datetime.fromisoformat(row['timestamp']) for row in rows], type=pa.timestamp('us')
+            )
+        }
+        for name in self.DICTIONARY_COLUMNS:
+            columns[name] = pa.array([row.get(name) for row in rows], type=pa.string()).dictionary_encode()
+        for name in self.INT_COLUMNS:
+            columns[name] = pa.array([row.get(name) for row in rows], type=pa.int64())
+        columns['content'] = pa.array([row.get('content') for row in rows], type=pa.string())
+        columns['attachments'] = pa.array([row.get('attachments') or [] for row in rows], type=pa.list_(pa.string()))
+        columns['embeds'] = pa.array([row.get('embeds', 0) for row in rows], type=pa.int32())
+        columns['reactions'] = pa.array([row.get('reactions', 0) for row in rows], type=pa.int32())
+        return pa.table(columns)
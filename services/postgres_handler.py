@@ -0,0 +1,303 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+from models.message import DiscordMessage
+from services.storage_backend import APPEND_SETTLE_SECONDS, StorageBackend
+from utils.logger import Logger
+from config import PostgresConfig
+
+try:
+    import asyncpg
+except ImportError:  # Optional, hanya dibutuhkan jika STORAGE_BACKEND=postgres
+    asyncpg = None
+
+
+class PostgresService(StorageBackend):
+    """Service untuk menyimpan message ke tabel messages PostgreSQL (scripts/init.sql)"""
+
+    # Urutan kolom untuk COPY, harus sama dengan _to_record
+    COLUMNS = (
+        'document_id', 'message_id', 'message_type', 'timestamp',
+        'server_name', 'server_id', 'channel_name', 'channel_id',
+        'author_name', 'author_id', 'content', 'attachments',
+        'embeds', 'reactions', 'message_ids'
+    )
+
+    # Kolom tambahan yang tidak ada di versi init.sql yang lama
+    MIGRATIONS = (
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS document_id VARCHAR(128)",
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS message_id BIGINT",
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS message_ids JSONB",
+        "ALTER TABLE messages ALTER COLUMN author_id DROP NOT NULL",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_document_id ON messages(document_id)",
+        "CREATE INDEX IF NOT EXISTS idx_messages_channel_time ON messages(channel_id, timestamp DESC)",
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()",
+        "CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_messages_message_id ON messages(message_id)",
+    )
+
+    def __init__(self, config: PostgresConfig):
+        """
+        Initialize PostgreSQL service
+
+        Args:
+            config: PostgresConfig object
+        """
+        if asyncpg is None:
+            raise RuntimeError("asyncpg is required for the postgres storage backend")
+
+        self.config = config
+        self.pool: Optional['asyncpg.Pool'] = None
+        self._init_lock = asyncio.Lock()
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._is_connected = False
+
+        # Stats tracking
+        self._messages_saved = 0
+        self._batches_saved = 0
+        self._connection_attempts = 0
+        self._last_error = None
+
+    async def initialize(self) -> bool:
+        """Create connection pool dan pastikan schema up to date"""
+        if self.pool is not None:
+            return True
+
+        async with self._init_lock:
+            if self.pool is not None:
+                return True
+
+            pool = None
+            try:
+                self._connection_attempts += 1
+                pool = await asyncpg.create_pool(
+                    self.config.uri,
+                    min_size=self.config.min_pool_size,
+                    max_size=self.config.max_pool_size
+                )
+                async with pool.acquire() as conn:
+                    for statement in self.MIGRATIONS:
+                        await conn.execute(statement)
+
+                self.pool = pool
+                self._is_connected = True
+                self._last_error = None
+                self.logger.info("Successfully connected to PostgreSQL")
+                return True
+
+            except Exception as e:
+                self._last_error = str(e)
+                self.logger.error(f"Failed to connect to PostgreSQL: {e}")
+                self._is_connected = False
+                if pool is not None:
+                    await pool.close()
+                return False
+
+    async def save_message(self, message_data: DiscordMessage) -> bool:
+        """Save satu message (lewat jalur batch yang sama)"""
+        return await self.save_messages([message_data]) >= 0
+
+    async def save_messages(self, messages: List[DiscordMessage]) -> int:
+        """
+        Save batch message dengan COPY ke staging table lalu INSERT ... ON CONFLICT
+
+        COPY tidak bisa mengabaikan duplikat, jadi data di-COPY ke temp table
+        per koneksi dulu, baru dipindah ke messages dalam satu statement.
+
+        Returns:
+            int: Jumlah row baru, -1 jika gagal
+        """
+        if not messages:
+            return 0
+        if not await self.initialize():
+            return -1
+
+        columns = ", ".join(self.COLUMNS)
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        "CREATE TEMP TABLE IF NOT EXISTS messages_staging "
+                        "(LIKE messages INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                    )
+                    await conn.copy_records_to_table(
+                        'messages_staging',
+                        records=[self._to_record(message_data) for message_data in messages],
+                        columns=self.COLUMNS
+                    )
+                    status = await conn.execute(
+                        f"INSERT INTO messages ({columns}) "
+                        f"SELECT {columns} FROM messages_staging "
+                        "ON CONFLICT (document_id) DO NOTHING"
+                    )
+
+            inserted = int(status.split()[-1])
+            self._messages_saved += inserted
+            self._batches_saved += 1
+            self._is_connected = True
+            return inserted
+
+        except Exception as e:
+            self._last_error = str(e)
+            self._is_connected = False
+            self.logger.error(f"Error saving batch of {len(messages)} messages to PostgreSQL: {e}")
+            return -1
+
+    @staticmethod
+    def _to_record(message_data: DiscordMessage) -> tuple:
+        """Convert DiscordMessage ke tuple sesuai COLUMNS"""
+        timestamp = datetime.fromisoformat(message_data.timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        return (
+            message_data.document_id(),
+            message_data.message_id,
+            message_data.type,
+            timestamp,
+            message_data.server,
+            message_data.server_id,
+            message_data.channel,
+            message_data.channel_id,
+            message_data.author,
+            message_data.author_id,
+            message_data.content,
+            json.dumps(message_data.attachments),
+            message_data.embeds,
+            message_data.reactions,
+            json.dumps(message_data.message_ids) if message_data.message_ids is not None else None
+        )
+
+    @staticmethod
+    def _from_row(row) -> dict:
+        """Convert row ke dict dengan field yang sama seperti DiscordMessage"""
+        return {
+            "type": row['message_type'],
+            "timestamp": row['timestamp'].astimezone(timezone.utc).replace(tzinfo=None).isoformat(),
+            "server": row['server_name'],
+            "server_id": row['server_id'],
+            "channel": row['channel_name'],
+            "channel_id": row['channel_id'],
+            "author": row['author_name'],
+            "author_id": row['author_id'],
+            "content": row['content'],
+            "attachments": json.loads(row['attachments']) if row['attachments'] else [],
+            "embeds": row['embeds'],
+            "reactions": row['reactions'],
+            "message_id": row['message_id'],
+            "message_ids": json.loads(row['message_ids']) if row['message_ids'] else None
+        }
+
+    async def get_message_count(self) -> int:
+        """Get total jumlah messages dalam database"""
+        try:
+            if not await self.initialize():
+                return -1
+            return await self.pool.fetchval("SELECT count(*) FROM messages")
+        except Exception as e:
+            self.logger.error(f"Error getting message count: {e}")
+            return -1
+
+    async def get_recent_messages(self, limit: int = 10, channel_id: Optional[int] = None) -> list:
+        """Get recent messages dari database (opsional hanya satu channel)"""
+        try:
+            if not await self.initialize():
+                return []
+            if channel_id is not None:
+                rows = await self.pool.fetch(
+                    "SELECT * FROM messages WHERE channel_id = $1 ORDER BY timestamp DESC LIMIT $2",
+                    channel_id, limit
+                )
+            else:
+                rows = await self.pool.fetch(
+                    "SELECT * FROM messages ORDER BY timestamp DESC LIMIT $1", limit
+                )
+            return [self._from_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting recent messages: {e}")
+            return []
+
+    async def iter_messages(self, since: Optional[str] = None, batch_size: int = 1000):
+        """Stream messages urut timestamp lewat server-side cursor"""
+        if not await self.initialize():
+            raise ConnectionError(f"PostgreSQL not available: {self._last_error}")
+
+        since_ts = None
+        if since:
+            since_ts = datetime.fromisoformat(since)
+            if since_ts.tzinfo is None:
+                since_ts = since_ts.replace(tzinfo=timezone.utc)
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                cursor = conn.cursor(
+                    "SELECT * FROM messages WHERE $1::timestamptz IS NULL OR timestamp > $1 "
+                    "ORDER BY timestamp",
+                    since_ts,
+                    prefetch=batch_size
+                )
+                async for row in cursor:
+                    yield self._from_row(row)
+
+    async def iter_appended(self, after: Optional[list] = None, batch_size: int = 1000):
+        """
+        Stream messages urut created_at (waktu insert), cursor = [created_at, id]
+
+        created_at = waktu mulai transaksi, jadi transaksi yang commit belakangan
+        bisa punya created_at lebih kecil; row yang lebih baru dari
+        APPEND_SETTLE_SECONDS belum dikembalikan dan diambil di run berikutnya.
+        """
+        if not await self.initialize():
+            raise ConnectionError(f"PostgreSQL not available: {self._last_error}")
+
+        after_ts, after_id = (datetime.fromisoformat(after[0]), after[1]) if after else (None, None)
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                cursor = conn.cursor(
+                    "SELECT * FROM messages WHERE created_at <= now() - make_interval(secs => $3) "
+                    "AND ($1::timestamptz IS NULL OR (created_at, id) > ($1, $2::uuid)) "
+                    "ORDER BY created_at, id",
+                    after_ts, after_id, float(APPEND_SETTLE_SECONDS),
+                    prefetch=batch_size
+                )
+                async for row in cursor:
+                    yield [row['created_at'].isoformat(), str(row['id'])], self._from_row(row)
+
+    async def get_revision(self, message_id: int, timestamp: str) -> Optional[dict]:
+        """Get row message_id dengan timestamp tersebut"""
+        if not await self.initialize():
+            raise ConnectionError(f"PostgreSQL not available: {self._last_error}")
+
+        revision_ts = datetime.fromisoformat(timestamp)
+        if revision_ts.tzinfo is None:
+            revision_ts = revision_ts.replace(tzinfo=timezone.utc)
+        row = await self.pool.fetchrow(
+            "SELECT * FROM messages WHERE message_id = $1 AND timestamp = $2 LIMIT 1",
+            message_id, revision_ts
+        )
+        return self._from_row(row) if row is not None else None
+
+    async def disconnect(self) -> None:
+        """Close connection pool"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            self._is_connected = False
+            self.logger.info("PostgreSQL connection closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get service statistics"""
+        return {
+            "backend": "postgres",
+            "connected": self._is_connected,
+            "connection_attempts": self._connection_attempts,
+            "messages_saved": self._messages_saved,
+            "batches_saved": self._batches_saved,
+            "last_error": self._last_error
+        }
+
+    @property
+    def is_available(self) -> bool:
+        """Check if PostgreSQL service is available"""
+        return self._is_connected
@@ -0,0 +1,303 @@
+import asyncio
+import json
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from config import RecentCacheConfig
+from models.message import DiscordMessage
+from services.storage_backend import StorageBackend
+from utils.logger import Logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None
+
+# Event yang mengubah message yang sudah ada, bukan message baru
+UPDATE_TYPES = ("EDITED",)
+DELETE_TYPES = ("DELETED", "BULK_DELETED")
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Encode message dict jadi JSON compact (sekali saat masuk cache, bukan per query)"""
+    message = {key: value for key, value in message.items() if key not in ('_id', 'created_at')}
+    return json.dumps(message, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class ChannelRecent:
+    """Message terbaru satu channel, urut message_id (terlama dulu)"""
+
+    __slots__ = ('ids', 'encoded', 'warmed')
+
+    def __init__(self):
+        self.ids: List[int] = []
+        self.encoded: List[str] = []
+        # True jika isi sudah digabung dengan storage/Redis, jadi cache
+        # bisa menjawab query walaupun jumlah message-nya kurang dari limit
+        self.warmed = False
+
+    def put(self, message_id: int, encoded: str, capacity: int) -> bool:
+        """Insert atau replace message; return False jika terlalu lama untuk disimpan"""
+        index = bisect_left(self.ids, message_id)
+        if index < len(self.ids) and self.ids[index] == message_id:
+            self.encoded[index] = encoded
+            return True
+        if index == 0 and len(self.ids) >= capacity:
+            return False
+        self.ids.insert(index, message_id)
+        self.encoded.insert(index, encoded)
+        if len(self.ids) > capacity:
+            del self.ids[0], self.encoded[0]
+        return True
+
+    def replace(self, message_id: int, encoded: str) -> bool:
+        index = bisect_left(self.ids, message_id)
+        if index < len(self.ids) and self.ids[index] == message_id:
+            self.encoded[index] = encoded
+            return True
+        return False
+
+    def remove(self, message_ids: Iterable[int]) -> bool:
+        removed = False
+        for message_id in message_ids:
+            index = bisect_left(self.ids, message_id)
+            if index < len(self.ids) and self.ids[index] == message_id:
+                del self.ids[index], self.encoded[index]
+                removed = True
+        return removed
+
+    def newest(self, limit: int) -> List[str]:
+        return self.encoded[:-limit - 1:-1] if limit > 0 else []
+
+
+class RecentMessageCache:
+    """
+    Materialized view N message terbaru per channel
+
+    Dipasang sebagai broadcaster di MessageProcessor, jadi setiap message
+    baru langsung masuk cache dalam bentuk JSON yang sudah di-encode, edit
+    mengganti entry-nya dan delete menghapusnya. Channel disimpan dalam LRU
+    (max_channels). Query "recent messages" dijawab dari memory; cache miss
+    (channel belum pernah dilihat atau sudah di-evict) dibaca dari Redis
+    mirror jika ada, lalu dari storage, dan hasilnya disimpan di cache.
+
+    Jika REDIS_URL di-set, perubahan di-mirror ke Redis list per channel
+    (terbaru dulu) secara write-behind, supaya proses lain dan restart
+    berikutnya bisa membaca tanpa query database.
+    """
+
+    def __init__(self, config: RecentCacheConfig, storage: Optional[StorageBackend] = None):
+        """
+        Initialize recent message cache
+
+        Args:
+            config: Recent cache configuration
+            storage: Optional storage backend untuk cache miss
+        """
+        self.config = config
+        self.storage = storage
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._channels: "OrderedDict[int, ChannelRecent]" = OrderedDict()
+
+        self._redis = None
+        if config.redis_url:
+            if aioredis is None:
+                raise RuntimeError("redis is required for the recent cache Redis mirror (REDIS_URL)")
+            self._redis = aioredis.from_url(config.redis_url, decode_responses=True)
+        # channel_id -> message baru untuk LPUSH, atau None jika list harus ditulis ulang
+        self._redis_pending: Dict[int, Optional[List[str]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # Stats tracking
+        self._hits = 0
+        self._misses = 0
+        self._redis_hits = 0
+        self._storage_loads = 0
+        self._clamped = 0
+        self._evictions = 0
+        self._redis_errors = 0
+
+    def _channel(self, channel_id: int, create: bool = False) -> Optional[ChannelRecent]:
+        recent = self._channels.get(channel_id)
+        if recent is not None:
+            self._channels.move_to_end(channel_id)
+        elif create:
+            recent = self._channels[channel_id] = ChannelRecent()
+            if len(self._channels) > self.config.max_channels:
+                self._channels.popitem(last=False)
+                self._evictions += 1
+        return recent
+
+    async def observe(self, message_data: DiscordMessage) -> None:
+        """Update cache dari event yang diproses (dipasang sebagai broadcaster)"""
+        # vars() bukan to_dict(): asdict() deep-copy semua field, padahal langsung di-encode
+        self.apply(message_data.type, message_data.channel_id, message_data.message_id,
+                   message_data.message_ids, vars(message_data))
+
+    def apply(self, message_type: str, channel_id: int, message_id: Optional[int],
+              message_ids: Optional[List[int]], message: Dict[str, Any]) -> None:
+        """Terapkan satu event ke cache channel"""
+        if message_type in DELETE_TYPES:
+            recent = self._channel(channel_id)
+            if recent is not None and recent.remove(message_ids or [message_id]):
+                self._mark_rewrite(channel_id)
+            return
+
+        if message_id is None:
+            return
+        encoded = encode_message(message)
+        if message_type in UPDATE_TYPES:
+            # Edit message yang tidak ada di cache tidak mengubah N terbaru
+            recent = self._channel(channel_id)
+            if recent is not None and recent.replace(message_id, encoded):
+                self._mark_rewrite(channel_id)
+            return
+
+        recent = self._channel(channel_id, create=True)
+        appended = not recent.ids or message_id > recent.ids[-1]
+        if recent.put(message_id, encoded, self.config.per_channel):
+            if appended:
+                self._mark_append(channel_id, encoded)
+            else:
+                self._mark_rewrite(channel_id)
+
+    async def get_recent(self, channel_id: int, limit: int = 10) -> List[str]:
+        """
+        Message terbaru satu channel sebagai JSON yang sudah di-encode
+
+        Args:
+            channel_id: Channel ID
+            limit: Jumlah message (terbaru dulu), dibatasi kapasitas cache per channel
+
+        Returns:
+            list: JSON string per message, terbaru dulu
+        """
+        if limit > self.config.per_channel:
+            # Limit dari client dipotong supaya tidak bisa memaksa query storage dan frame tanpa batas
+            self._clamped += 1
+            limit = self.config.per_channel
+
+        recent = self._channel(channel_id)
+        if recent is not None and (recent.warmed or len(recent.ids) >= limit):
+            self._hits += 1
+            return recent.newest(limit)
+
+        self._misses += 1
+        recent = await self._warm(channel_id)
+        return recent.newest(limit)
+
+    async def _warm(self, channel_id: int) -> ChannelRecent:
+        """Isi cache channel dari Redis mirror atau storage, digabung dengan message live"""
+        if self._redis is not None:
+            try:
+                mirrored = await self._redis.lrange(self._redis_key(channel_id), 0, self.config.per_channel - 1)
+            except Exception as e:
+                self._redis_errors += 1
+                self.logger.error(f"Error reading recent cache from Redis: {e}")
+                mirrored = []
+            if mirrored:
+                self._redis_hits += 1
+                recent = self._channel(channel_id, create=True)
+                for encoded in mirrored:
+                    message_id = json.loads(encoded).get('message_id')
+                    if message_id is not None:
+                        recent.put(message_id, encoded, self.config.per_channel)
+                recent.warmed = True
+                return recent
+
+        rows = await self._load_storage(channel_id, self.config.per_channel)
+        recent = self._channel(channel_id, create=True)
+        # Storage menyimpan setiap event, terapkan urut dari yang terlama
+        for row in reversed(rows):
+            self.apply(row.get('type') or "NEW", channel_id, row.get('message_id'), row.get('message_ids'), row)
+        recent.warmed = True
+        self._mark_rewrite(channel_id)
+        return recent
+
+    async def _load_storage(self, channel_id: int, limit: int) -> List[Dict[str, Any]]:
+        if self.storage is None:
+            return []
+        self._storage_loads += 1
+        return await self.storage.get_recent_messages(limit, channel_id=channel_id)
+
+    def _redis_key(self, channel_id: int) -> str:
+        return f"{self.config.redis_prefix}{channel_id}"
+
+    def _mark_append(self, channel_id: int, encoded: str) -> None:
+        if self._redis is None:
+            return
+        if channel_id not in self._redis_pending:
+            self._redis_pending[channel_id] = [encoded]
+        elif self._redis_pending[channel_id] is not None:
+            self._redis_pending[channel_id].append(encoded)
+
+    def _mark_rewrite(self, channel_id: int) -> None:
+        if self._redis is not None:
+            self._redis_pending[channel_id] = None
+
+    async def start(self) -> None:
+        """Start write-behind loop untuk Redis mirror"""
+        if self._redis is not None and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.redis_flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Kirim semua perubahan pending ke Redis dalam satu pipeline"""
+        if self._redis is None or not self._redis_pending:
+            return
+        pending, self._redis_pending = self._redis_pending, {}
+
+        pipe = self._redis.pipeline(transaction=False)
+        for channel_id, appended in pending.items():
+            key = self._redis_key(channel_id)
+            if appended is not None:
+                pipe.lpush(key, *appended)
+                pipe.ltrim(key, 0, self.config.per_channel - 1)
+            else:
+                pipe.delete(key)
+                recent = self._channels.get(channel_id)
+                if recent is None or not recent.encoded:
+                    continue
+                pipe.rpush(key, *reversed(recent.encoded))
+            pipe.expire(key, self.config.redis_ttl)
+
+        try:
+            await pipe.execute()
+        except Exception as e:
+            self._redis_errors += 1
+            self.logger.error(f"Error mirroring recent cache to Redis: {e}")
+            # Tulis ulang penuh di flush berikutnya, urutan append tidak lagi pasti
+            for channel_id in pending:
+                self._redis_pending[channel_id] = None
+
+    async def close(self) -> None:
+        """Stop flush loop, flush sisa perubahan, lalu close koneksi Redis"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        if self._redis is not None:
+            await self.flush()
+            await self._redis.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get recent cache statistics"""
+        lookups = self._hits + self._misses
+        return {
+            "channels": len(self._channels),
+            "messages": sum(len(recent.ids) for recent in self._channels.values()),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 3) if lookups else None,
+            "redis_hits": self._redis_hits,
+            "storage_loads": self._storage_loads,
+            "clamped": self._clamped,
+            "evictions": self._evictions,
+            "redis": self._redis is not None,
+            "redis_pending": len(self._redis_pending),
+            "redis_errors": self._redis_errors
+        }
@@ -0,0 +1,196 @@
+import dataclasses
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from models.message import DiscordMessage
+from services.storage_backend import StorageBackend
+from utils.edit_delta import MessageVersions
+from utils.logger import Logger
+from utils.text_diff import apply_text_patch, diff_text, patch_size
+
+# Type row untuk EDITED yang content-nya disimpan sebagai patch
+DELTA_TYPE = "EDITED_DELTA"
+
+# Batas panjang rantai yang diikuti saat memuat base dari backend
+# (data lama sebelum keyframe bisa punya rantai lebih panjang dari keyframe_interval)
+MAX_CHAIN_LENGTH = 1000
+
+
+class RevisionStorage(StorageBackend):
+    """
+    Wrapper yang menyimpan EDITED sebagai patch terhadap revisi sebelumnya
+
+    Jika versi sebelumnya message masih diingat (cache_size message terakhir),
+    EDITED disimpan dengan type EDITED_DELTA dan content
+    {"base_timestamp": ..., "patch": [...]}; field lain tetap utuh. Setiap
+    keyframe_interval revisi berturut-turut, satu revisi ditulis utuh supaya
+    rantai patch tetap pendek.
+
+    Read (get_recent_messages, iter_messages, iter_appended) menyusun ulang
+    content dan mengembalikan type EDITED. Base yang tidak ada di cache dimuat
+    dari backend (get_revision) mengikuti rantai sampai revisi utuh, jadi
+    storage yang dibuka ulang tetap bisa membaca delta lama. Hanya delta yang
+    rantainya putus (row base tidak ada) yang dikembalikan dengan content None
+    dan field "delta".
+    """
+
+    def __init__(self, backend: StorageBackend, cache_size: int = 50000, keyframe_interval: int = 16):
+        """
+        Initialize revision storage
+
+        Args:
+            backend: Storage backend yang sebenarnya
+            cache_size: Jumlah revisi yang diingat untuk membuat dan membaca patch
+            keyframe_interval: Maksimal delta berturut-turut sebelum revisi ditulis utuh
+        """
+        self.backend = backend
+        self.cache_size = cache_size
+        self.keyframe_interval = keyframe_interval
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        # message_id -> (timestamp, content, jumlah delta sejak revisi utuh) revisi terakhir yang ditulis
+        self._latest: MessageVersions[Tuple[str, str, int]] = MessageVersions(cache_size)
+        # (message_id, timestamp) -> content, untuk menyusun ulang row delta saat read
+        self._revisions: MessageVersions[str] = MessageVersions(cache_size)
+
+        # Stats tracking
+        self._deltas_written = 0
+        self._bytes_saved = 0
+        self._keyframes = 0
+        self._base_loads = 0
+        self._unresolved = 0
+
+    async def initialize(self) -> bool:
+        return await self.backend.initialize()
+
+    def _encode(self, message_data: DiscordMessage) -> DiscordMessage:
+        """Ganti content EDITED dengan patch jika lebih kecil, dan catat revisinya"""
+        if message_data.type in ("DELETED", "BULK_DELETED"):
+            self._latest.discard(message_data.message_ids or [message_data.message_id])
+            return message_data
+        if message_data.message_id is None or not isinstance(message_data.content, str):
+            return message_data
+
+        base = self._latest.get(message_data.message_id) if message_data.type == "EDITED" else None
+        self._latest.put(message_data.message_id, (message_data.timestamp, message_data.content, 0))
+        self._revisions.put((message_data.message_id, message_data.timestamp), message_data.content)
+        if base is None:
+            return message_data
+
+        base_timestamp, base_content, depth = base
+        if depth >= self.keyframe_interval:
+            self._keyframes += 1
+            return message_data
+        patch = diff_text(base_content, message_data.content)
+        content = json.dumps({"base_timestamp": base_timestamp, "patch": patch}, ensure_ascii=False)
+        if len(content) >= len(message_data.content) or patch_size(patch) >= len(message_data.content):
+            return message_data
+        self._latest.put(message_data.message_id, (message_data.timestamp, message_data.content, depth + 1))
+        self._deltas_written += 1
+        self._bytes_saved += len(message_data.content) - len(content)
+        return dataclasses.replace(message_data, type=DELTA_TYPE, content=content)
+
+    async def save_message(self, message_data: DiscordMessage) -> bool:
+        return await self.backend.save_message(self._encode(message_data))
+
+    async def save_messages(self, messages: List[DiscordMessage]) -> int:
+        return await self.backend.save_messages([self._encode(message_data) for message_data in messages])
+
+    async def _load_base(self, message_id: int, timestamp: str) -> Optional[str]:
+        """
+        Muat content revisi (message_id, timestamp) dari backend
+
+        Rantai delta diikuti ke belakang sampai revisi utuh atau revisi yang
+        ada di cache, lalu patch diterapkan maju dan setiap revisi dicatat.
+        """
+        chain = []
+        content = None
+        while len(chain) < MAX_CHAIN_LENGTH:
+            content = self._revisions.get((message_id, timestamp))
+            if content is not None:
+                break
+            try:
+                row = await self.backend.get_revision(message_id, timestamp)
+            except Exception as e:
+                self.logger.warning(f"Error loading revision {message_id}@{timestamp}: {e}")
+                return None
+            self._base_loads += 1
+            if row is None or not isinstance(row.get('content'), str):
+                return None
+            if row.get('type') != DELTA_TYPE:
+                content = row['content']
+                self._revisions.put((message_id, timestamp), content)
+                break
+            delta = json.loads(row['content'])
+            chain.append((timestamp, delta['patch']))
+            timestamp = delta['base_timestamp']
+        if content is None:
+            return None
+
+        for revision_timestamp, patch in reversed(chain):
+            content = apply_text_patch(content, patch)
+            self._revisions.put((message_id, revision_timestamp), content)
+        return content
+
+    async def _materialize(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Susun ulang content row delta; terlama dulu supaya base sudah ada di cache"""
+        message_id = message.get('message_id')
+        if message.get('type') != DELTA_TYPE:
+            if message_id is not None and isinstance(message.get('content'), str):
+                self._revisions.put((message_id, message['timestamp']), message['content'])
+            return message
+
+        delta = json.loads(message['content'])
+        base = await self._load_base(message_id, delta['base_timestamp'])
+        message['type'] = "EDITED"
+        if base is None:
+            self._unresolved += 1
+            message['content'] = None
+            message['delta'] = delta
+            return message
+        message['content'] = apply_text_patch(base, delta['patch'])
+        self._revisions.put((message_id, message['timestamp']), message['content'])
+        return message
+
+    async def get_message_count(self) -> int:
+        return await self.backend.get_message_count()
+
+    async def get_recent_messages(self, limit: int = 10, channel_id: Optional[int] = None) -> list:
+        messages = await self.backend.get_recent_messages(limit, channel_id)
+        # Terbaru dulu dari backend; base selalu lebih lama dari delta-nya
+        for message in reversed(messages):
+            await self._materialize(message)
+        return messages
+
+    async def iter_messages(self, since: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        async for message in self.backend.iter_messages(since, batch_size):
+            yield await self._materialize(message)
+
+    async def iter_appended(self, after: Any = None, batch_size: int = 1000) -> AsyncIterator[Tuple[Any, dict]]:
+        async for cursor, message in self.backend.iter_appended(after, batch_size):
+            yield cursor, await self._materialize(message)
+
+    async def get_revision(self, message_id: int, timestamp: str) -> Optional[dict]:
+        message = await self.backend.get_revision(message_id, timestamp)
+        return await self._materialize(message) if message is not None else None
+
+    async def disconnect(self) -> None:
+        await self.backend.disconnect()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.backend.get_stats()
+        stats["revisions"] = {
+            "deltas_written": self._deltas_written,
+            "bytes_saved": self._bytes_saved,
+            "keyframes": self._keyframes,
+            "base_loads": self._base_loads,
+            "unresolved_reads": self._unresolved,
+            "tracked": len(self._latest)
+        }
+        return stats
+
+    @property
+    def is_available(self) -> bool:
+        return self.backend.is_available
+
+    @property
+    def last_error(self) -> Optional[str]:
+        return self.backend.last_error
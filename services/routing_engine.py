@@ -0,0 +1,247 @@
+import json
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Set, Union
+from models.message import DiscordMessage
+from utils.logger import Logger
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+@dataclass
+class RoutingRule:
+    """
+    Satu rule routing dari config
+
+    Semua kondisi yang di-set harus terpenuhi (AND). keywords cocok jika salah
+    satu keyword muncul sebagai kata utuh (case-insensitive). authors boleh
+    berisi author_id atau nama author. Rule tanpa kondisi cocok untuk semua message.
+    """
+    name: str
+    outputs: List[str]
+    keywords: List[str] = field(default_factory=list)
+    regex: Optional[str] = None
+    authors: List[Union[int, str]] = field(default_factory=list)
+    channels: List[int] = field(default_factory=list)
+    guilds: List[int] = field(default_factory=list)
+    types: List[str] = field(default_factory=list)
+    has_attachments: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RoutingRule':
+        """Create rule dari config; field yang tidak dikenal dianggap typo dan ditolak"""
+        data = dict(data)
+        if 'output' in data:
+            data['outputs'] = [data.pop('output')]
+
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Rule {data.get('name')!r} has unknown fields: {sorted(unknown)}")
+        if not data.get('outputs'):
+            raise ValueError(f"Rule {data.get('name')!r} has no output")
+        return cls(**data)
+
+
+class RoutingEngine:
+    """
+    Rules engine untuk routing message ke named outputs
+
+    Semua keyword dari semua rule di-compile jadi satu regex berbentuk trie,
+    jadi satu kali scan content menemukan semua keyword yang cocok berapapun
+    jumlah rule-nya, termasuk yang overlap ("server down" dan "down", atau
+    "new york" dan "new"). Rule lalu di-index berdasarkan kondisi paling selektif
+    (keyword, channel, author, guild), sehingga per message hanya kandidat
+    yang relevan yang dievaluasi penuh.
+    """
+
+    def __init__(self, rules: Iterable[RoutingRule]):
+        """
+        Initialize dan compile rules
+
+        Args:
+            rules: Daftar RoutingRule
+        """
+        self.rules: List[RoutingRule] = list(rules)
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._regexes: Dict[int, Pattern] = {}
+        self._by_keyword: Dict[str, Set[int]] = defaultdict(set)
+        self._by_channel: Dict[int, Set[int]] = defaultdict(set)
+        self._by_author: Dict[Union[int, str], Set[int]] = defaultdict(set)
+        self._by_guild: Dict[int, Set[int]] = defaultdict(set)
+        self._unindexed: Set[int] = set()
+        self._keyword_trie: Dict[str, Any] = {}
+        self._keyword_pattern: Optional[Pattern] = None
+        self._compile()
+
+        # Stats tracking
+        self._evaluated = 0
+        self._candidates = 0
+        self._eval_time = 0.0
+        self._matches: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RoutingEngine':
+        """Load rules dari file JSON ({"rules": [...]} atau list rule)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rules = data.get('rules', []) if isinstance(data, dict) else data
+        return cls(RoutingRule.from_dict(rule) for rule in rules)
+
+    def _compile(self) -> None:
+        for index, rule in enumerate(self.rules):
+            if rule.regex:
+                try:
+                    self._regexes[index] = re.compile(rule.regex, re.IGNORECASE)
+                except re.error as e:
+                    raise ValueError(f"Rule {rule.name!r} has invalid regex: {e}") from e
+
+            # Index di kondisi paling selektif saja, kondisi lain dicek di _matches_rule
+            if rule.keywords:
+                for keyword in rule.keywords:
+                    self._by_keyword[keyword.lower()].add(index)
+            elif rule.channels:
+                for channel_id in rule.channels:
+                    self._by_channel[channel_id].add(index)
+            elif rule.authors:
+                for author in rule.authors:
+                    self._by_author[author].add(index)
+            elif rule.guilds:
+                for guild_id in rule.guilds:
+                    self._by_guild[guild_id].add(index)
+            else:
+                self._unindexed.add(index)
+
+        if self._by_keyword:
+            # Lookahead zero-width: finditer mencoba setiap posisi awal, jadi match tidak saling menelan
+            self._keyword_trie = _build_trie(self._by_keyword)
+            self._keyword_pattern = re.compile(
+                r"(?<!\w)(?=(" + _trie_pattern(self._keyword_trie) + r")(?!\w))", re.IGNORECASE
+            )
+
+        self.logger.info(
+            f"Compiled {len(self.rules)} routing rules ({len(self._by_keyword)} keywords, "
+            f"{len(self._unindexed)} unindexed)"
+        )
+
+    def _keyword_hits(self, content: str) -> Set[str]:
+        """
+        Semua keyword yang muncul sebagai kata utuh di content
+
+        Regex menemukan setiap posisi awal dengan keyword terpanjangnya;
+        keyword lebih pendek di posisi yang sama ("new" di "new york") pasti
+        prefix dari match itu, jadi dikumpulkan dengan menelusuri trie.
+        """
+        if self._keyword_pattern is None or not content:
+            return set()
+        content = content.lower()
+        hits = set()
+        for match in self._keyword_pattern.finditer(content):
+            start, end = match.start(1), match.end(1)
+            node = self._keyword_trie
+            for position in range(start, end):
+                node = node.get(content[position])
+                if node is None:
+                    break
+                if '' in node and not _WORD_CHAR.match(content, position + 1):
+                    hits.add(content[start:position + 1])
+        return hits
+
+    def route(self, message_data: DiscordMessage) -> Set[str]:
+        """
+        Cari semua output untuk message
+
+        Returns:
+            set: Nama output dari semua rule yang cocok (kosong jika tidak ada)
+        """
+        started = time.perf_counter()
+        hits = self._keyword_hits(message_data.content)
+
+        candidates = set(self._unindexed)
+        for keyword in hits:
+            candidates |= self._by_keyword.get(keyword, set())
+        candidates |= self._by_channel.get(message_data.channel_id, set())
+        candidates |= self._by_author.get(message_data.author_id, set())
+        candidates |= self._by_author.get(message_data.author, set())
+        candidates |= self._by_guild.get(message_data.server_id, set())
+
+        outputs: Set[str] = set()
+        for index in candidates:
+            if self._matches_rule(index, message_data, hits):
+                outputs.update(self.rules[index].outputs)
+
+        self._evaluated += 1
+        self._candidates += len(candidates)
+        self._eval_time += time.perf_counter() - started
+        for output in outputs:
+            self._matches[output] += 1
+        return outputs
+
+    def _matches_rule(self, index: int, message_data: DiscordMessage, hits: Set[str]) -> bool:
+        rule = self.rules[index]
+        if rule.keywords and not any(keyword.lower() in hits for keyword in rule.keywords):
+            return False
+        if rule.channels and message_data.channel_id not in rule.channels:
+            return False
+        if rule.authors and message_data.author_id not in rule.authors and message_data.author not in rule.authors:
+            return False
+        if rule.guilds and message_data.server_id not in rule.guilds:
+            return False
+        if rule.types and message_data.type not in rule.types:
+            return False
+        if rule.has_attachments is not None and bool(message_data.attachments) != rule.has_attachments:
+            return False
+        if index in self._regexes and not self._regexes[index].search(message_data.content or ""):
+            return False
+        return True
+
+    @property
+    def outputs(self) -> Set[str]:
+        """Semua nama output yang didefinisikan rules"""
+        return {output for rule in self.rules for output in rule.outputs}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics"""
+        return {
+            "rules": len(self.rules),
+            "keywords": len(self._by_keyword),
+            "evaluated": self._evaluated,
+            "avg_candidates": round(self._candidates / self._evaluated, 2) if self._evaluated else 0,
+            "avg_eval_us": round(self._eval_time / self._evaluated * 1e6, 1) if self._evaluated else 0,
+            "matches": dict(self._matches)
+        }
+
+
+def _build_trie(words: Iterable[str]) -> Dict[str, Any]:
+    """Trie per karakter; key '' menandai akhir sebuah kata"""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return trie
+
+
+def _trie_pattern(trie: Dict[str, Any]) -> str:
+    """
+    Compile trie jadi satu regex
+
+    Prefix yang sama digabung ("cat", "car" -> "ca(?:t|r)"), jadi regex engine
+    tidak mencoba setiap alternatif dari awal dan waktu match hampir tidak
+    bergantung pada jumlah keyword (mirip automaton Aho-Corasick).
+    """
+
+    def build(node: Dict[str, Any]) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            pattern = f"(?:{pattern})?"
+        return pattern
+
+    return build(trie)
@@ -0,0 +1,76 @@
+import threading
+from typing import FrozenSet, Optional, Set, Tuple
+from utils.stream_codec import (
+    RECORD_GROUP, RECORD_GROUP_RESET, RECORD_PRIVATE, StreamCompressor, encode_record
+)
+
+# (codec, wire format, mode edit, subscription) - client dengan key sama menerima
+# urutan frame broadcast yang sama
+GroupKey = Tuple[str, str, str, Optional[FrozenSet[str]]]
+
+
+class CompressionGroup:
+    """
+    Satu streaming compressor untuk semua client dengan codec, format dan subscription sama
+
+    Setiap frame broadcast di-compress sekali per group dan record yang sama
+    dikirim ke semua member. Context dimulai ulang saat ada member baru
+    (record RECORD_GROUP_RESET), karena member baru tidak punya history
+    stream sebelumnya. Hanya dipakai dari event loop.
+    """
+
+    __slots__ = ('key', 'level', 'members', '_compressor', '_reset', 'bytes_in', 'bytes_out', 'resets')
+
+    def __init__(self, key: GroupKey, level: Optional[int] = None):
+        self.key = key
+        self.level = level
+        self.members: Set[object] = set()
+        self._compressor: Optional[StreamCompressor] = None
+        self._reset = True
+
+        # Stats tracking
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.resets = 0
+
+    def join(self, client) -> None:
+        self.members.add(client)
+        self._reset = True
+
+    def encode(self, frame: bytes) -> bytes:
+        """Compress frame dengan context group, return record siap kirim"""
+        kind = RECORD_GROUP
+        if self._reset:
+            self._compressor = StreamCompressor(self.key[0], self.level)
+            self._reset = False
+            self.resets += 1
+            kind = RECORD_GROUP_RESET
+        payload = self._compressor.compress(frame)
+        self.bytes_in += len(frame)
+        self.bytes_out += len(payload)
+        return encode_record(kind, payload)
+
+
+class ClientCompression:
+    """State compression satu client: stream private dan group yang sedang diikuti"""
+
+    __slots__ = ('codec', 'group', '_private', '_lock', 'bytes_in', 'bytes_out')
+
+    def __init__(self, codec: str, level: Optional[int] = None):
+        self.codec = codec
+        self.group: Optional[CompressionGroup] = None
+        self._private = StreamCompressor(codec, level)
+        # Frame private dikirim dari thread handler client dan dari event loop (replay)
+        self._lock = threading.Lock()
+
+        # Stats tracking
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def encode_private(self, frame: bytes, put) -> bool:
+        """Compress frame untuk client ini saja dan masukkan ke queue dalam urutan yang sama"""
+        with self._lock:
+            payload = self._private.compress(frame)
+            self.bytes_in += len(frame)
+            self.bytes_out += len(payload)
+            return put(encode_record(RECORD_PRIVATE, payload))
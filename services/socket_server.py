@@ -1,22 +1,139 @@
 import socket
 import threading
 import asyncio
-from typing import List, Set
+import json
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
 from config import SocketConfig
 from models.message import DiscordMessage
+from services.client_writer import ClientWriter
+from services.name_dictionary import NameDictionary
+from services.routing_engine import RoutingEngine
+from services.socket_compression import ClientCompression, CompressionGroup, GroupKey
+from utils.edit_delta import MessageVersions, build_edit_delta
 from utils.logger import Logger
+from utils.stream_codec import MessageNames, available_codecs, compact_message
+
+# Client yang tidak mengirim RESUME dalam waktu ini langsung menerima live stream
+HANDSHAKE_TIMEOUT = 1.0
+
+DELETE_TYPES = ("DELETED", "BULK_DELETED")
+
+# Batas jumlah channel berbeda di cache frame STATS sebelum cache dikosongkan
+STATS_FRAME_CACHE_SIZE = 256
+
+
+class BroadcastEntry:
+    """
+    Satu frame broadcast dalam semua varian yang dibutuhkan client
+
+    frame: JSON lengkap; compact: tanpa nama (wire format "dict") beserta
+    names-nya; delta: EDITED sebagai diff terhadap versi sebelumnya, hanya
+    untuk client yang menerima versi tersebut (base_routes).
+    """
+    
+    __slots__ = ('seq', 'routes', 'frame', 'compact', 'names', 'delta', 'base_routes')
+    
+    def __init__(self, seq: Optional[int], routes: Optional[Set[str]], frame: bytes):
+        self.seq = seq
+        self.routes = routes
+        self.frame = frame
+        self.compact: Optional[bytes] = None
+        self.names: MessageNames = ()
+        self.delta: Optional[bytes] = None
+        self.base_routes: Set[str] = set()
+
 
 class SocketServer:
-    """Socket server untuk broadcast message ke clients"""
+    """
+    Socket server untuk broadcast message ke clients
     
-    def __init__(self, config: SocketConfig):
+    Protocol per baris (newline-delimited): message dikirim sebagai JSON satu
+    baris dengan field "seq", frame lain sebagai '<KIND> <json>'. Saat connect
+    server mengirim HELLO berisi stream id dan seq terakhir. Client mengirim
+    RESUME <stream> <seq> untuk menerima message setelah seq tersebut dari
+    replay buffer, lalu lanjut live tanpa duplikat; jika sebagian sudah tidak
+    ada di buffer (atau server sudah restart), server mengirim frame GAP.
+    
+    Sebelum RESUME client bisa mengirim COMPRESS <codec> (codec dari HELLO).
+    Setelah ack COMPRESS, semua data dari server dikirim sebagai record
+    compressed (lihat utils/stream_codec.py). Frame broadcast di-compress
+    sekali per CompressionGroup, bukan per client.
+    
+    FORMAT dict (juga sebelum RESUME) mengganti nama server/channel/author
+    di message dengan id saja; nama dikirim sekali per client lewat frame
+    NAMES sebelum message pertama yang memakainya.
+    
+    EDITS delta (sebelum RESUME) mengirim EDITED sebagai diff terhadap versi
+    sebelumnya (field "base" = seq versi tersebut). Client yang tidak punya
+    versi base meminta versi lengkap dengan SNAPSHOT <message_id>.
+    """
+    
+    def __init__(self, config: SocketConfig, router: Optional[RoutingEngine] = None,
+                 stats_provider: Optional[Callable[..., Dict[str, Any]]] = None,
+                 recent_provider: Optional[Callable[[int, int], Awaitable[List[str]]]] = None):
         self.config = config
+        self.router = router
+        # Function (channel_id, include_series) -> snapshot untuk command STATS
+        self.stats_provider = stats_provider
+        # Coroutine (channel_id, limit) -> message JSON terbaru untuk command RECENT
+        self.recent_provider = recent_provider
+        # channel_id (None = semua) -> (waktu dibuat, frame STATS), dipakai ulang selama stats_min_interval
+        self._stats_frames: Dict[Optional[int], Tuple[float, bytes]] = {}
         self.logger = Logger.get_logger(self.__class__.__name__)
         
         self.server_socket: socket.socket = None
         self.clients: List[socket.socket] = []
+        # Output yang di-subscribe per client (tidak ada entry = terima semua message)
+        self.subscriptions: Dict[socket.socket, Set[str]] = {}
+        # Client yang sudah selesai handshake dan menerima broadcast
+        self._live: Set[socket.socket] = set()
+        # Outgoing queue + writer thread per client
+        self._writers: Dict[socket.socket, ClientWriter] = {}
+        # Admission control: address per client dan jumlah koneksi per IP
+        self._addresses: Dict[socket.socket, tuple] = {}
+        self._per_ip: Dict[str, int] = {}
+        self._clients_lock = threading.Lock()
+        # Compression per client dan group compressor bersama (hanya diubah dari event loop)
+        self.compression_codecs = [
+            codec.strip() for codec in config.compression_codecs.split(",")
+            if codec.strip() in available_codecs()
+        ]
+        self._compression_levels = {"zlib": config.zlib_level, "zstd": config.zstd_level}
+        self._compression: Dict[socket.socket, ClientCompression] = {}
+        self._groups: Dict[GroupKey, CompressionGroup] = {}
+        # Dictionary nama per client dengan wire format "dict" (hanya dipakai dari event loop)
+        self._dictionaries: Dict[socket.socket, NameDictionary] = {}
+        # Client yang menerima EDITED sebagai delta, dan versi terakhir per message_id
+        self._delta_clients: Set[socket.socket] = set()
+        self._versions: Optional[MessageVersions] = (
+            MessageVersions(config.edit_delta_cache) if config.edit_delta_cache > 0 else None
+        )
         self.server_running = False
         self._server_thread = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Stream id berubah setiap server start, seq hanya berarti dalam satu stream
+        self.stream_id = f"{int(time.time() * 1000):x}"
+        self._seq = 0
+        self._replay: Deque[BroadcastEntry] = deque(maxlen=config.replay_buffer)
+        
+        # Stats tracking
+        self._accepted = 0
+        self._rejected = 0
+        self._evicted = 0
+        self._slow_consumers = 0
+        # Total dari writer client yang sudah disconnect
+        self._frames_sent = 0
+        self._bytes_sent = 0
+        self._write_syscalls = 0
+        # Total bytes sebelum/sesudah compression dari client/group yang sudah selesai
+        self._compressed_in = 0
+        self._compressed_out = 0
+        self._names_sent = 0
+        self._deltas_sent = 0
+        self._snapshots = 0
     
     async def start(self) -> None:
         """Start socket server"""
@@ -24,6 +141,7 @@ class SocketServer:
             self.logger.warning("Socket server already running")
             return
         
+        self._loop = asyncio.get_running_loop()
         self._server_thread = threading.Thread(target=self._run_server, daemon=True)
         self._server_thread.start()
         
@@ -54,6 +172,7 @@ class SocketServer:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.bind((self.config.host, self.config.port))
+            # MAX_CONNECTIONS = backlog listen(), limit client aktif = MAX_CLIENTS
             self.server_socket.listen(self.config.max_connections)
             
             self.server_running = True
@@ -63,8 +182,9 @@ class SocketServer:
                     self.server_socket.settimeout(1.0)  # Timeout untuk graceful shutdown
                     client_socket, address = self.server_socket.accept()
                     
+                    if not self._admit(client_socket, address):
+                        continue
                     self.logger.info(f"Client connected from {address}")
-                    self.clients.append(client_socket)
                     
                     # Start thread untuk handle client
                     client_thread = threading.Thread(
@@ -85,26 +205,359 @@ class SocketServer:
         finally:
             self.server_running = False
     
+    def _admit(self, client_socket: socket.socket, address: tuple) -> bool:
+        """Terapkan limit global dan per IP, lalu daftarkan client"""
+        ip = address[0]
+        with self._clients_lock:
+            if self.config.max_clients and len(self.clients) >= self.config.max_clients:
+                reason = "server_full"
+            elif self.config.max_connections_per_ip and self._per_ip.get(ip, 0) >= self.config.max_connections_per_ip:
+                reason = "too_many_connections_from_ip"
+            else:
+                reason = None
+                self._configure_socket(client_socket)
+                writer = self._writers[client_socket] = ClientWriter(
+                    client_socket,
+                    self.config.write_coalesce_interval,
+                    self.config.write_coalesce_bytes,
+                    self.config.send_queue_bytes,
+                    self._on_write_error
+                )
+                writer.start()
+                self._addresses[client_socket] = address
+                self._per_ip[ip] = self._per_ip.get(ip, 0) + 1
+                self.clients.append(client_socket)
+                self._accepted += 1
+        
+        if reason is None:
+            return True
+        
+        self._rejected += 1
+        self.logger.warning(f"Rejected client {address}: {reason}")
+        try:
+            client_socket.settimeout(1.0)
+            client_socket.sendall(self._encode_frame("ERROR", {"reason": reason}))
+        except OSError:
+            pass
+        finally:
+            client_socket.close()
+        return False
+    
+    def _configure_socket(self, client_socket: socket.socket) -> None:
+        """
+        TCP keepalive supaya peer yang mati terdeteksi oleh kernel, dan
+        TCP_USER_TIMEOUT supaya data yang tidak pernah di-ack juga memutus koneksi
+        """
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option, value in (
+            ("TCP_KEEPIDLE", self.config.keepalive_idle),
+            ("TCP_KEEPINTVL", self.config.keepalive_interval),
+            ("TCP_KEEPCNT", self.config.keepalive_count)
+        ):
+            if hasattr(socket, option):
+                client_socket.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        if hasattr(socket, "TCP_USER_TIMEOUT"):
+            timeout = self.config.keepalive_idle + self.config.keepalive_interval * self.config.keepalive_count
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, timeout * 1000)
+    
     def _handle_client(self, client_socket: socket.socket, address: tuple) -> None:
-        """Handle individual client connection"""
+        """
+        Handle individual client connection: kirim heartbeat dan baca command client
+        
+        Client yang membalas HEARTBEAT dengan PONG dianggap mendukung liveness
+        check: jika setelah itu tidak ada data dari client dan writer tidak
+        berhasil mengirim apa pun selama heartbeat_interval + pong_timeout,
+        client di-evict. Client sibuk yang HEARTBEAT-nya masih antre di
+        belakang backlog tetap dianggap hidup selama data terus terkirim.
+        """
+        buffer = b""
+        last_heartbeat = time.monotonic()
+        last_received = last_heartbeat
+        acking = False
+        read_timeout = self.config.heartbeat_interval + self.config.pong_timeout
+        handshake_deadline = last_heartbeat + HANDSHAKE_TIMEOUT
+        writer = self._writers.get(client_socket)
         try:
+            self._send(client_socket, self._encode_frame("HELLO", {
+                "stream": self.stream_id,
+                "seq": self._seq,
+                "oldest": self._replay[0].seq if self._replay else self._seq + 1,
+                "compression": self.compression_codecs,
+                "formats": ["json", "dict"] if self.config.name_dictionary_size > 0 else ["json"],
+                "edits": ["full", "delta"] if self._versions is not None else ["full"]
+            }))
             while self.server_running:
+                # Client lama yang tidak mengirim RESUME langsung live
+                now = time.monotonic()
+                if handshake_deadline and now >= handshake_deadline:
+                    handshake_deadline = 0.0
+                    self._resume_threadsafe(client_socket, None, None)
+                
+                last_alive = max(last_received, writer.last_progress) if writer else last_received
+                if acking and now - last_alive > read_timeout:
+                    self._evicted += 1
+                    self.logger.info(f"Evicting unresponsive client {address} (no PONG for {now - last_received:.0f}s)")
+                    break
+                
                 # Send heartbeat
+                if now - last_heartbeat >= self.config.heartbeat_interval:
+                    self._send(client_socket, b"HEARTBEAT\n")
+                    last_heartbeat = now
+                
+                wake_at = last_heartbeat + self.config.heartbeat_interval
+                if handshake_deadline:
+                    wake_at = min(wake_at, handshake_deadline)
+                if acking:
+                    wake_at = min(wake_at, last_alive + read_timeout)
+                client_socket.settimeout(max(0.1, wake_at - now))
                 try:
-                    client_socket.send(b"HEARTBEAT\n")
-                    threading.Event().wait(self.config.heartbeat_interval)
-                except Exception:
+                    data = client_socket.recv(4096)
+                except socket.timeout:
+                    continue
+                if not data:
                     break
+                
+                last_received = time.monotonic()
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    line = line.decode('utf-8', 'replace').strip()
+                    if handshake_deadline and line.upper().startswith("RESUME"):
+                        handshake_deadline = 0.0
+                    if line.upper() == "PONG":
+                        acking = True
+                        continue
+                    self._handle_command(client_socket, address, line)
                     
         except Exception as e:
             self.logger.debug(f"Client {address} disconnected: {e}")
         finally:
             self._disconnect_client(client_socket)
     
+    def _handle_command(self, client_socket: socket.socket, address: tuple, line: str) -> None:
+        """
+        Command dari client: SUBSCRIBE out1,out2 / UNSUBSCRIBE / RESUME [stream seq] /
+        COMPRESS codec / FORMAT dict / EDITS delta / SNAPSHOT message_id /
+        STATS [channel] / RECENT channel [limit]
+        """
+        command, _, argument = line.partition(" ")
+        command = command.upper()
+        if command == "COMPRESS":
+            self._negotiate_compression(client_socket, address, argument.strip().lower())
+        elif command == "FORMAT":
+            self._negotiate_format(client_socket, address, argument.strip().lower())
+        elif command == "EDITS":
+            self._negotiate_edits(client_socket, address, argument.strip().lower())
+        elif command == "SNAPSHOT" and self._loop and argument.strip().isdigit():
+            # Versi lengkap terakhir satu message, untuk client yang tidak punya base delta
+            future = asyncio.run_coroutine_threadsafe(self._snapshot(int(argument)), self._loop)
+            self._send(client_socket, future.result(timeout=5))
+        elif command == "RESUME":
+            parts = argument.split()
+            stream = parts[0] if parts else None
+            seq = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+            self._resume_threadsafe(client_socket, stream, seq)
+        elif command == "SUBSCRIBE":
+            outputs = {name.strip() for name in argument.split(",") if name.strip()}
+            self.subscriptions[client_socket] = outputs
+            self.logger.info(f"Client {address} subscribed to {sorted(outputs)}")
+        elif command == "UNSUBSCRIBE":
+            self.subscriptions.pop(client_socket, None)
+        elif command == "STATS" and self.stats_provider and self._loop:
+            channel_id = int(argument) if argument.strip().isdigit() else None
+            self._send(client_socket, self._stats_frame(channel_id))
+        elif command == "RECENT" and self.recent_provider and self._loop:
+            # RECENT <channel_id> [limit], dijawab dari recent cache di event loop
+            parts = argument.split()
+            if not parts or not parts[0].isdigit():
+                return
+            channel_id = int(parts[0])
+            limit = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 10
+            future = asyncio.run_coroutine_threadsafe(self.recent_provider(channel_id, limit), self._loop)
+            self._send(client_socket, self._encode_recent(channel_id, future.result(timeout=10)))
+        elif command:
+            self.logger.debug(f"Unknown command from {address}: {command}")
+    
+    def _negotiate_compression(self, client_socket: socket.socket, address: tuple, codec: str) -> None:
+        """
+        Aktifkan compression untuk client. Hanya sebelum client live: sampai
+        saat itu semua frame ke client ini dikirim dari thread handler, jadi
+        ack (masih plain) pasti mendahului record compressed pertama.
+        """
+        if client_socket in self._live or client_socket in self._compression:
+            reason = "already_streaming"
+        elif codec not in self.compression_codecs:
+            reason = "unsupported"
+        else:
+            reason = None
+        if reason is not None:
+            self._send(client_socket, self._encode_frame("COMPRESS", {"codec": None, "reason": reason}))
+            return
+        
+        self._send(client_socket, self._encode_frame("COMPRESS", {"codec": codec}))
+        self._compression[client_socket] = ClientCompression(codec, self._compression_levels.get(codec))
+        self.logger.info(f"Client {address} negotiated {codec} compression")
+    
+    def _negotiate_format(self, client_socket: socket.socket, address: tuple, wire_format: str) -> None:
+        """Aktifkan wire format "dict" untuk client, dengan aturan yang sama seperti COMPRESS"""
+        if client_socket in self._live or client_socket in self._dictionaries:
+            reason = "already_streaming"
+        elif wire_format != "dict" or self.config.name_dictionary_size <= 0:
+            reason = "unsupported"
+        else:
+            reason = None
+        if reason is not None:
+            self._send(client_socket, self._encode_frame("FORMAT", {"format": "json", "reason": reason}))
+            return
+        
+        self._send(client_socket, self._encode_frame("FORMAT", {"format": "dict"}))
+        self._dictionaries[client_socket] = NameDictionary(self.config.name_dictionary_size)
+        self.logger.info(f"Client {address} negotiated dict wire format")
+    
+    def _negotiate_edits(self, client_socket: socket.socket, address: tuple, mode: str) -> None:
+        """Aktifkan delta EDITED untuk client, dengan aturan yang sama seperti COMPRESS"""
+        if client_socket in self._live or client_socket in self._delta_clients:
+            reason = "already_streaming"
+        elif mode != "delta" or self._versions is None:
+            reason = "unsupported"
+        else:
+            reason = None
+        if reason is not None:
+            self._send(client_socket, self._encode_frame("EDITS", {"edits": "full", "reason": reason}))
+            return
+        
+        self._send(client_socket, self._encode_frame("EDITS", {"edits": "delta"}))
+        self._delta_clients.add(client_socket)
+        self.logger.info(f"Client {address} negotiated delta edits")
+    
+    async def _snapshot(self, message_id: int) -> bytes:
+        self._snapshots += 1
+        version = self._versions.get(message_id) if self._versions is not None else None
+        return self._encode_frame("SNAPSHOT", {
+            "message_id": message_id,
+            "seq": version[0] if version else None,
+            "message": version[2] if version else None
+        })
+    
+    def _resume_threadsafe(self, client_socket: socket.socket, stream: Optional[str], seq: Optional[int]) -> None:
+        """Jalankan _resume di event loop dan tunggu selesai (dipanggil dari thread client)"""
+        if self._loop is None:
+            self._live.add(client_socket)
+            return
+        asyncio.run_coroutine_threadsafe(self._resume(client_socket, stream, seq), self._loop).result(timeout=30)
+    
+    async def _resume(self, client_socket: socket.socket, stream: Optional[str], seq: Optional[int]) -> None:
+        """
+        Kirim message dari replay buffer setelah seq, lalu jadikan client live
+        
+        Berjalan di event loop yang sama dengan broadcast_message, jadi tidak ada
+        message yang terkirim dua kali atau terlewat di antara replay dan live.
+        """
+        if client_socket in self._live or client_socket not in self.clients:
+            return
+        
+        replayed = 0
+        if seq is not None:
+            oldest = self._replay[0].seq if self._replay else self._seq + 1
+            if stream != self.stream_id:
+                # Server sudah restart, seq client dari stream lain
+                self._send(client_socket, self._encode_frame("GAP", {
+                    "stream": self.stream_id, "reason": "stream_changed", "resume_from": stream
+                }))
+                seq = 0
+            if seq + 1 < oldest:
+                self._send(client_socket, self._encode_frame("GAP", {
+                    "stream": self.stream_id, "reason": "buffer_exceeded", "from": seq + 1, "to": oldest - 1
+                }))
+            
+            subscribed = self.subscriptions.get(client_socket)
+            for entry in list(self._replay):
+                if entry.seq <= seq or (subscribed is not None and not subscribed & entry.routes):
+                    continue
+                self._send(client_socket, self._frame_for(client_socket, entry, subscribed))
+                replayed += 1
+        
+        self._live.add(client_socket)
+        if replayed:
+            self.logger.info(f"Replayed {replayed} messages to resumed client")
+    
+    def _send(self, client_socket: socket.socket, data: bytes) -> None:
+        """
+        Masukkan frame ke queue writer client (tidak blocking); urutan frame
+        dari semua thread dijaga oleh queue. Client dengan compression menerima
+        frame lewat stream private-nya.
+        """
+        compression = self._compression.get(client_socket)
+        if compression is None:
+            self._put(client_socket, data)
+        else:
+            compression.encode_private(data, lambda record: self._put(client_socket, record))
+    
+    def _frame_for(self, client_socket: socket.socket, entry: BroadcastEntry,
+                   subscribed: Optional[Set[str]]) -> bytes:
+        """
+        Varian frame untuk client: delta jika client menerima versi base-nya,
+        compact (didahului NAMES jika perlu) untuk wire format "dict", atau
+        JSON lengkap
+        """
+        if entry.delta is not None and client_socket in self._delta_clients and (
+                subscribed is None or subscribed & entry.base_routes):
+            self._deltas_sent += 1
+            return entry.delta
+        if entry.compact is not None:
+            dictionary = self._dictionaries.get(client_socket)
+            if dictionary is not None:
+                updates = dictionary.updates(entry.names)
+                if updates:
+                    self._send(client_socket, self._encode_frame("NAMES", updates))
+                return entry.compact
+        return entry.frame
+    
+    def _put(self, client_socket: socket.socket, data: bytes) -> bool:
+        """Masukkan bytes apa adanya ke queue writer client"""
+        writer = self._writers.get(client_socket)
+        if writer is None:
+            raise ConnectionError("client disconnected")
+        if not writer.put(data):
+            self._slow_consumers += 1
+            raise ConnectionError(f"send queue full ({writer.pending_bytes} bytes pending), slow consumer")
+        return True
+    
+    def _on_write_error(self, client_socket: socket.socket, error: Exception) -> None:
+        """Dipanggil dari writer thread saat send gagal"""
+        self.logger.debug(f"Write to client failed: {error}")
+        self._disconnect_client(client_socket)
+    
     def _disconnect_client(self, client_socket: socket.socket) -> None:
         """Disconnect client dan cleanup"""
-        if client_socket in self.clients:
-            self.clients.remove(client_socket)
+        with self._clients_lock:
+            if client_socket in self.clients:
+                self.clients.remove(client_socket)
+            address = self._addresses.pop(client_socket, None)
+            if address is not None:
+                remaining = self._per_ip.get(address[0], 1) - 1
+                if remaining > 0:
+                    self._per_ip[address[0]] = remaining
+                else:
+                    self._per_ip.pop(address[0], None)
+        self.subscriptions.pop(client_socket, None)
+        self._live.discard(client_socket)
+        self._delta_clients.discard(client_socket)
+        dictionary = self._dictionaries.pop(client_socket, None)
+        if dictionary is not None:
+            self._names_sent += dictionary.sent
+        compression = self._compression.pop(client_socket, None)
+        if compression is not None:
+            self._compressed_in += compression.bytes_in
+            self._compressed_out += compression.bytes_out
+            if compression.group is not None:
+                self._call_in_loop(self._leave_group, client_socket, compression.group)
+        writer = self._writers.pop(client_socket, None)
+        if writer is not None:
+            writer.close()
+            self._frames_sent += writer.frames_sent
+            self._bytes_sent += writer.bytes_sent
+            self._write_syscalls += writer.syscalls
         
         try:
             client_socket.close()
@@ -112,26 +565,195 @@ class SocketServer:
             pass
     
     async def broadcast_message(self, message_data: DiscordMessage) -> None:
-        """Broadcast message ke semua connected clients"""
-        if not self.clients:
+        """Broadcast message ke semua live clients dan simpan di replay buffer"""
+        self._seq += 1
+        payload = {**message_data.to_dict(), "seq": self._seq}
+        routes: Set[str] = set()
+        if self.router:
+            routes = self.router.route(message_data)
+            payload["routes"] = sorted(routes)
+        entry = BroadcastEntry(self._seq, routes, self._encode_line(payload))
+        if self._dictionaries:
+            # Sekali per message untuk semua client "dict"
+            compact_payload, entry.names = compact_message(payload)
+            entry.compact = self._encode_line(compact_payload)
+        if self._versions is not None:
+            self._track_version(message_data, payload, entry)
+        # Disimpan walaupun tidak ada client, supaya client yang reconnect bisa catch up
+        self._replay.append(entry)
+        self._fan_out(entry)
+    
+    def _track_version(self, message_data: DiscordMessage, payload: Dict[str, Any], entry: BroadcastEntry) -> None:
+        """Simpan versi terbaru message, dan buat delta jika ini EDITED dari versi yang diketahui"""
+        if message_data.type in DELETE_TYPES:
+            self._versions.discard(message_data.message_ids or [message_data.message_id])
+            return
+        if message_data.message_id is None:
             return
         
-        message_json = message_data.to_json()
-        message_bytes = f"{message_json}\n".encode('utf-8')
+        base = self._versions.get(message_data.message_id) if message_data.type == "EDITED" else None
+        if base is not None and self._delta_clients:
+            base_seq, base_routes, base_payload = base
+            delta = self._encode_line(build_edit_delta(base_payload, payload, base_seq))
+            # Edit yang mengganti hampir semua isi lebih murah dikirim utuh
+            if len(delta) < len(entry.frame):
+                entry.delta = delta
+                entry.base_routes = base_routes
+        self._versions.put(message_data.message_id, (entry.seq, entry.routes, payload))
+    
+    @staticmethod
+    def _encode_line(payload: Dict[str, Any]) -> bytes:
+        return f"{json.dumps(payload, separators=(',', ':'), ensure_ascii=False)}\n".encode('utf-8')
+    
+    def _fan_out(self, entry: BroadcastEntry, kind: str = "message") -> None:
+        """
+        Kirim frame ke semua live client (difilter subscription jika entry
+        punya routes), dalam varian yang sesuai dengan client (_frame_for).
+        Client dengan compression menerima record dari group-nya, yang
+        di-compress sekali per group.
+        """
+        routes = entry.routes
+        targets = []
+        for client in self.clients.copy():
+            if client not in self._live:
+                continue
+            subscribed = self.subscriptions.get(client)
+            if routes is not None and subscribed is not None and not subscribed & routes:
+                continue
+            compression = self._compression.get(client)
+            # Group ditentukan dulu untuk semua target, supaya member baru ikut reset context
+            group = self._group_for(client, compression, subscribed) if compression is not None else None
+            targets.append((client, subscribed, group))
         
+        records: Dict[GroupKey, bytes] = {}
         disconnected_clients = []
-        
-        for client in self.clients.copy():
+        for client, subscribed, group in targets:
             try:
-                client.send(message_bytes)
+                data = self._frame_for(client, entry, subscribed)
+                if group is None:
+                    self._put(client, data)
+                    continue
+                record = records.get(group.key)
+                if record is None:
+                    record = records[group.key] = group.encode(data)
+                self._put(client, record)
             except Exception as e:
-                self.logger.warning(f"Failed to send to client: {e}")
+                self.logger.warning(f"Failed to send {kind} to client: {e}")
                 disconnected_clients.append(client)
         
         # Cleanup disconnected clients
         for client in disconnected_clients:
             self._disconnect_client(client)
     
+    def _group_for(self, client_socket: socket.socket, compression: ClientCompression,
+                   subscribed: Optional[Set[str]]) -> CompressionGroup:
+        """CompressionGroup untuk codec dan subscription client (pindah group jika berubah)"""
+        wire_format = "dict" if client_socket in self._dictionaries else "json"
+        edits = "delta" if client_socket in self._delta_clients else "full"
+        key = (compression.codec, wire_format, edits, frozenset(subscribed) if subscribed is not None else None)
+        group = compression.group
+        if group is not None and group.key == key and self._groups.get(key) is group:
+            return group
+        if group is not None:
+            self._leave_group(client_socket, group)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = CompressionGroup(key, self._compression_levels.get(compression.codec))
+        group.join(client_socket)
+        compression.group = group
+        return group
+    
+    def _leave_group(self, client_socket: socket.socket, group: CompressionGroup) -> None:
+        group.members.discard(client_socket)
+        if not group.members and self._groups.get(group.key) is group:
+            del self._groups[group.key]
+            self._compressed_in += group.bytes_in
+            self._compressed_out += group.bytes_out
+    
+    def _call_in_loop(self, callback: Callable[..., None], *args) -> None:
+        """State yang hanya diubah dari event loop (compression group)"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(callback, *args)
+        else:
+            callback(*args)
+    
+    def _stats_frame(self, channel_id: Optional[int]) -> bytes:
+        """
+        Frame STATS untuk command client, di-cache selama stats_min_interval
+        
+        Snapshot dibuat di event loop (supaya tidak balapan dengan update
+        aggregate), jadi client yang mengirim STATS terus-menerus hanya
+        mendapat frame yang sama, bukan membebani event loop.
+        """
+        now = time.monotonic()
+        cached = self._stats_frames.get(channel_id)
+        if cached is not None and now - cached[0] < self.config.stats_min_interval:
+            return cached[1]
+        future = asyncio.run_coroutine_threadsafe(self._stats_snapshot(channel_id), self._loop)
+        frame = self._encode_frame("STATS", future.result(timeout=5))
+        if len(self._stats_frames) >= STATS_FRAME_CACHE_SIZE:
+            self._stats_frames.clear()
+        self._stats_frames[channel_id] = (now, frame)
+        return frame
+    
+    async def _stats_snapshot(self, channel_id: Optional[int]) -> Dict[str, Any]:
+        return self.stats_provider(channel_id, include_series=channel_id is not None)
+    
+    @staticmethod
+    def _encode_frame(kind: str, payload: Dict[str, Any]) -> bytes:
+        """Frame non-message satu baris: '<KIND> <json>'"""
+        return f"{kind} {json.dumps(payload, separators=(',', ':'), ensure_ascii=False)}\n".encode('utf-8')
+    
+    @staticmethod
+    def _encode_recent(channel_id: int, messages: List[str]) -> bytes:
+        """Frame RECENT dari message yang sudah di-encode, tanpa decode/encode ulang"""
+        return f'RECENT {{"channel_id":{channel_id},"messages":[{",".join(messages)}]}}\n'.encode('utf-8')
+    
+    async def broadcast_frame(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Kirim frame (misal STATS) ke semua client, tanpa filter subscription"""
+        if not self.clients:
+            return
+        
+        self._fan_out(BroadcastEntry(None, None, self._encode_frame(kind, payload)), kind=kind)
+    
+    async def broadcast_stats(self, snapshot: Dict[str, Any]) -> None:
+        """Kirim snapshot aggregate sebagai frame STATS"""
+        await self.broadcast_frame("STATS", snapshot)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get socket server statistics"""
+        writers = list(self._writers.values())
+        frames_sent = self._frames_sent + sum(writer.frames_sent for writer in writers)
+        write_syscalls = self._write_syscalls + sum(writer.syscalls for writer in writers)
+        compressors = list(self._compression.values()) + list(self._groups.values())
+        compressed_in = self._compressed_in + sum(item.bytes_in for item in compressors)
+        compressed_out = self._compressed_out + sum(item.bytes_out for item in compressors)
+        return {
+            "clients": len(self.clients),
+            "live": len(self._live),
+            "unique_ips": len(self._per_ip),
+            "accepted": self._accepted,
+            "rejected": self._rejected,
+            "evicted": self._evicted,
+            "slow_consumers": self._slow_consumers,
+            "frames_sent": frames_sent,
+            "bytes_sent": self._bytes_sent + sum(writer.bytes_sent for writer in writers),
+            "write_syscalls": write_syscalls,
+            "frames_per_syscall": round(frames_sent / write_syscalls, 2) if write_syscalls else None,
+            "pending_bytes": sum(writer.pending_bytes for writer in writers),
+            "compressed_clients": len(self._compression),
+            "compression_groups": len(self._groups),
+            "compression_ratio": round(compressed_in / compressed_out, 2) if compressed_out else None,
+            "dict_clients": len(self._dictionaries),
+            "names_sent": self._names_sent + sum(dictionary.sent for dictionary in list(self._dictionaries.values())),
+            "delta_clients": len(self._delta_clients),
+            "deltas_sent": self._deltas_sent,
+            "snapshots": self._snapshots,
+            "versions_tracked": len(self._versions) if self._versions is not None else 0,
+            "seq": self._seq,
+            "replay_buffered": len(self._replay)
+        }
+    
     @property
     def client_count(self) -> int:
         """Get jumlah connected clients"""
@@ -0,0 +1,114 @@
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Tuple
+from config import SpamFilterConfig
+from models.message import DiscordMessage
+from utils.logger import Logger
+from utils.sketches import RollingCountMin, hash64, simhash
+
+
+class SpamFilter:
+    """
+    Deteksi duplikat dan spam dengan struktur data bermemory tetap
+
+    - Duplikat persis: count-min sketch (rolling window) atas content yang
+      dinormalisasi per guild
+    - Near-duplicate: SimHash content dibandingkan dengan ring buffer hash
+      terbaru (hamming distance)
+    - Flood per author: count-min sketch (rolling window) atas author_id
+
+    Message yang melewati threshold diberi flags, atau di-drop jika action=drop.
+    """
+
+    def __init__(self, config: SpamFilterConfig):
+        """
+        Initialize spam filter
+
+        Args:
+            config: Spam filter configuration
+        """
+        self.config = config
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._content_counts = RollingCountMin(config.window, config.sketch_width, config.sketch_depth)
+        self._author_counts = RollingCountMin(config.window, config.sketch_width, config.sketch_depth)
+        self._recent_hashes: Deque[Tuple[float, int]] = deque(maxlen=config.recent_hashes)
+
+        # Stats tracking
+        self._checked = 0
+        self._flagged = 0
+        self._dropped = 0
+        self._reasons: Dict[str, int] = defaultdict(int)
+
+    def check(self, message_data: DiscordMessage) -> bool:
+        """
+        Periksa satu message
+
+        Returns:
+            bool: False jika message harus di-drop
+        """
+        if message_data.type != "NEW":
+            return True
+
+        self._checked += 1
+        reasons = self._detect(message_data, time.monotonic())
+        if not reasons:
+            return True
+
+        for reason in reasons:
+            self._reasons[reason] += 1
+
+        if self.config.action == 'drop':
+            self._dropped += 1
+            self.logger.debug(f"Dropped {reasons} message from {message_data.author} in #{message_data.channel}")
+            return False
+
+        self._flagged += 1
+        message_data.flags = reasons
+        return True
+
+    def _detect(self, message_data: DiscordMessage, now: float) -> List[str]:
+        reasons = []
+
+        if message_data.author_id is not None:
+            if self._author_counts.add(hash64(f"author:{message_data.author_id}"), now) > self.config.author_threshold:
+                reasons.append("author_flood")
+
+        content = " ".join((message_data.content or "").lower().split())
+        if len(content) < self.config.min_length:
+            return reasons
+
+        content_key = hash64(f"{message_data.server_id}:{content}")
+        if self._content_counts.add(content_key, now) >= self.config.duplicate_threshold:
+            reasons.append("duplicate")
+            return reasons
+
+        if self._is_near_duplicate(simhash(content), now):
+            reasons.append("near_duplicate")
+        return reasons
+
+    def _is_near_duplicate(self, fingerprint: int, now: float) -> bool:
+        """Hitung hash mirip di ring buffer dalam window, lalu simpan hash ini"""
+        cutoff = now - self.config.window
+        while self._recent_hashes and self._recent_hashes[0][0] < cutoff:
+            self._recent_hashes.popleft()
+
+        distance = self.config.near_duplicate_distance
+        similar = sum(1 for _, other in self._recent_hashes if (fingerprint ^ other).bit_count() <= distance)
+        self._recent_hashes.append((now, fingerprint))
+        # +1 untuk message ini sendiri, sama seperti threshold duplikat persis
+        return similar + 1 >= self.config.near_duplicate_threshold
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get spam filter statistics"""
+        return {
+            "action": self.config.action,
+            "checked": self._checked,
+            "flagged": self._flagged,
+            "dropped": self._dropped,
+            "reasons": dict(self._reasons),
+            "memory_bytes": (
+                self._content_counts.memory_bytes + self._author_counts.memory_bytes
+                + self.config.recent_hashes * 16
+            )
+        }
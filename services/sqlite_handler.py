@@ -0,0 +1,320 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+from models.message import DiscordMessage
+from services.storage_backend import StorageBackend
+from utils.logger import Logger
+
+
+class SQLiteService(StorageBackend):
+    """
+    Embedded storage berbasis SQLite (WAL mode) untuk deployment tanpa MongoDB
+
+    Semua write dilakukan oleh satu writer thread: request dari event loop
+    dikumpulkan dan ditulis dalam satu transaksi per batch, jadi throughput
+    write stabil dan event loop tidak pernah menunggu disk.
+    """
+
+    COLUMNS = (
+        'document_id', 'message_id', 'type', 'timestamp', 'server', 'server_id',
+        'channel', 'channel_id', 'author', 'author_id', 'content', 'attachments',
+        'embeds', 'reactions', 'message_ids'
+    )
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            document_id TEXT PRIMARY KEY,
+            message_id INTEGER,
+            type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            server TEXT,
+            server_id INTEGER,
+            channel TEXT,
+            channel_id INTEGER NOT NULL,
+            author TEXT,
+            author_id INTEGER,
+            content TEXT,
+            attachments TEXT DEFAULT '[]',
+            embeds INTEGER DEFAULT 0,
+            reactions INTEGER DEFAULT 0,
+            message_ids TEXT,
+            created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_messages_channel_time ON messages(channel_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_messages_author_id ON messages(author_id);
+        CREATE INDEX IF NOT EXISTS idx_messages_message_id ON messages(message_id);
+    """
+
+    # Sentinel untuk menghentikan writer thread
+    _STOP = object()
+
+    def __init__(self, path: str, max_batch: int = 1000):
+        """
+        Initialize SQLite service
+
+        Args:
+            path: Path database file
+            max_batch: Maksimal request yang digabung dalam satu transaksi
+        """
+        self.path = path
+        self.max_batch = max_batch
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._init_lock = asyncio.Lock()
+        self._is_connected = False
+
+        # Stats tracking
+        self._messages_saved = 0
+        self._transactions = 0
+        self._last_error = None
+
+    async def initialize(self) -> bool:
+        """Create schema dan start writer thread"""
+        if self._writer is not None:
+            return True
+
+        async with self._init_lock:
+            if self._writer is not None:
+                return True
+
+            try:
+                await asyncio.to_thread(self._create_schema)
+            except Exception as e:
+                self._last_error = str(e)
+                self.logger.error(f"Failed to open SQLite database {self.path}: {e}")
+                return False
+
+            self._writer = threading.Thread(target=self._run_writer, name="sqlite-writer", daemon=True)
+            self._writer.start()
+            self._is_connected = True
+            self.logger.info(f"SQLite storage ready: {self.path}")
+            return True
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL aman di WAL mode: commit hanya bisa hilang saat power loss, bukan corrupt
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_schema(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+    def _run_writer(self) -> None:
+        """Writer thread: gabungkan request yang menunggu jadi satu transaksi"""
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        sql = f"INSERT OR IGNORE INTO messages ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+
+            requests: List[Tuple[list, asyncio.Future, asyncio.AbstractEventLoop]] = [item]
+            stop = False
+            while len(requests) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                requests.append(item)
+
+            self._write_batch(conn, sql, requests)
+            if stop:
+                break
+
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, sql: str, requests: list) -> None:
+        """Tulis semua request dalam satu transaksi, lalu kabari masing-masing caller"""
+        results = []
+        try:
+            with conn:
+                for records, _, _ in requests:
+                    before = conn.total_changes
+                    conn.executemany(sql, records)
+                    results.append(conn.total_changes - before)
+            self._transactions += 1
+            self._messages_saved += sum(results)
+        except Exception as e:
+            self._last_error = str(e)
+            self.logger.error(f"SQLite write failed: {e}")
+            results = [-1] * len(requests)
+
+        for (_, future, loop), result in zip(requests, results):
+            loop.call_soon_threadsafe(self._resolve, future, result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: int) -> None:
+        if not future.done():
+            future.set_result(result)
+
+    async def save_message(self, message_data: DiscordMessage) -> bool:
+        """Save satu message"""
+        return await self.save_messages([message_data]) >= 0
+
+    async def save_messages(self, messages: List[DiscordMessage]) -> int:
+        """
+        Kirim batch ke writer thread dan tunggu commit
+
+        Returns:
+            int: Jumlah row baru (duplikat document_id diabaikan), -1 jika gagal
+        """
+        if not messages:
+            return 0
+        if not await self.initialize():
+            return -1
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(([self._to_record(message_data) for message_data in messages], future, loop))
+        return await future
+
+    @staticmethod
+    def _to_record(message_data: DiscordMessage) -> tuple:
+        """Convert DiscordMessage ke tuple sesuai COLUMNS"""
+        return (
+            message_data.document_id(),
+            message_data.message_id,
+            message_data.type,
+            message_data.timestamp,
+            message_data.server,
+            message_data.server_id,
+            message_data.channel,
+            message_data.channel_id,
+            message_data.author,
+            message_data.author_id,
+            message_data.content,
+            json.dumps(message_data.attachments, ensure_ascii=False),
+            message_data.embeds,
+            message_data.reactions,
+            json.dumps(message_data.message_ids) if message_data.message_ids is not None else None
+        )
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> dict:
+        """Convert row ke dict dengan field yang sama seperti DiscordMessage"""
+        message = {key: row[key] for key in row.keys() if key not in ('document_id', 'created_at', 'rowid')}
+        message['attachments'] = json.loads(row['attachments']) if row['attachments'] else []
+        message['message_ids'] = json.loads(row['message_ids']) if row['message_ids'] else None
+        return message
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        """Jalankan read query di connection terpisah (WAL: reader tidak memblok writer)"""
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    async def get_message_count(self) -> int:
+        """Get total jumlah messages dalam database"""
+        try:
+            if not await self.initialize():
+                return -1
+            rows = await asyncio.to_thread(self._query, "SELECT count(*) FROM messages")
+            return rows[0][0]
+        except Exception as e:
+            self.logger.error(f"Error getting message count: {e}")
+            return -1
+
+    async def get_recent_messages(self, limit: int = 10, channel_id: Optional[int] = None) -> list:
+        """Get recent messages dari database (opsional hanya satu channel)"""
+        try:
+            if not await self.initialize():
+                return []
+            if channel_id is not None:
+                sql, params = "SELECT * FROM messages WHERE channel_id = ? ORDER BY timestamp DESC LIMIT ?", (channel_id, limit)
+            else:
+                sql, params = "SELECT * FROM messages ORDER BY timestamp DESC LIMIT ?", (limit,)
+            rows = await asyncio.to_thread(self._query, sql, params)
+            return [self._from_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting recent messages: {e}")
+            return []
+
+    async def iter_messages(self, since: Optional[str] = None, batch_size: int = 1000):
+        """Stream messages urut timestamp dengan keyset pagination"""
+        if not await self.initialize():
+            raise sqlite3.OperationalError(f"SQLite not available: {self._last_error}")
+
+        where, params = "timestamp > ?", (since or "",)
+        while True:
+            rows = await asyncio.to_thread(
+                self._query,
+                f"SELECT * FROM messages WHERE {where} ORDER BY timestamp, document_id LIMIT ?",
+                (*params, batch_size)
+            )
+            if not rows:
+                return
+            for row in rows:
+                yield self._from_row(row)
+            # Halaman berikutnya mulai setelah row terakhir (document_id untuk timestamp yang sama)
+            where, params = "(timestamp, document_id) > (?, ?)", (rows[-1]['timestamp'], rows[-1]['document_id'])
+
+    async def iter_appended(self, after: Optional[int] = None, batch_size: int = 1000):
+        """Stream messages urut rowid; satu writer thread, jadi rowid naik sesuai urutan commit"""
+        if not await self.initialize():
+            raise sqlite3.OperationalError(f"SQLite not available: {self._last_error}")
+
+        last = after or 0
+        while True:
+            rows = await asyncio.to_thread(
+                self._query, "SELECT rowid, * FROM messages WHERE rowid > ? ORDER BY rowid LIMIT ?", (last, batch_size)
+            )
+            if not rows:
+                return
+            for row in rows:
+                yield row['rowid'], self._from_row(row)
+            last = rows[-1]['rowid']
+
+    async def get_revision(self, message_id: int, timestamp: str) -> Optional[dict]:
+        """Get row message_id dengan timestamp tersebut"""
+        if not await self.initialize():
+            raise sqlite3.OperationalError(f"SQLite not available: {self._last_error}")
+        rows = await asyncio.to_thread(
+            self._query, "SELECT * FROM messages WHERE message_id = ? AND timestamp = ? LIMIT 1", (message_id, timestamp)
+        )
+        return self._from_row(rows[0]) if rows else None
+
+    async def disconnect(self) -> None:
+        """Stop writer thread setelah semua request pending ditulis"""
+        if self._writer is not None:
+            self._queue.put(self._STOP)
+            await asyncio.to_thread(self._writer.join)
+            self._writer = None
+            self._is_connected = False
+            self.logger.info("SQLite storage closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get service statistics"""
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "connected": self._is_connected,
+            "messages_saved": self._messages_saved,
+            "transactions": self._transactions,
+            "pending_requests": self._queue.qsize(),
+            "last_error": self._last_error
+        }
+
+    @property
+    def is_available(self) -> bool:
+        """Check if SQLite storage is available"""
+        return self._is_connected
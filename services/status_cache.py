@@ -0,0 +1,153 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Any
+from models.message import DiscordMessage
+from services.channel_manager import ChannelManager
+from services.socket_server import SocketServer
+from utils.logger import Logger
+
+
+class StatusCache:
+    """
+    Snapshot status monitoring yang di-maintain secara incremental
+
+    Nama channel dan jumlah pesan diupdate dari event yang lewat, dan
+    snapshot hanya di-rebuild paling sering sekali per refresh_interval,
+    jadi banyak `!status` sekaligus tidak membebani event loop.
+    """
+
+    # Discord membatasi satu message 2000 karakter, sisakan ruang untuk header
+    MAX_PAGE_CHARS = 1900
+    # Bobot EWMA untuk rate per channel
+    RATE_SMOOTHING = 0.5
+
+    def __init__(self, channel_manager: ChannelManager, socket_server: SocketServer,
+                 channel_resolver: Callable[[int], Any], refresh_interval: float = 10.0):
+        """
+        Initialize status cache
+
+        Args:
+            channel_manager: ChannelManager untuk daftar monitored channels
+            socket_server: SocketServer untuk status dan jumlah client
+            channel_resolver: Function channel_id -> channel object (misal bot.get_channel)
+            refresh_interval: Minimal jarak (detik) antar rebuild snapshot
+        """
+        self.channel_manager = channel_manager
+        self.socket_server = socket_server
+        self.channel_resolver = channel_resolver
+        self.refresh_interval = refresh_interval
+        self.logger = Logger.get_logger(self.__class__.__name__)
+
+        self._names: Dict[int, str] = {}
+        self._counts: Dict[int, int] = {}
+        self._rates: Dict[int, float] = {}
+        self._pages: List[str] = []
+        self._built_at: Optional[float] = None
+        self._window_start = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        # Stats tracking
+        self._rebuilds = 0
+        self._served_from_cache = 0
+
+    async def observe(self, message_data: DiscordMessage) -> None:
+        """Update counter dari event yang diproses (dipasang sebagai broadcaster)"""
+        channel_id = message_data.channel_id
+        self._counts[channel_id] = self._counts.get(channel_id, 0) + 1
+        if message_data.channel and message_data.channel != str(channel_id):
+            self._names[channel_id] = message_data.channel
+
+    async def get_page(self, page: int = 1) -> str:
+        """Get satu halaman status, rebuild snapshot jika sudah kadaluarsa"""
+        pages = await self._get_pages()
+        page = min(max(page, 1), len(pages))
+        return pages[page - 1]
+
+    async def _get_pages(self) -> List[str]:
+        """Return snapshot pages, rebuild maksimal sekali per refresh_interval"""
+        async with self._lock:
+            now = time.monotonic()
+            if self._built_at is not None and now - self._built_at < self.refresh_interval:
+                self._served_from_cache += 1
+                return self._pages
+
+            self._pages = self._build_pages(now)
+            self._built_at = now
+            self._rebuilds += 1
+            return self._pages
+
+    def _build_pages(self, now: float) -> List[str]:
+        """Build snapshot dari state incremental"""
+        channels = self.channel_manager.get_monitored_channels()
+        elapsed = now - self._window_start
+        self._window_start = now
+
+        # Update rate per menit dari counter sejak rebuild terakhir
+        for ch_id in channels:
+            count = self._counts.pop(ch_id, 0)
+            if elapsed > 0:
+                current = count * 60.0 / elapsed
+                previous = self._rates.get(ch_id, current)
+                self._rates[ch_id] = previous + self.RATE_SMOOTHING * (current - previous)
+
+        # Buang state channel yang sudah tidak dimonitor
+        for state in (self._names, self._rates):
+            for ch_id in [ch_id for ch_id in state if ch_id not in channels]:
+                del state[ch_id]
+        self._counts.clear()
+
+        header = [
+            "**Status:**",
+            f"Socket: {'Running' if self.socket_server.is_running else 'Stopped'}",
+            f"Clients: {self.socket_server.client_count}",
+            f"Channels ({len(channels)}):"
+        ]
+        if not channels:
+            return ["\n".join(header[:3] + ["No channels monitored"])]
+
+        lines = [self._format_channel(ch_id) for ch_id in sorted(channels, key=self._sort_key)]
+
+        chunks: List[List[str]] = [[]]
+        chunk_size = 0
+        budget = self.MAX_PAGE_CHARS - len("\n".join(header)) - len("\nPage 0000/0000")
+        for line in lines:
+            if chunks[-1] and chunk_size + len(line) + 1 > budget:
+                chunks.append([])
+                chunk_size = 0
+            chunks[-1].append(line)
+            chunk_size += len(line) + 1
+
+        total = len(chunks)
+        return [
+            "\n".join(header + chunk + [f"Page {index}/{total}"])
+            for index, chunk in enumerate(chunks, start=1)
+        ]
+
+    def _format_channel(self, ch_id: int) -> str:
+        """Format satu baris channel"""
+        name = self._names.get(ch_id)
+        if name is None:
+            info = self.channel_manager.get_channel_info(ch_id)
+            name = info.channel_name if info else None
+        if name is None:
+            # Hanya channel yang belum pernah terlihat yang perlu di-resolve
+            channel = self.channel_resolver(ch_id)
+            name = channel.name if channel else "Unknown"
+            if channel:
+                self._names[ch_id] = name
+        rate = self._rates.get(ch_id)
+        rate_text = f"{rate:.1f}/min" if rate is not None else "n/a"
+        return f"• {name} ({ch_id}) - {rate_text}"
+
+    def _sort_key(self, ch_id: int):
+        """Channel paling aktif di halaman pertama"""
+        return (-self._rates.get(ch_id, 0.0), ch_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get status cache statistics"""
+        return {
+            "rebuilds": self._rebuilds,
+            "served_from_cache": self._served_from_cache,
+            "pages": len(self._pages),
+            "known_names": len(self._names)
+        }
@@ -0,0 +1,256 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from config import StorageConfig
+from models.message import DiscordMessage
+from utils.logger import Logger
+
+# iter_appended hanya mengembalikan row yang di-insert lebih lama dari ini (detik),
+# supaya transaksi/batch yang masih berjalan tidak terlewati oleh cursor
+APPEND_SETTLE_SECONDS = 60
+
+
+class StorageBackend(ABC):
+    """Interface untuk storage message yang dipakai MessageProcessor"""
+
+    _last_error: Optional[str] = None
+
+    @abstractmethod
+    async def initialize(self) -> bool:
+        """Initialize koneksi ke storage"""
+
+    @abstractmethod
+    async def save_message(self, message_data: DiscordMessage) -> bool:
+        """Save satu message"""
+
+    async def save_messages(self, messages: List[DiscordMessage]) -> int:
+        """
+        Save banyak message sekaligus
+
+        Returns:
+            int: Jumlah message baru yang tersimpan (duplikat diabaikan), -1 jika gagal
+        """
+        saved = 0
+        for message_data in messages:
+            if not await self.save_message(message_data):
+                return -1
+            saved += 1
+        return saved
+
+    @abstractmethod
+    async def get_message_count(self) -> int:
+        """Get total jumlah messages"""
+
+    @abstractmethod
+    async def get_recent_messages(self, limit: int = 10, channel_id: Optional[int] = None) -> list:
+        """Get recent messages (semua channel, atau satu channel), terbaru dulu"""
+
+    async def iter_messages(self, since: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """
+        Stream semua message urut timestamp (terlama dulu)
+
+        Args:
+            since: Jika di-set, hanya message dengan timestamp > since
+            batch_size: Jumlah row yang diambil per round trip
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support streaming reads")
+        yield  # pragma: no cover
+
+    async def iter_appended(self, after: Any = None, batch_size: int = 1000) -> AsyncIterator[Tuple[Any, dict]]:
+        """
+        Stream message urut waktu insert ke storage (bukan timestamp message)
+
+        Message lama yang baru dimasukkan (backfill, gap recovery, import)
+        tetap muncul setelah cursor, jadi cocok untuk export incremental.
+
+        Args:
+            after: Cursor dari yield sebelumnya (None = dari awal)
+            batch_size: Jumlah row yang diambil per round trip
+
+        Yields:
+            tuple: (cursor JSON-serializable, message)
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support insertion-order reads")
+        yield  # pragma: no cover
+
+    async def get_revision(self, message_id: int, timestamp: str) -> Optional[dict]:
+        """
+        Get satu revisi message (row dengan message_id dan timestamp tersebut)
+
+        Dipakai RevisionStorage untuk memuat base patch yang tidak ada di cache.
+
+        Returns:
+            dict: Message, atau None jika tidak ditemukan
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support revision lookups")
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        """Close koneksi storage"""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get storage statistics"""
+
+    @property
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Check apakah storage bisa dipakai"""
+
+    @property
+    def last_error(self) -> Optional[str]:
+        """Error terakhir dari storage"""
+        return self._last_error
+
+
+class BatchWriter(StorageBackend):
+    """
+    Wrapper yang menggabungkan save_message dari banyak worker jadi satu save_messages
+
+    Setiap caller tetap menunggu hasil untuk message-nya sendiri, tapi write
+    ke backend dilakukan per batch (batch_size atau max_delay, mana yang duluan).
+    """
+
+    def __init__(self, backend: StorageBackend, batch_size: int = 500, max_delay: float = 0.05):
+        """
+        Initialize batch writer
+
+        Args:
+            backend: Storage backend yang sebenarnya
+            batch_size: Maksimal message per batch
+            max_delay: Maksimal waktu (detik) message menunggu di buffer
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._pending: List[Tuple[DiscordMessage, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+
+        # Stats tracking
+        self._batches = 0
+        self._batched_messages = 0
+
+    async def initialize(self) -> bool:
+        return await self.backend.initialize()
+
+    async def save_message(self, message_data: DiscordMessage) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message_data, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._start_flush)
+
+        return await future
+
+    async def save_messages(self, messages: List[DiscordMessage]) -> int:
+        # Caller yang sudah punya batch langsung ke backend
+        return await self.backend.save_messages(messages)
+
+    def _start_flush(self) -> None:
+        """Ambil semua pending message dan flush di background task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: List[Tuple[DiscordMessage, asyncio.Future]]) -> None:
+        try:
+            result = await self.backend.save_messages([message_data for message_data, _ in batch])
+            success = result >= 0
+        except Exception as e:
+            self.logger.error(f"Error flushing batch of {len(batch)} messages: {e}")
+            success = False
+
+        self._batches += 1
+        self._batched_messages += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(success)
+
+    async def get_message_count(self) -> int:
+        return await self.backend.get_message_count()
+
+    async def get_recent_messages(self, limit: int = 10, channel_id: Optional[int] = None) -> list:
+        return await self.backend.get_recent_messages(limit, channel_id)
+
+    async def iter_messages(self, since: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        async for message in self.backend.iter_messages(since, batch_size):
+            yield message
+
+    async def iter_appended(self, after: Any = None, batch_size: int = 1000) -> AsyncIterator[Tuple[Any, dict]]:
+        async for cursor, message in self.backend.iter_appended(after, batch_size):
+            yield cursor, message
+
+    async def get_revision(self, message_id: int, timestamp: str) -> Optional[dict]:
+        return await self.backend.get_revision(message_id, timestamp)
+
+    async def disconnect(self) -> None:
+        """Flush sisa buffer lalu close backend"""
+        self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.backend.disconnect()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.backend.get_stats()
+        stats["batching"] = {
+            "batch_size": self.batch_size,
+            "max_delay": self.max_delay,
+            "batches": self._batches,
+            "avg_batch": round(self._batched_messages / self._batches, 1) if self._batches else 0,
+            "pending": len(self._pending)
+        }
+        return stats
+
+    @property
+    def is_available(self) -> bool:
+        return self.backend.is_available
+
+    @property
+    def last_error(self) -> Optional[str]:
+        return self.backend.last_error
+
+
+def create_storage(config: StorageConfig) -> Optional[StorageBackend]:
+    """
+    Create storage backend sesuai konfigurasi, dibungkus BatchWriter jika
+    batching aktif dan RevisionStorage jika EDITED disimpan sebagai patch
+    """
+    backend_name = config.backend.lower()
+
+    # Import di sini supaya dependency backend lain tidak wajib ter-install
+    if backend_name == 'mongo':
+        from config import MongoDBConfig
+        from services.mongo_handler import MongoDBService
+        backend = MongoDBService(MongoDBConfig.from_env())
+    elif backend_name == 'postgres':
+        from config import PostgresConfig
+        from services.postgres_handler import PostgresService
+        backend = PostgresService(PostgresConfig.from_env())
+    elif backend_name == 'sqlite':
+        from services.sqlite_handler import SQLiteService
+        backend = SQLiteService(config.sqlite_path)
+    elif backend_name == 'none':
+        return None
+    else:
+        raise ValueError(f"Unknown storage backend: {config.backend}")
+
+    # Writer thread SQLite sudah menggabungkan write jadi satu transaksi
+    if config.batch_size > 1 and backend_name != 'sqlite':
+        backend = BatchWriter(backend, config.batch_size, config.batch_max_delay)
+    if config.store_edit_deltas:
+        # Patch dibuat sebelum batching, urut sesuai save_message
+        from services.revision_storage import RevisionStorage
+        backend = RevisionStorage(backend)
+    return backend
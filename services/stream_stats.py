@@ -0,0 +1,235 @@
+import asyncio
+import heapq
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import StatsConfig
+from models.message import DiscordMessage
+from utils.logger import Logger
+from utils.sketches import SpaceSaving
+from utils.timeseries import RingSeries
+
+
+class CompletedAuthors:
+    """Counter author dari bucket lengkap dalam window, diupdate incremental saat bucket berganti"""
+
+    __slots__ = ('bucket', 'counts', 'included', 'top')
+
+    def __init__(self):
+        self.bucket: Optional[int] = None
+        self.counts: Counter = Counter()
+        # bucket -> dict count SpaceSaving bucket itu (tidak diubah lagi setelah bucket lewat)
+        self.included: Dict[int, dict] = {}
+        self.top: List[Tuple[str, int]] = []
+
+
+class ChannelAggregate:
+    """Rolling counters satu channel: messages, edits, deletes, dan top authors per bucket"""
+
+    __slots__ = ('name', 'server', 'messages', 'edits', 'deletes', 'authors', 'completed_authors')
+
+    def __init__(self, buckets: int):
+        self.name: Optional[str] = None
+        self.server: Optional[str] = None
+        self.messages = RingSeries(buckets)
+        self.edits = RingSeries(buckets)
+        self.deletes = RingSeries(buckets)
+        # (bucket, SpaceSaving) per slot, di-reset lazy seperti RingSeries
+        self.authors: List[Optional[Tuple[int, SpaceSaving]]] = [None] * buckets
+        # Gabungan count author dari bucket yang sudah lengkap, lihat StreamStats._top_authors
+        self.completed_authors: Optional[CompletedAuthors] = None
+
+
+class StreamStats:
+    """
+    Aggregate real-time per channel dan per author dalam rolling window
+
+    Diupdate dari setiap event yang diproses (dipasang sebagai broadcaster
+    di MessageProcessor), disimpan sebagai ring buffer per bucket waktu,
+    jadi snapshot tidak pernah perlu membaca history. Snapshot dikirim
+    berkala sebagai frame STATS ke socket client.
+    """
+
+    def __init__(self, config: StatsConfig):
+        """
+        Initialize stream stats
+
+        Args:
+            config: Stats configuration
+        """
+        self.config = config
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._channels: Dict[int, ChannelAggregate] = {}
+        self._publish_task: Optional[asyncio.Task] = None
+
+        # Stats tracking
+        self._events = 0
+        self._published = 0
+
+    def _bucket(self, now: Optional[float] = None) -> int:
+        return int((time.time() if now is None else now) // self.config.bucket_seconds)
+
+    async def observe(self, message_data: DiscordMessage) -> None:
+        """Update aggregate dari event yang diproses (dipasang sebagai broadcaster)"""
+        self.record(message_data)
+
+    def record(self, message_data: DiscordMessage, now: Optional[float] = None) -> None:
+        bucket = self._bucket(now)
+        aggregate = self._channels.get(message_data.channel_id)
+        if aggregate is None:
+            aggregate = self._channels[message_data.channel_id] = ChannelAggregate(self.config.buckets)
+        if message_data.channel and message_data.channel != str(message_data.channel_id):
+            aggregate.name = message_data.channel
+        if message_data.server:
+            aggregate.server = message_data.server
+
+        message_type = message_data.type
+        if message_type == "EDITED":
+            aggregate.edits.add(bucket)
+        elif message_type == "DELETED":
+            aggregate.deletes.add(bucket)
+        elif message_type == "BULK_DELETED":
+            aggregate.deletes.add(bucket, len(message_data.message_ids or []) or 1)
+        else:
+            aggregate.messages.add(bucket)
+            slot = bucket % self.config.buckets
+            entry = aggregate.authors[slot]
+            if entry is None or entry[0] != bucket:
+                entry = aggregate.authors[slot] = (bucket, SpaceSaving(self.config.author_capacity))
+            entry[1].add(message_data.author)
+        self._events += 1
+
+    def snapshot(self, channel_id: Optional[int] = None, include_series: bool = False) -> Dict[str, Any]:
+        """
+        Snapshot aggregate untuk semua channel (atau satu channel)
+
+        Args:
+            channel_id: Hanya channel ini
+            include_series: Sertakan count per bucket (terlama dulu)
+        """
+        bucket = self._bucket()
+        channel_ids = [channel_id] if channel_id is not None else list(self._channels)
+        channels = {}
+        for ch_id in channel_ids:
+            aggregate = self._channels.get(ch_id)
+            if aggregate is None:
+                continue
+            summary = self._summarize(aggregate, bucket, include_series)
+            if summary is None:
+                # Tidak ada aktivitas dalam window, buang state channel
+                del self._channels[ch_id]
+                continue
+            channels[str(ch_id)] = summary
+
+        return {
+            "generated_at": datetime.utcnow().isoformat(),
+            "bucket_seconds": self.config.bucket_seconds,
+            "window_buckets": self.config.buckets,
+            "channels": channels
+        }
+
+    def _summarize(self, aggregate: ChannelAggregate, bucket: int,
+                   include_series: bool) -> Optional[Dict[str, Any]]:
+        series = aggregate.messages.values(bucket)
+        messages = sum(series)
+        edits = aggregate.edits.total(bucket)
+        deletes = aggregate.deletes.total(bucket)
+        if not messages and not edits and not deletes:
+            return None
+
+        # Rate dari bucket yang sudah lengkap saja (bucket sekarang masih berjalan)
+        recent = series[-1 - self.config.rate_buckets:-1]
+        per_minute = sum(recent) / len(recent) * 60 / self.config.bucket_seconds if recent else 0.0
+
+        summary = {
+            "channel": aggregate.name,
+            "server": aggregate.server,
+            "per_minute": round(per_minute, 2),
+            "current_bucket": series[-1],
+            "messages": messages,
+            "edits": edits,
+            "deletes": deletes,
+            "edit_ratio": round(edits / messages, 3) if messages else None,
+            "delete_ratio": round(deletes / messages, 3) if messages else None,
+            "top_authors": self._top_authors(aggregate, bucket)
+        }
+        if include_series:
+            summary["series"] = {
+                "messages": series,
+                "edits": aggregate.edits.values(bucket),
+                "deletes": aggregate.deletes.values(bucket)
+            }
+        return summary
+
+    def _top_authors(self, aggregate: ChannelAggregate, bucket: int) -> List[Tuple[str, int]]:
+        """
+        Top author dalam window: jumlah count per bucket (Counter), bukan merge SpaceSaving
+
+        Bucket yang sudah lengkap digabung incremental (tambah bucket baru,
+        kurangi yang keluar window) sekali per bucket; per snapshot hanya
+        bucket sekarang yang ditambahkan. Top-n hasil
+        gabungan pasti berasal dari top-n bucket lengkap atau author di
+        bucket sekarang, jadi hanya kandidat itu yang dihitung ulang.
+        """
+        limit = self.config.top_authors
+        completed = aggregate.completed_authors
+        if completed is None:
+            completed = aggregate.completed_authors = CompletedAuthors()
+        if completed.bucket != bucket:
+            # Tambah bucket yang baru lengkap, kurangi bucket yang keluar dari window
+            oldest = bucket - self.config.buckets
+            current = {entry[0]: entry[1].counts for entry in aggregate.authors
+                       if entry is not None and oldest < entry[0] < bucket}
+            for expired in [b for b in completed.included if b not in current]:
+                for author, count in completed.included.pop(expired).items():
+                    remaining = completed.counts[author] - count
+                    if remaining > 0:
+                        completed.counts[author] = remaining
+                    else:
+                        del completed.counts[author]
+            for added, counts in current.items():
+                if added not in completed.included:
+                    completed.included[added] = counts
+                    for author, count in counts.items():
+                        completed.counts[author] += count
+            completed.bucket = bucket
+            completed.top = completed.counts.most_common(limit)
+
+        entry = aggregate.authors[bucket % self.config.buckets]
+        if entry is None or entry[0] != bucket:
+            return completed.top
+        candidates = dict(completed.top)
+        for author, count in entry[1].counts.items():
+            candidates[author] = completed.counts.get(author, 0) + count
+        return heapq.nlargest(limit, candidates.items(), key=lambda item: item[1])
+
+    async def start(self, publish: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """Start loop yang mengirim snapshot setiap push_interval"""
+        if self.config.push_interval <= 0 or self._publish_task is not None:
+            return
+        self._publish_task = asyncio.create_task(self._publish_loop(publish))
+
+    async def _publish_loop(self, publish: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        while True:
+            await asyncio.sleep(self.config.push_interval)
+            try:
+                await publish(self.snapshot())
+                self._published += 1
+            except Exception as e:
+                self.logger.error(f"Error publishing stats: {e}")
+
+    async def stop(self) -> None:
+        """Stop publish loop"""
+        if self._publish_task is not None:
+            self._publish_task.cancel()
+            await asyncio.gather(self._publish_task, return_exceptions=True)
+            self._publish_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stream stats statistics"""
+        return {
+            "channels": len(self._channels),
+            "events": self._events,
+            "published": self._published
+        }
@@ -0,0 +1,103 @@
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
+from models.message import DiscordMessage
+from utils.logger import Logger
+
+# Versi format capture (baris header setiap sesi rekaman)
+CAPTURE_VERSION = 1
+
+# Buffer file di-flush minimal setiap interval ini (detik)
+FLUSH_INTERVAL = 1.0
+
+
+class TrafficRecorder:
+    """
+    Rekam event yang masuk ke pipeline bot untuk di-replay (run_replay.py)
+
+    Satu baris JSON per event: {"t": detik sejak awal sesi, "event": {...}}.
+    Setiap sesi (start) diawali baris header {"capture": versi, "started": ...},
+    jadi restart bot menambah sesi baru di file yang sama. Event direkam
+    sebelum spam filter dan dispatcher, persis seperti yang diterima handler.
+    """
+
+    def __init__(self, path: str, max_events: int = 0):
+        """
+        Initialize recorder
+
+        Args:
+            path: Path file capture (JSON Lines)
+            max_events: Berhenti merekam setelah sekian event (0 = tanpa batas)
+        """
+        self.path = path
+        self.max_events = max_events
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._file: Optional[IO[str]] = None
+        self._started = 0.0
+        self._last_flush = 0.0
+
+        # Stats tracking
+        self._recorded = 0
+        self._skipped = 0
+
+    def start(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1 << 16)
+        self._file.write(json.dumps({"capture": CAPTURE_VERSION, "started": datetime.utcnow().isoformat()}) + "\n")
+        self._started = self._last_flush = time.monotonic()
+        self.logger.info(f"Recording traffic to {self.path}")
+
+    def record(self, message_data: DiscordMessage) -> None:
+        """Tulis satu event (buffered, di-flush setiap FLUSH_INTERVAL)"""
+        if self._file is None:
+            return
+        if self.max_events and self._recorded >= self.max_events:
+            self._skipped += 1
+            return
+        now = time.monotonic()
+        self._file.write(json.dumps(
+            {"t": round(now - self._started, 6), "event": message_data.to_dict()},
+            separators=(',', ':'), ensure_ascii=False
+        ) + "\n")
+        self._recorded += 1
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.logger.info(f"Recorded {self._recorded} events to {self.path}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "recorded": self._recorded, "skipped": self._skipped}
+
+
+def iter_capture(path: str) -> Iterator[Tuple[float, DiscordMessage]]:
+    """
+    Baca file capture, yield (detik sejak awal rekaman, event)
+
+    Sesi berikutnya disambung tepat setelah event terakhir sesi sebelumnya
+    (waktu bot mati tidak ikut di-replay). Baris yang rusak (misal terpotong
+    saat crash) dilewati.
+    """
+    logger = Logger.get_logger("TrafficCapture")
+    session_offset = 0.0
+    last = 0.0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed capture line in {path}")
+                continue
+            if "capture" in record:
+                if record["capture"] > CAPTURE_VERSION:
+                    raise ValueError(f"Unsupported capture version {record['capture']} in {path}")
+                session_offset = last
+                continue
+            last = session_offset + record["t"]
+            yield last, DiscordMessage.from_dict(record["event"])
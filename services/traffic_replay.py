@@ -0,0 +1,210 @@
+import asyncio
+import socket
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config import DispatcherConfig, SocketConfig
+from models.message import DiscordMessage
+from services.message_dispatcher import MessageDispatcher
+from services.message_processor import MessageProcessor
+from services.socket_server import SocketServer
+from services.storage_backend import StorageBackend
+from utils.logger import Logger
+
+# Perubahan latency di bawah ini (ms) dianggap noise, bukan regresi
+LATENCY_NOISE_MS = 0.5
+
+# Metric yang dibandingkan dengan baseline: (path, True jika lebih besar lebih baik)
+COMPARED_METRICS = (
+    (("throughput",), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p99"), False),
+)
+
+
+def percentiles(values: List[float], scale: float = 1000.0) -> Dict[str, float]:
+    """p50/p90/p99/max (nearest rank), dikali scale (default detik -> ms)"""
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    result = {
+        name: round(ordered[min(len(ordered) - 1, int(quantile * len(ordered)))] * scale, 3)
+        for name, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+    }
+    result["max"] = round(ordered[-1] * scale, 3)
+    return result
+
+
+def _drain_client(port: int, ready: threading.Event, done: threading.Event) -> None:
+    """Socket client yang langsung live dan membuang semua data"""
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.sendall(b"RESUME\n")
+        sock.settimeout(0.5)
+        ready.set()
+        while not done.is_set():
+            try:
+                if not sock.recv(1 << 20):
+                    return
+            except socket.timeout:
+                continue
+
+
+class TrafficReplayer:
+    """
+    Replay rekaman traffic (TrafficRecorder) lewat MessageProcessor dan fan-out socket
+
+    Event di-submit seperti DiscordBot._submit: lewat MessageDispatcher jika
+    aktif, atau satu task per event (seperti handler discord.py). speed 1 =
+    jarak waktu asli, N = N kali lebih cepat, 0 = secepat mungkin. Latency
+    dihitung dari submit sampai broadcast event tersebut; lag = seberapa
+    terlambat submit dibanding jadwal rekaman (event loop kewalahan).
+    """
+
+    def __init__(self, events: List[Tuple[float, DiscordMessage]], speed: float = 1.0, clients: int = 10,
+                 socket_config: Optional[SocketConfig] = None,
+                 dispatcher_config: Optional[DispatcherConfig] = None,
+                 storage: Optional[StorageBackend] = None, timeout: float = 60.0):
+        """
+        Initialize replayer
+
+        Args:
+            events: (detik sejak awal rekaman, event) dari iter_capture
+            speed: Kelipatan kecepatan rekaman, 0 = maksimum
+            clients: Jumlah socket client yang menerima fan-out
+            socket_config: Konfigurasi socket server (host/port lokal)
+            dispatcher_config: Konfigurasi dispatcher, None = proses inline
+            storage: Storage backend yang ikut diukur (None = tanpa storage)
+            timeout: Batas waktu menunggu event selesai setelah submit terakhir
+        """
+        self.events = events
+        self.speed = speed
+        self.clients = clients
+        self.socket_config = socket_config or SocketConfig(
+            host='127.0.0.1', port=18890, max_clients=clients + 1, max_connections_per_ip=0,
+            heartbeat_interval=3600
+        )
+        self.dispatcher_config = dispatcher_config
+        self.storage = storage
+        self.timeout = timeout
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self._submitted: Dict[int, float] = {}
+        self._latencies: List[float] = []
+
+    async def _observe(self, message_data: DiscordMessage) -> None:
+        """Broadcaster terakhir: catat waktu selesai event"""
+        submitted = self._submitted.pop(id(message_data), None)
+        if submitted is not None:
+            self._latencies.append(time.perf_counter() - submitted)
+
+    async def run(self) -> Dict[str, Any]:
+        """Jalankan replay dan return hasil pengukuran"""
+        self._submitted.clear()
+        self._latencies = []
+        with tempfile.TemporaryDirectory() as directory:
+            processor = MessageProcessor(f"{directory}/messages.txt", storage=self.storage)
+            server = SocketServer(self.socket_config)
+            await server.start()
+            while not server.is_running:
+                await asyncio.sleep(0.01)
+            processor.add_broadcaster(server.broadcast_message)
+            processor.add_broadcaster(self._observe)
+
+            done = threading.Event()
+            threads = []
+            for _ in range(self.clients):
+                ready = threading.Event()
+                thread = threading.Thread(target=_drain_client, args=(self.socket_config.port, ready, done),
+                                          daemon=True)
+                thread.start()
+                ready.wait()
+                threads.append(thread)
+            while server.get_stats()["live"] < self.clients:
+                await asyncio.sleep(0.01)
+
+            dispatcher = None
+            if self.dispatcher_config is not None and self.dispatcher_config.enabled:
+                dispatcher = MessageDispatcher(processor.process_event, self.dispatcher_config)
+                await dispatcher.start()
+            try:
+                return await self._replay(processor, server, dispatcher)
+            finally:
+                if dispatcher:
+                    await dispatcher.stop(drain=False)
+                done.set()
+                server.stop()
+                for thread in threads:
+                    thread.join(timeout=2)
+
+    async def _replay(self, processor: MessageProcessor, server: SocketServer,
+                      dispatcher: Optional[MessageDispatcher]) -> Dict[str, Any]:
+        baseline = server.get_stats()
+        tasks = set()
+        lags = []
+        started = time.perf_counter()
+        for offset, message_data in self.events:
+            if self.speed:
+                scheduled = started + offset / self.speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                lags.append(max(0.0, time.perf_counter() - scheduled))
+            self._submitted[id(message_data)] = time.perf_counter()
+            if dispatcher:
+                await dispatcher.dispatch(message_data)
+            else:
+                task = asyncio.create_task(processor.process_event(message_data))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        deadline = time.perf_counter() + self.timeout
+        while len(self._latencies) < len(self.events) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.002)
+        processed = time.perf_counter()
+        # Fan-out selesai saat semua queue writer client sudah kosong
+        while server.get_stats()["pending_bytes"] and time.perf_counter() < deadline:
+            await asyncio.sleep(0.001)
+        drained = time.perf_counter()
+
+        stats = server.get_stats()
+        completed = len(self._latencies)
+        if completed < len(self.events):
+            self.logger.warning(f"Only {completed}/{len(self.events)} events completed before timeout")
+        return {
+            "events": len(self.events),
+            "completed": completed,
+            "speed": self.speed or "max",
+            "clients": self.clients,
+            "dispatcher": dispatcher is not None,
+            "capture_seconds": round(self.events[-1][0], 3) if self.events else 0.0,
+            "elapsed_seconds": round(drained - started, 3),
+            "throughput": round(completed / (processed - started), 1) if processed > started else 0.0,
+            "latency_ms": percentiles(self._latencies),
+            "lag_ms": percentiles(lags),
+            "fanout_drain_ms": round((drained - processed) * 1000, 3),
+            "bytes_sent": stats["bytes_sent"] - baseline["bytes_sent"],
+            "write_syscalls": stats["write_syscalls"] - baseline["write_syscalls"]
+        }
+
+
+def compare_baseline(result: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float = 0.2) -> List[Tuple[str, float, float, bool]]:
+    """
+    Bandingkan hasil replay dengan baseline
+
+    Returns:
+        list: (metric, baseline, sekarang, regresi) untuk setiap metric di COMPARED_METRICS
+    """
+    rows = []
+    for path, higher_is_better in COMPARED_METRICS:
+        current, previous = result, baseline
+        for key in path:
+            current, previous = current.get(key, {}), previous.get(key, {})
+        if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)):
+            continue
+        if higher_is_better:
+            regressed = current < previous * (1 - tolerance)
+        else:
+            regressed = current > previous * (1 + tolerance) and current - previous > LATENCY_NOISE_MS
+        rows.append((".".join(path), previous, current, regressed))
+    return rows
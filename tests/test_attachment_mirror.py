@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+
+from aiohttp import web
+
+from config import AttachmentConfig
+from models.message import DiscordMessage
+from services.attachment_mirror import AttachmentMirror
+
+PAYLOAD = b"attachment-bytes" * 64
+
+
+def make_message(attachments: list) -> DiscordMessage:
+    return DiscordMessage(
+        type="NEW", timestamp="2024-01-01T00:00:00", server="Server", server_id=1,
+        channel="general", channel_id=10, author="user", author_id=100,
+        content="", attachments=attachments, embeds=0, reactions=0, message_id=1
+    )
+
+
+async def serve(routes: dict):
+    """HTTP stub lokal: path -> handler, return (runner, base URL)"""
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def payload(request):
+    return web.Response(body=PAYLOAD)
+
+
+def run_mirror(tmp_path, routes: dict, attachments: list, **config) -> tuple:
+    async def scenario():
+        runner, base = await serve(routes)
+        mirror = AttachmentMirror(AttachmentConfig(enabled=True, store_dir=str(tmp_path), **config))
+        try:
+            message_data = make_message([base + path for path in attachments])
+            await mirror.mirror(message_data)
+            return base, message_data.attachments, mirror.get_stats()
+        finally:
+            await mirror.close()
+            await runner.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def stored_files(tmp_path) -> list:
+    return [path for path in tmp_path.rglob("*") if path.is_file() and path.parent.name != "tmp"]
+
+
+def test_same_content_is_stored_once(tmp_path):
+    _, attachments, stats = run_mirror(
+        tmp_path, {"/a.png": payload, "/b.png": payload}, ["/a.png", "/b.png"]
+    )
+    digest = hashlib.sha256(PAYLOAD).hexdigest()
+    assert attachments[0] == attachments[1]
+    assert attachments[0].endswith(f"{digest[:2]}/{digest[2:4]}/{digest}.png")
+    assert [path.read_bytes() for path in stored_files(tmp_path)] == [PAYLOAD]
+    assert stats["downloaded"] == 1 and stats["deduplicated"] == 1
+
+
+def test_attachment_over_max_bytes_keeps_original_url(tmp_path):
+    base, attachments, _ = run_mirror(
+        tmp_path, {"/big.bin": payload}, ["/big.bin"], max_bytes=len(PAYLOAD) - 1, chunk_size=128
+    )
+    assert attachments == [base + "/big.bin"]
+    assert stored_files(tmp_path) == []
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_failed_download_keeps_original_url(tmp_path):
+    async def missing(request):
+        raise web.HTTPNotFound()
+
+    base, attachments, stats = run_mirror(
+        tmp_path, {"/gone.png": missing, "/ok.png": payload}, ["/gone.png", "/ok.png"]
+    )
+    assert attachments[0] == base + "/gone.png"
+    assert not attachments[1].startswith(base)
+    assert stats["failed"] == 1
+
+
+def test_slow_download_does_not_block_message(tmp_path):
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return web.Response(body=PAYLOAD)
+
+    async def scenario():
+        runner, base = await serve({"/slow.png": slow})
+        mirror = AttachmentMirror(AttachmentConfig(enabled=True, store_dir=str(tmp_path), inline_timeout=0.1))
+        try:
+            first = make_message([base + "/slow.png"])
+            await asyncio.wait_for(mirror.mirror(first), timeout=2)
+            assert first.attachments == [base + "/slow.png"]
+            assert mirror.get_stats()["deferred"] == 1
+
+            # Download tetap selesai di background, message berikutnya memakai stored copy
+            release.set()
+            second = make_message([base + "/slow.png"])
+            await mirror.mirror(second)
+            assert not second.attachments[0].startswith(base)
+            assert mirror.get_stats()["downloaded"] == 1
+        finally:
+            await mirror.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,121 @@
+import asyncio
+import zlib
+
+import pytest
+
+from config import EventLogConfig
+from services.event_log import (
+    INDEX_ENTRY, INDEX_SUFFIX, LOG_SUFFIX, RECORD_HEADER, EventLog, EventLogReader, list_segments, segment_path
+)
+
+
+def make_log(directory: str, **overrides) -> EventLog:
+    options = dict(directory=directory, segment_bytes=256, index_interval_bytes=64, fsync='never', retention_hours=0)
+    options.update(overrides)
+    log = EventLog(EventLogConfig(**options))
+    log.open()
+    return log
+
+
+def payload(offset: int) -> bytes:
+    # Panjang bervariasi supaya batas segment dan index tidak sejajar dengan record
+    return b'{"offset":%d,"content":"%s"}' % (offset, b"x" * (offset % 7))
+
+
+def append(log: EventLog, count: int) -> None:
+    for _ in range(count):
+        offset = log.next_offset
+        assert log.append(payload(offset)) == offset
+
+
+def close(log: EventLog) -> None:
+    asyncio.run(log.close())
+
+
+@pytest.mark.parametrize("torn", ["partial", "bad_crc"])
+def test_recover_truncates_torn_tail(tmp_path, torn):
+    directory = str(tmp_path)
+    log = make_log(directory, segment_bytes=1 << 20)
+    append(log, 10)
+    close(log)
+
+    log_path = segment_path(directory, 0, LOG_SUFFIX)
+    intact = log_path.stat().st_size
+    data = b'{"offset":10}'
+    if torn == "partial":
+        tail = RECORD_HEADER.pack(10, len(data), zlib.crc32(data)) + data[:5]
+    else:
+        tail = RECORD_HEADER.pack(10, len(data), zlib.crc32(data) ^ 1) + data
+    with open(log_path, 'ab') as f:
+        f.write(tail)
+    # Index entry yang sempat ditulis untuk record yang terpotong
+    with open(segment_path(directory, 0, INDEX_SUFFIX), 'ab') as f:
+        f.write(INDEX_ENTRY.pack(10, intact))
+
+    log = make_log(directory, segment_bytes=1 << 20)
+    assert log.next_offset == 10
+    assert log.get_stats()["truncated_bytes"] == len(tail)
+    assert log_path.stat().st_size == intact
+    append(log, 5)
+    close(log)
+
+    with EventLogReader(directory) as reader:
+        assert list(reader.read()) == [(offset, payload(offset)) for offset in range(15)]
+        assert reader.next_offset == 15
+
+
+def test_seek_across_segment_boundaries(tmp_path):
+    directory = str(tmp_path)
+    log = make_log(directory)
+    append(log, 60)
+    close(log)
+    assert len(list_segments(directory)) > 5
+
+    with EventLogReader(directory) as reader:
+        for start in range(61):
+            expected = [(offset, payload(offset)) for offset in range(start, min(start + 7, 60))]
+            assert list(reader.read(start, limit=7)) == expected
+        assert reader.next_offset == 60
+
+
+def test_reader_follows_segments_rolled_during_iteration(tmp_path):
+    directory = str(tmp_path)
+    log = make_log(directory)
+    append(log, 2)
+
+    with EventLogReader(directory) as reader:
+        records = reader.read()
+        assert next(records) == (0, payload(0))
+        # Segment yang sedang dibaca bertambah lalu di-roll beberapa kali
+        append(log, 38)
+        assert [offset for offset, _ in records] == list(range(1, 40))
+    close(log)
+
+
+def test_retention_while_reader_has_segments_mapped(tmp_path):
+    directory = str(tmp_path)
+    log = make_log(directory, retention_bytes=600)
+    append(log, 40)
+
+    with EventLogReader(directory) as reader:
+        first = reader.first_offset
+        records = reader.read(first)
+        assert next(records) == (first, payload(first))
+        mapped = set(reader._maps)
+
+        append(log, 80)
+        segments = list_segments(directory)
+        assert not mapped & set(segments)
+        # Membaca lagi dari reader yang sama tidak boleh merusak iterasi yang sedang berjalan
+        assert reader.next_offset == 120
+        assert set(reader._maps) <= set(segments)
+
+        offsets = [offset for offset, _ in records]
+        # Sisa segment yang sudah di-map tetap terbaca, lalu lanjut dari segment tertua yang tersisa
+        current = [offset for offset in offsets if offset < segments[0]]
+        assert current == list(range(first + 1, first + 1 + len(current)))
+        assert offsets[len(current):] == list(range(segments[0], 120))
+
+        assert reader.first_offset == segments[0]
+        assert next(reader.read(0)) == (segments[0], payload(segments[0]))
+    close(log)
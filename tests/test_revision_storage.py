@@ -0,0 +1,93 @@
+import asyncio
+
+from models.message import DiscordMessage
+from services.revision_storage import DELTA_TYPE, RevisionStorage
+from services.sqlite_handler import SQLiteService
+
+BODY = "release notes: " + "fixed a bug in the parser, " * 20
+
+
+def make_message(message_type: str, second: int, content: str) -> DiscordMessage:
+    return DiscordMessage(
+        type=message_type, timestamp=f"2024-01-01T00:00:{second:02d}", server="Server", server_id=1,
+        channel="general", channel_id=10, author="user", author_id=100,
+        content=content, attachments=[], embeds=0, reactions=0, message_id=1
+    )
+
+
+def revisions(count: int) -> list:
+    return [make_message("NEW", 0, BODY)] + [
+        make_message("EDITED", second, BODY + f"edit {second}") for second in range(1, count)
+    ]
+
+
+async def write(path: str, messages: list, keyframe_interval: int = 16) -> None:
+    storage = RevisionStorage(SQLiteService(path), keyframe_interval=keyframe_interval)
+    for message_data in messages:
+        assert await storage.save_message(message_data)
+    await storage.disconnect()
+
+
+def test_edit_readable_after_reopen(tmp_path):
+    path = str(tmp_path / "messages.db")
+    messages = revisions(2)
+
+    async def run():
+        await write(path, messages)
+        storage = RevisionStorage(SQLiteService(path))
+        recent = await storage.get_recent_messages(1)
+        appended = [message async for _, message in storage.iter_appended()]
+        raw = await storage.backend.get_recent_messages(1)
+        await storage.disconnect()
+        return recent, appended, raw
+
+    recent, appended, raw = asyncio.run(run())
+    assert raw[0]['type'] == DELTA_TYPE
+    assert recent[0]['type'] == "EDITED"
+    assert recent[0]['content'] == messages[1].content
+    assert [message['content'] for message in appended] == [message.content for message in messages]
+
+
+def test_chain_loaded_from_backend_and_keyframes(tmp_path):
+    path = str(tmp_path / "messages.db")
+    messages = revisions(12)
+
+    async def run():
+        await write(path, messages, keyframe_interval=4)
+        storage = RevisionStorage(SQLiteService(path))
+        recent = await storage.get_recent_messages(1)
+        middle = await storage.get_revision(1, messages[9].timestamp)
+        stats = storage.get_stats()["revisions"]
+        raw = [message async for message in storage.backend.iter_messages()]
+        await storage.disconnect()
+        return recent, middle, stats, raw
+
+    recent, middle, stats, raw = asyncio.run(run())
+    # Revisi ke-5 dan ke-10 ditulis utuh, jadi rantai paling panjang 4 delta
+    assert [message['type'] for message in raw] == ["NEW"] + ([DELTA_TYPE] * 4 + ["EDITED"]) * 2 + [DELTA_TYPE]
+    assert recent[0]['content'] == messages[-1].content
+    assert middle['content'] == messages[9].content
+    # Base revisi 11 = keyframe 10; revisi 9 mengikuti rantai 8, 7, 6 sampai keyframe 5
+    assert stats["base_loads"] == 5
+    assert stats["unresolved_reads"] == 0
+
+
+def test_missing_base_returns_delta(tmp_path):
+    path = str(tmp_path / "messages.db")
+    messages = revisions(2)
+
+    async def run():
+        storage = RevisionStorage(SQLiteService(path))
+        # Base hanya ada di cache proses yang menulis, tidak pernah tersimpan
+        storage._encode(messages[0])
+        assert await storage.save_message(messages[1])
+        await storage.disconnect()
+
+        storage = RevisionStorage(SQLiteService(path))
+        recent = await storage.get_recent_messages(1)
+        await storage.disconnect()
+        return recent
+
+    recent = asyncio.run(run())
+    assert recent[0]['content'] is None
+    assert recent[0]['delta']['base_timestamp'] == messages[0].timestamp
@@ -0,0 +1,31 @@
+from models.message import DiscordMessage
+from services.routing_engine import RoutingEngine, RoutingRule
+
+
+def make_message(content: str) -> DiscordMessage:
+    return DiscordMessage(
+        type="NEW", timestamp="2024-01-01T00:00:00", server="Server", server_id=1,
+        channel="general", channel_id=10, author="user", author_id=100,
+        content=content, attachments=[], embeds=0, reactions=0, message_id=1
+    )
+
+
+def make_engine(*rules) -> RoutingEngine:
+    return RoutingEngine(RoutingRule(name=output, outputs=[output], keywords=keywords)
+                         for output, keywords in rules)
+
+
+def test_overlapping_keywords_at_different_starts():
+    engine = make_engine(("A", ["server down"]), ("B", ["down"]))
+    assert engine.route(make_message("the server down now")) == {"A", "B"}
+
+
+def test_keyword_that_is_prefix_of_another():
+    engine = make_engine(("C", ["new york"]), ("D", ["york"]), ("E", ["new"]))
+    assert engine.route(make_message("flights to New York today")) == {"C", "D", "E"}
+
+
+def test_keywords_match_whole_words_only():
+    engine = make_engine(("A", ["down"]), ("B", ["new york"]))
+    assert engine.route(make_message("downtime in new yorkshire")) == set()
+    assert engine.route(make_message("new york, down!")) == {"A", "B"}
@@ -0,0 +1,210 @@
+import asyncio
+import json
+
+import pytest
+
+from client.stream_client import StreamClient
+from config import SocketConfig
+from models.message import DiscordMessage
+from services.socket_server import SocketServer
+from utils.stream_codec import available_codecs
+
+BODY = "deploy finished on all regions, " * 10
+
+CODECS = [None, "zlib", pytest.param("zstd", marks=pytest.mark.skipif(
+    "zstd" not in available_codecs(), reason="zstandard not installed"
+))]
+
+
+def make_message(message_type: str, message_id: int, content: str, channel_id: int = 10) -> DiscordMessage:
+    return DiscordMessage(
+        type=message_type, timestamp=f"2024-01-01T00:00:{message_id:02d}", server="Server", server_id=1,
+        channel=f"channel-{channel_id}", channel_id=channel_id, author=f"user-{message_id % 3}",
+        author_id=100 + message_id % 3, content=content, attachments=[], embeds=0, reactions=0,
+        message_id=message_id
+    )
+
+
+def conversation(first_id: int, count: int) -> list:
+    """NEW diselingi EDITED kecil, supaya server membuat delta"""
+    messages = []
+    for message_id in range(first_id, first_id + count):
+        messages.append(make_message("NEW", message_id, BODY + str(message_id), channel_id=10 + message_id % 2))
+        if message_id % 2:
+            messages.append(make_message("EDITED", message_id, BODY + f"{message_id} (edited)",
+                                         channel_id=10 + message_id % 2))
+    return messages
+
+
+async def start_server(**config) -> SocketServer:
+    server = SocketServer(SocketConfig(host='127.0.0.1', port=0, heartbeat_interval=30, **config))
+    await server.start()
+    while not server.server_running:
+        await asyncio.sleep(0.01)
+    return server
+
+
+def connect(server: SocketServer, **options) -> StreamClient:
+    options.setdefault("read_timeout", 5)
+    return StreamClient('127.0.0.1', server.server_socket.getsockname()[1], **options)
+
+
+async def wait_live(server: SocketServer, count: int) -> None:
+    """Tunggu sampai count client selesai handshake (RESUME) dan menerima broadcast"""
+    for _ in range(500):
+        if server.get_stats()["live"] == count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"expected {count} live clients, got {server.get_stats()['live']}")
+
+
+async def take(stream, count: int) -> list:
+    return [await asyncio.wait_for(stream.__anext__(), 5) for _ in range(count)]
+
+
+async def broadcast(server: SocketServer, messages: list) -> list:
+    """Broadcast message dan return payload lengkap yang seharusnya diterima client"""
+    expected = []
+    for message_data in messages:
+        await server.broadcast_message(message_data)
+        expected.append({**message_data.to_dict(), "seq": server.get_stats()["seq"]})
+    return expected
+
+
+@pytest.mark.parametrize("edits", ["full", "delta"])
+@pytest.mark.parametrize("wire_format", ["json", "dict"])
+@pytest.mark.parametrize("codec", CODECS)
+def test_round_trip(codec, wire_format, edits):
+    async def scenario():
+        server = await start_server()
+        client = connect(server, compression=codec, wire_format=wire_format, edits=edits)
+        stream = client.messages()
+        try:
+            # Client baru menunggu message pertama, jadi handshake berjalan di background
+            first = asyncio.create_task(take(stream, 1))
+            await wait_live(server, 1)
+            expected = await broadcast(server, conversation(1, 8))
+            received = await first + await take(stream, len(expected) - 1)
+            return expected, received, client.get_stats(), server.get_stats()
+        finally:
+            await stream.aclose()
+            await client.close()
+            server.stop()
+
+    expected, received, client_stats, server_stats = asyncio.run(scenario())
+    assert received == expected
+    assert client_stats["compression"] == codec
+    assert client_stats["wire_format"] == wire_format
+    assert client_stats["edits"] == edits
+    if edits == "delta":
+        assert server_stats["deltas_sent"] == client_stats["deltas"] == 4
+        assert client_stats["snapshots"] == 0
+    else:
+        assert server_stats["deltas_sent"] == client_stats["deltas"] == 0
+    if wire_format == "dict":
+        # Nama server, 2 channel dan 3 author masing-masing dikirim sekali
+        assert server_stats["names_sent"] == 6
+    if codec is not None:
+        assert server_stats["compression_groups"] == 1
+        assert client_stats["compression_ratio"] > 1
+
+
+@pytest.mark.parametrize("codec", CODECS[1:])
+def test_late_joiner_in_shared_compression_group(codec):
+    async def scenario():
+        server = await start_server()
+        early = connect(server, compression=codec, wire_format="dict", edits="delta")
+        late = connect(server, compression=codec, wire_format="dict", edits="delta")
+        early_stream, late_stream = early.messages(), late.messages()
+        try:
+            pending = asyncio.create_task(take(early_stream, 1))
+            await wait_live(server, 1)
+            before = await broadcast(server, conversation(1, 6))
+            early_received = await pending + await take(early_stream, len(before) - 1)
+
+            # Member baru membuat group mulai dari context baru; member lama tetap bisa decode
+            pending = asyncio.create_task(take(late_stream, 1))
+            await wait_live(server, 2)
+            after = await broadcast(server, conversation(7, 6))
+            late_received = await pending + await take(late_stream, len(after) - 1)
+            early_received += await take(early_stream, len(after))
+            resets = [group.resets for group in server._groups.values()]
+            return before + after, after, early_received, late_received, resets
+        finally:
+            for client, stream in ((early, early_stream), (late, late_stream)):
+                await stream.aclose()
+                await client.close()
+            server.stop()
+
+    expected, after, early_received, late_received, resets = asyncio.run(scenario())
+    assert early_received == expected
+    assert late_received == after
+    # Satu group untuk kedua client, context di-reset saat early dan saat late join
+    assert resets == [2]
+
+
+def test_delta_without_base_falls_back_to_snapshot():
+    async def scenario():
+        server = await start_server()
+        await broadcast(server, [make_message("NEW", 1, BODY)])
+        client = connect(server, edits="delta")
+        stream = client.messages()
+        try:
+            pending = asyncio.create_task(take(stream, 1))
+            await wait_live(server, 1)
+            # Versi NEW tidak pernah diterima client, delta-nya harus lewat SNAPSHOT
+            expected = await broadcast(server, [make_message("EDITED", 1, BODY + " (edited)")])
+            received = await pending
+            return expected, received, client.get_stats(), server.get_stats()
+        finally:
+            await stream.aclose()
+            await client.close()
+            server.stop()
+
+    expected, received, client_stats, server_stats = asyncio.run(scenario())
+    assert received == expected
+    assert client_stats["deltas"] == client_stats["snapshots"] == server_stats["snapshots"] == 1
+
+
+@pytest.mark.parametrize("codec, wire_format, edits", [(None, "json", "full"), ("zlib", "dict", "delta")])
+def test_checkpoint_resume_without_duplicates_or_gaps(tmp_path, codec, wire_format, edits):
+    checkpoint_file = str(tmp_path / "consumer.json")
+    duplicates = []
+
+    async def consume(server: SocketServer, count: int, messages: list) -> list:
+        client = connect(server, compression=codec, wire_format=wire_format, edits=edits,
+                         checkpoint_file=checkpoint_file)
+        stream = client.messages()
+        try:
+            pending = asyncio.create_task(take(stream, 1))
+            await wait_live(server, 1)
+            await broadcast(server, messages)
+            return await pending + await take(stream, count - 1)
+        finally:
+            await stream.aclose()
+            await client.close()
+            duplicates.append(client.duplicates)
+            await wait_live(server, 0)
+
+    async def scenario():
+        server = await start_server()
+        try:
+            # Checkpoint awal = seq server saat connect pertama
+            first = await consume(server, 5, conversation(1, 6))
+            # Selama consumer mati, message terus di-broadcast ke replay buffer
+            await broadcast(server, conversation(7, 4))
+            second = await consume(server, 10, conversation(11, 4))
+            with open(checkpoint_file, encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            return first, second, checkpoint, server.stream_id, server.get_stats()["seq"]
+        finally:
+            server.stop()
+
+    first, second, checkpoint, stream_id, last_seq = asyncio.run(scenario())
+    seqs = [message['seq'] for message in first + second]
+    assert seqs == list(range(1, 16))
+    # Replay server mulai tepat setelah checkpoint, bukan hanya disaring client
+    assert duplicates == [0, 0]
+    assert all(message['content'] for message in first + second)
+    assert checkpoint == {"stream": stream_id, "seq": 15}
+    assert last_seq > 15
@@ -0,0 +1,37 @@
+import errno
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """
+    Tulis file secara atomic (tulis ke temp file, fsync, lalu rename)
+
+    Jika file adalah single-file bind mount (misal di docker-compose),
+    rename tidak bisa dilakukan, jadi fallback ke overwrite biasa.
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.replace(tmp_name, target)
+            tmp_name = None
+        except OSError as e:
+            if e.errno not in (errno.EBUSY, errno.EXDEV):
+                raise
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+    finally:
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Iterable, Optional, TypeVar
+from utils.text_diff import apply_fields, diff_fields
+
+# Field yang selalu dikirim utuh di frame delta, tidak ikut di-diff
+DELTA_HEADER_FIELDS = ("type", "timestamp", "message_id", "channel_id", "seq", "routes")
+
+T = TypeVar('T')
+
+
+class MessageVersions(Generic[T]):
+    """LRU versi terakhir per message_id (base untuk delta EDITED berikutnya)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._versions: "OrderedDict[int, T]" = OrderedDict()
+
+    def get(self, message_id: int) -> Optional[T]:
+        version = self._versions.get(message_id)
+        if version is not None:
+            self._versions.move_to_end(message_id)
+        return version
+
+    def put(self, message_id: int, version: T) -> None:
+        self._versions[message_id] = version
+        self._versions.move_to_end(message_id)
+        if len(self._versions) > self.capacity:
+            self._versions.popitem(last=False)
+
+    def discard(self, message_ids: Iterable[int]) -> None:
+        for message_id in message_ids:
+            self._versions.pop(message_id, None)
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+
+def build_edit_delta(base: Dict[str, Any], payload: Dict[str, Any], base_seq: int) -> Dict[str, Any]:
+    """
+    Frame EDITED compact: field header utuh, "base" = seq versi sebelumnya,
+    lalu set/unset/patch dari diff_fields
+    """
+    delta = {key: payload[key] for key in DELTA_HEADER_FIELDS if key in payload}
+    delta["base"] = base_seq
+    delta.update(diff_fields(base, payload, skip=DELTA_HEADER_FIELDS))
+    return delta
+
+
+def apply_edit_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Kebalikan build_edit_delta; return None jika delta tidak cocok dengan base"""
+    message = apply_fields(base, delta)
+    if message is None:
+        return None
+    message.update((key, delta[key]) for key in DELTA_HEADER_FIELDS if key in delta)
+    return message
@@ -1,44 +1,229 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Set
+
+# Atribut bawaan LogRecord, sisanya dianggap field dari extra={...}
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log record jadi satu object JSON per baris"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler dengan queue terbatas: jika penuh, record di-drop dan dihitung"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args dan render traceback sekarang (object bisa berubah sebelum
+        # listener menulisnya), tapi simpan traceback terpisah untuk JSON.
+        # Record tidak di-copy: handler ini satu-satunya handler di logger
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _LoggerFilter(logging.Filter):
+    """Hanya teruskan record dari logger yang dikonfigurasi dengan log file ini"""
+
+    def __init__(self):
+        super().__init__()
+        self.names: Set[str] = set()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.name in self.names
+
+
+class LogSampler:
+    """
+    Token bucket untuk log per-message di hot path
+
+    Cek allow() sebelum membuat pesan log, jadi message yang tidak di-log
+    tidak perlu diformat sama sekali. Jumlah yang di-skip dihitung dan
+    ditambahkan ke log berikutnya lewat note().
+    """
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._pending = 0
+
+        # Stats tracking
+        self.allowed = 0
+        self.suppressed = 0
+
+    def allow(self) -> bool:
+        """True jika log ini boleh ditulis"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.allowed += 1
+            return True
+        self.suppressed += 1
+        self._pending += 1
+        return False
+
+    def note(self) -> str:
+        """Suffix jumlah log yang di-skip sejak log terakhir (dan reset)"""
+        if not self._pending:
+            return ""
+        pending, self._pending = self._pending, 0
+        return f" (+{pending} similar suppressed)"
+
 
 class Logger:
-    """Utility class untuk logging management"""
-    
+    """
+    Utility class untuk logging management
+
+    Semua logger menulis ke satu queue (QueueHandler), dan satu
+    QueueListener di thread terpisah yang menulis ke console dan file.
+    Event loop hanya membuat LogRecord, tidak pernah menunggu I/O.
+    LOG_FORMAT=json menulis satu object JSON per baris.
+    """
+
     _instances = {}
-    
+    _queue: Optional[queue.Queue] = None
+    _queue_handler: Optional[_QueueHandler] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _file_filters: Dict[str, _LoggerFilter] = {}
+    _samplers: Dict[str, LogSampler] = {}
+
     @classmethod
     def get_logger(cls, name: str, log_file: Optional[str] = None, level: str = 'INFO') -> logging.Logger:
         """Get atau create logger instance"""
         if name not in cls._instances:
             cls._instances[name] = cls._create_logger(name, log_file, level)
         return cls._instances[name]
-    
-    @staticmethod
-    def _create_logger(name: str, log_file: Optional[str] = None, level: str = 'INFO') -> logging.Logger:
+
+    @classmethod
+    def _create_logger(cls, name: str, log_file: Optional[str] = None, level: str = 'INFO') -> logging.Logger:
         """Create new logger instance"""
         logger = logging.getLogger(name)
         logger.setLevel(getattr(logging, level.upper()))
-        
+
         # Avoid duplicate handlers
         if logger.handlers:
             return logger
-        
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-        
+
+        cls._start_listener()
+        logger.addHandler(cls._queue_handler)
+
         # File handler jika ditentukan
         if log_file:
+            cls._file_filter(log_file).names.add(name)
+
+        return logger
+
+    @staticmethod
+    def _formatter() -> logging.Formatter:
+        if os.getenv('LOG_FORMAT', 'text').lower() == 'json':
+            return JsonFormatter()
+        return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    @classmethod
+    def _start_listener(cls) -> None:
+        if cls._listener is not None:
+            return
+        cls._queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000')))
+        cls._queue_handler = _QueueHandler(cls._queue)
+
+        # Console handler
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(cls._formatter())
+
+        cls._listener = logging.handlers.QueueListener(cls._queue, console_handler, respect_handler_level=True)
+        cls._listener.start()
+        atexit.register(cls.shutdown)
+
+    @classmethod
+    def _file_filter(cls, log_file: str) -> _LoggerFilter:
+        """FileHandler per path di listener, hanya untuk logger yang memakai file ini"""
+        if log_file not in cls._file_filters:
             Path(log_file).parent.mkdir(parents=True, exist_ok=True)
             file_handler = logging.FileHandler(log_file, encoding='utf-8')
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-        
-        return logger
+            file_handler.setFormatter(cls._formatter())
+            log_filter = cls._file_filters[log_file] = _LoggerFilter()
+            file_handler.addFilter(log_filter)
+            cls._listener.handlers = cls._listener.handlers + (file_handler,)
+        return cls._file_filters[log_file]
+
+    @classmethod
+    def sampler(cls, name: str, rate: Optional[float] = None, burst: Optional[int] = None) -> LogSampler:
+        """
+        Get atau create LogSampler untuk log per-message
+
+        Args:
+            name: Nama sampler (muncul di get_stats)
+            rate: Log per detik yang diizinkan (default LOG_SAMPLE_RATE)
+            burst: Jumlah log berturut-turut sebelum dibatasi (default LOG_SAMPLE_BURST)
+        """
+        if name not in cls._samplers:
+            cls._samplers[name] = LogSampler(
+                name,
+                rate if rate is not None else float(os.getenv('LOG_SAMPLE_RATE', '5')),
+                burst if burst is not None else int(os.getenv('LOG_SAMPLE_BURST', '20'))
+            )
+        return cls._samplers[name]
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Tulis semua record yang masih di queue lalu stop listener (dipanggil saat exit)"""
+        if cls._listener is None:
+            return
+        listener, cls._listener = cls._listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Get logging statistics"""
+        return {
+            "queued": cls._queue.qsize() if cls._queue else 0,
+            "dropped": cls._queue_handler.dropped if cls._queue_handler else 0,
+            "samplers": {
+                name: {"allowed": sampler.allowed, "suppressed": sampler.suppressed}
+                for name, sampler in cls._samplers.items()
+            }
+        }
@@ -0,0 +1,115 @@
+import json
+from typing import Iterator, List, Optional, Tuple
+from utils.logger import Logger
+
+# Separator yang ditulis MessageProcessor._log_to_file setelah setiap message
+RECORD_SEPARATOR = '=' * 50
+_SEPARATOR_BYTES = RECORD_SEPARATOR.encode()
+
+# Chunk baca besar supaya file berukuran GB dibaca secepat disk
+READ_CHUNK_SIZE = 4 << 20
+
+logger = Logger.get_logger("MessageLog")
+
+
+def iter_log_records(path: str, since: Optional[str] = None) -> Iterator[dict]:
+    """
+    Baca message log secara streaming, satu record per yield
+
+    Mendukung format lama (pretty JSON dipisah baris '=====') dan JSON Lines.
+    Hanya satu chunk yang ada di memory pada satu waktu.
+
+    Args:
+        path: Path message log
+        since: Jika di-set, hanya record dengan timestamp > since
+    """
+    for block, _ in iter_log_chunks(path):
+        for record in parse_log_chunk(block):
+            if since is None or record.get('timestamp', '') > since:
+                yield record
+
+
+def iter_log_appended(path: str, after: Optional[List[int]] = None) -> Iterator[Tuple[List[int], dict]]:
+    """
+    Baca message log urut posisi di file (urutan append), dengan cursor per record
+
+    Cursor [offset, skip] = mulai baca dari byte offset (batas chunk) lalu
+    lewati skip record pertama, jadi record yang ditulis setelah run
+    sebelumnya selalu terbaca walaupun timestamp-nya lebih lama.
+
+    Args:
+        path: Path message log
+        after: Cursor dari yield sebelumnya (None = dari awal file)
+    """
+    start, skip = after or (0, 0)
+    for block, offset in iter_log_chunks(path, start):
+        records = parse_log_chunk(block)
+        for index in range(skip, len(records)):
+            cursor = [offset, 0] if index == len(records) - 1 else [start, index + 1]
+            yield cursor, records[index]
+        start, skip = offset, 0
+
+
+def iter_log_chunks(path: str, start_offset: int = 0,
+                    chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[bytes, int]]:
+    """
+    Baca message log per chunk yang hanya berisi record utuh
+
+    Chunk dipotong di baris terakhir yang diawali '{' (awal record, baik pretty
+    JSON maupun JSON Lines), jadi parsing chunk bisa dilakukan terpisah/paralel.
+    Yield (chunk, offset) dengan offset = posisi byte setelah chunk, yang bisa
+    disimpan sebagai checkpoint dan dipakai lagi sebagai start_offset.
+
+    Args:
+        path: Path message log
+        start_offset: Byte offset untuk mulai membaca (batas record)
+        chunk_size: Ukuran baca per chunk
+    """
+    offset = start_offset
+    tail = b""
+    with open(path, 'rb') as f:
+        f.seek(start_offset)
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            buffer = tail + data if tail else data
+            boundary = buffer.rfind(b"\n{")
+            if boundary < 0:
+                # Belum ada awal record berikutnya, baca lagi
+                tail = buffer
+                continue
+            tail = buffer[boundary + 1:]
+            offset += boundary + 1
+            yield buffer[:boundary + 1], offset
+
+    # Record terakhir hanya dipakai jika sudah selesai ditulis, record yang
+    # terpotong tidak dianggap selesai supaya checkpoint tidak melewatinya
+    stripped = tail.rstrip()
+    if stripped.endswith(b"}") or stripped.endswith(_SEPARATOR_BYTES):
+        yield tail, offset + len(tail)
+
+
+def parse_log_chunk(block: bytes) -> List[dict]:
+    """Parse semua record dalam satu chunk dari iter_log_chunks"""
+    records = []
+    for index, part in enumerate(block.split(b"\n{")):
+        record = _parse_block(part if index == 0 else b"{" + part)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def _parse_block(block: bytes) -> Optional[dict]:
+    """Parse satu record (beserta separator-nya), skip record yang rusak (misal terpotong saat crash)"""
+    block = block.rstrip()
+    if block.endswith(_SEPARATOR_BYTES):
+        block = block[:-len(_SEPARATOR_BYTES)].rstrip()
+    if not block:
+        return None
+    try:
+        record = json.loads(block)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.warning(f"Skipping malformed message log record: {e}")
+        return None
+    return record if isinstance(record, dict) else None
@@ -0,0 +1,35 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket untuk membatasi laju request dari banyak task sekaligus"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Jumlah request per detik
+            burst: Maksimal request beruntun tanpa menunggu (default: max(1, rate))
+        """
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Tunggu sampai ada token; caller dilayani berurutan (FIFO lewat lock)"""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
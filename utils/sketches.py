@@ -0,0 +1,152 @@
+import hashlib
+import re
+import time
+from array import array
+from typing import Iterable, Optional, Union
+
+_TOKEN = re.compile(r"\w+")
+
+
+def hash64(value: Union[str, bytes]) -> int:
+    """Hash 64-bit yang stabil antar proses (hash() Python di-randomize)"""
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'little')
+
+
+class CountMinSketch:
+    """
+    Count-min sketch dengan memory tetap (width x depth counter 32-bit)
+
+    Estimasi tidak pernah lebih kecil dari jumlah sebenarnya; error ke atas
+    dibatasi oleh width, probabilitas error oleh depth.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._table = array('I', bytes(4 * width * depth))
+
+    def _indexes(self, key: int) -> Iterable[int]:
+        # Double hashing: depth index dari satu hash 64-bit
+        low, high = key & 0xFFFFFFFF, (key >> 32) | 1
+        for row in range(self.depth):
+            yield row * self.width + (low + row * high) % self.width
+
+    def add(self, key: int, count: int = 1) -> int:
+        """Tambah count untuk key, return estimasi setelah ditambah (conservative update)"""
+        indexes = list(self._indexes(key))
+        estimate = min(self._table[index] for index in indexes) + count
+        for index in indexes:
+            if self._table[index] < estimate:
+                self._table[index] = estimate
+        return estimate
+
+    def estimate(self, key: int) -> int:
+        return min(self._table[index] for index in self._indexes(key))
+
+    def clear(self) -> None:
+        self._table = array('I', bytes(4 * self.width * self.depth))
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._table.itemsize * len(self._table)
+
+
+class RollingCountMin:
+    """
+    Count-min sketch untuk sliding time window
+
+    Dua generasi sketch dirotasi setiap window/2 detik. Estimasi = generasi
+    sekarang + sebelumnya, jadi count mencakup antara window/2 dan window
+    detik terakhir dengan memory tetap.
+    """
+
+    def __init__(self, window: float, width: int = 2048, depth: int = 4):
+        self.window = window
+        self._current = CountMinSketch(width, depth)
+        self._previous = CountMinSketch(width, depth)
+        self._rotated_at = time.monotonic()
+
+    def _rotate(self, now: float) -> None:
+        elapsed = now - self._rotated_at
+        if elapsed < self.window / 2:
+            return
+        if elapsed >= self.window:
+            # Lama tidak ada event, kedua generasi sudah kadaluarsa
+            self._previous.clear()
+            self._current.clear()
+        else:
+            self._previous, self._current = self._current, self._previous
+            self._current.clear()
+        self._rotated_at = now
+
+    def add(self, key: int, now: Optional[float] = None) -> int:
+        """Tambah satu kejadian, return estimasi count dalam window"""
+        self._rotate(time.monotonic() if now is None else now)
+        return self._current.add(key) + self._previous.estimate(key)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._current.memory_bytes + self._previous.memory_bytes
+
+
+def simhash(text: str, shingle: int = 1, max_tokens: int = 256) -> int:
+    """
+    SimHash 64-bit dari word shingles
+
+    Teks yang hampir sama menghasilkan hash dengan hamming distance kecil.
+    Untuk message pendek, unigram (shingle=1) paling stabil terhadap
+    perubahan kecil seperti URL atau mention yang berbeda.
+    """
+    tokens = _TOKEN.findall(text.lower())[:max_tokens]
+    if len(tokens) < shingle:
+        features = [" ".join(tokens)] if tokens else []
+    else:
+        features = [" ".join(tokens[i:i + shingle]) for i in range(len(tokens) - shingle + 1)]
+
+    # Hitung jumlah bit 1 per posisi dengan bit-sliced counter: tiap fitur
+    # butuh O(log n) operasi integer, bukan 64 operasi per bit
+    planes = []
+    for feature in features:
+        carry = hash64(feature)
+        for index in range(len(planes)):
+            planes[index], carry = planes[index] ^ carry, planes[index] & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+
+    half = len(features) / 2
+    result = 0
+    for bit in range(64):
+        count = sum(((plane >> bit) & 1) << index for index, plane in enumerate(planes))
+        if count > half:
+            result |= 1 << bit
+    return result
+
+
+class SpaceSaving:
+    """
+    Heavy hitters (top-k) dengan memory tetap (algoritma Space-Saving)
+
+    Menyimpan paling banyak capacity key. Saat penuh, key dengan count
+    terkecil diganti dan key baru mewarisi count tersebut + 1, jadi key yang
+    sering muncul selalu bertahan dan count-nya tidak pernah under-estimate.
+    """
+
+    def __init__(self, capacity: int = 50):
+        self.capacity = capacity
+        self.counts: dict = {}
+
+    def add(self, key, count: int = 1) -> None:
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+        else:
+            smallest = min(self.counts, key=self.counts.get)
+            self.counts[key] = self.counts.pop(smallest) + count
+
+    def top(self, k: int) -> list:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
@@ -0,0 +1,126 @@
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Setelah compression dinegosiasikan, server mengirim record biner:
+# 1 byte jenis + 4 byte panjang (big endian) + data compressed.
+# Setiap record berisi satu atau lebih frame lengkap (baris newline-delimited).
+RECORD_HEADER = struct.Struct('>cI')
+# Stream per client (HELLO, replay, GAP, HEARTBEAT, reply command)
+RECORD_PRIVATE = b'P'
+# Stream yang dipakai bersama oleh semua client di compression group yang sama
+RECORD_GROUP = b'G'
+# Sama dengan RECORD_GROUP, tapi context group dimulai ulang (ada client baru)
+RECORD_GROUP_RESET = b'R'
+
+DEFAULT_LEVELS = {"zlib": 6, "zstd": 3}
+
+# Wire format "dict": nama diganti id, nama dikirim sekali lewat frame NAMES.
+# (field nama, field id, key di frame NAMES)
+NAME_FIELDS = (("server", "server_id", "servers"), ("channel", "channel_id", "channels"), ("author", "author_id", "authors"))
+
+# ((key NAMES, id, nama), ...) untuk satu message
+MessageNames = Tuple[Tuple[str, int, Any], ...]
+
+
+def available_codecs() -> List[str]:
+    """Codec yang tersedia di proses ini, urut preferensi"""
+    codecs = ["zlib"]
+    if zstandard is not None:
+        codecs.insert(0, "zstd")
+    return codecs
+
+
+class StreamCompressor:
+    """
+    Compressor streaming dengan context yang berlanjut antar frame
+
+    compress() mem-flush setiap panggilan, jadi outputnya bisa langsung
+    di-decompress lengkap oleh penerima, tapi frame berikutnya tetap bisa
+    mereferensikan data dari frame sebelumnya (nama server/channel, key JSON).
+    """
+
+    def __init__(self, codec: str, level: Optional[int] = None):
+        if codec not in available_codecs():
+            raise ValueError(f"Unsupported compression codec: {codec}")
+        self.codec = codec
+        self.level = DEFAULT_LEVELS[codec] if level is None else level
+        if codec == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            # Raw deflate (tanpa header/checksum zlib)
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(self._flush_mode)
+
+
+class StreamDecompressor:
+    """Pasangan StreamCompressor di sisi penerima"""
+
+    def __init__(self, codec: str):
+        if codec not in available_codecs():
+            raise ValueError(f"Unsupported compression codec: {codec}")
+        self.codec = codec
+        if codec == "zstd":
+            self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+def encode_record(kind: bytes, payload: bytes) -> bytes:
+    return RECORD_HEADER.pack(kind, len(payload)) + payload
+
+
+class RecordDecoder:
+    """Decode record dari server: satu decompressor private dan satu untuk group stream"""
+
+    def __init__(self, codec: str):
+        self.codec = codec
+        self._private = StreamDecompressor(codec)
+        self._group: Optional[StreamDecompressor] = None
+
+    def decode(self, kind: bytes, payload: bytes) -> bytes:
+        if kind == RECORD_PRIVATE:
+            return self._private.decompress(payload)
+        if kind == RECORD_GROUP_RESET:
+            self._group = StreamDecompressor(self.codec)
+        elif kind != RECORD_GROUP:
+            raise ValueError(f"Unknown record type: {kind!r}")
+        elif self._group is None:
+            raise ValueError("Group record before group reset")
+        return self._group.decompress(payload)
+
+
+def compact_message(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], MessageNames]:
+    """
+    Buang nama server/channel/author yang punya id dari payload message
+
+    Returns:
+        tuple: (payload tanpa nama, nama yang dibuang untuk dikirim lewat NAMES)
+    """
+    names = []
+    compact = dict(payload)
+    for name_field, id_field, kind in NAME_FIELDS:
+        if payload.get(id_field) is not None and name_field in payload:
+            names.append((kind, payload[id_field], compact.pop(name_field)))
+    return compact, tuple(names)
+
+
+def expand_message(payload: Dict[str, Any], names: Dict[str, Dict[int, Any]]) -> Dict[str, Any]:
+    """Kebalikan compact_message di sisi client: isi lagi nama dari dictionary"""
+    for name_field, id_field, kind in NAME_FIELDS:
+        item_id = payload.get(id_field)
+        if item_id is not None and name_field not in payload:
+            payload[name_field] = names[kind].get(item_id)
+    return payload
@@ -0,0 +1,97 @@
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional
+
+# Patch teks: [[start, end, pengganti], ...] relatif ke teks lama, urut start
+TextPatch = List[list]
+
+# Bagian tengah yang lebih besar dari ini (len lama * len baru) diganti utuh,
+# SequenceMatcher kuadratik untuk teks yang sangat berbeda
+_MATCHER_LIMIT = 250_000
+
+
+def diff_text(old: str, new: str) -> TextPatch:
+    """
+    Patch yang mengubah old jadi new
+
+    Prefix dan suffix yang sama dibuang dulu (edit typo biasanya hanya
+    menyentuh satu bagian kecil), sisanya di-diff dengan SequenceMatcher.
+    """
+    if old == new:
+        return []
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+
+    old_middle = old[prefix:len(old) - suffix]
+    new_middle = new[prefix:len(new) - suffix]
+    if not old_middle or not new_middle or len(old_middle) * len(new_middle) > _MATCHER_LIMIT:
+        return [[prefix, prefix + len(old_middle), new_middle]]
+
+    matcher = SequenceMatcher(None, old_middle, new_middle, autojunk=False)
+    return [
+        [prefix + i1, prefix + i2, new_middle[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+    ]
+
+
+def apply_text_patch(old: str, patch: TextPatch) -> str:
+    parts = []
+    position = 0
+    for start, end, replacement in patch:
+        parts.append(old[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(old[position:])
+    return "".join(parts)
+
+
+def patch_size(patch: TextPatch) -> int:
+    """Perkiraan ukuran patch di wire (untuk memilih patch atau teks utuh)"""
+    return sum(len(replacement) + 16 for _, _, replacement in patch)
+
+
+def diff_fields(old: Dict[str, Any], new: Dict[str, Any], skip: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Delta field message: {"set": {...}, "unset": [...], "patch": [...]}
+
+    Field content dikirim sebagai patch jika lebih kecil dari teks barunya.
+    Key yang tidak berubah tidak ada di hasil.
+    """
+    skip = set(skip)
+    delta: Dict[str, Any] = {}
+    changed = {}
+    for key, value in new.items():
+        if key in skip or old.get(key, ...) == value:
+            continue
+        if key == 'content' and isinstance(value, str) and isinstance(old.get(key), str):
+            patch = diff_text(old[key], value)
+            if patch_size(patch) < len(value):
+                delta['patch'] = patch
+                continue
+        changed[key] = value
+    if changed:
+        delta['set'] = changed
+    unset = [key for key in old if key not in new and key not in skip]
+    if unset:
+        delta['unset'] = unset
+    return delta
+
+
+def apply_fields(base: Dict[str, Any], delta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Kebalikan diff_fields; return None jika patch tidak cocok dengan base"""
+    message = dict(base)
+    patch = delta.get('patch')
+    if patch:
+        content = base.get('content')
+        if not isinstance(content, str) or any(end > len(content) for _, end, _ in patch):
+            return None
+        message['content'] = apply_text_patch(content, patch)
+    message.update(delta.get('set') or {})
+    for key in delta.get('unset') or ():
+        message.pop(key, None)
+    return message
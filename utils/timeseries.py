@@ -0,0 +1,38 @@
+from array import array
+from typing import List
+
+
+class RingSeries:
+    """
+    Time series count per bucket dalam ring buffer berukuran tetap
+
+    Setiap slot menyimpan id bucket absolut (timestamp // bucket_seconds)
+    di sampingnya, jadi slot lama di-reset secara lazy saat ditulis atau
+    diabaikan saat dibaca; tidak perlu timer untuk menggeser window.
+    """
+
+    __slots__ = ('size', '_ids', '_counts')
+
+    def __init__(self, size: int):
+        self.size = size
+        self._ids = array('q', [-1]) * size
+        self._counts = array('I', [0]) * size
+
+    def add(self, bucket: int, count: int = 1) -> None:
+        slot = bucket % self.size
+        if self._ids[slot] != bucket:
+            self._ids[slot] = bucket
+            self._counts[slot] = 0
+        self._counts[slot] += count
+
+    def get(self, bucket: int) -> int:
+        slot = bucket % self.size
+        return self._counts[slot] if self._ids[slot] == bucket else 0
+
+    def values(self, bucket: int, last: int = 0) -> List[int]:
+        """Count per bucket, terlama dulu, untuk `last` bucket sampai bucket (default: seluruh ring)"""
+        last = min(last or self.size, self.size)
+        return [self.get(index) for index in range(bucket - last + 1, bucket + 1)]
+
+    def total(self, bucket: int, last: int = 0) -> int:
+        return sum(self.values(bucket, last))